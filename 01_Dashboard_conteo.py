@@ -1,10 +1,11 @@
+import time
 import streamlit as st
-import re
-from collections import Counter
 import pandas as pd
 import plotly.express as px
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+from analisis_cache import CacheAnalisis
+from lexicos import STOPWORDS_EN, STOPWORDS_ES
+from nube_palabras import ServicioNubes
+from trabajos_analisis import FORMATOS, ColaLlena, GestorTrabajos
 
 # Configuración de la página
 st.set_page_config(page_title="Conteo de Palabras", page_icon="📊")
@@ -43,14 +44,87 @@ def logout():
     st.session_state["password"] = ""
     st.rerun()
 
-# --- CONFIGURACIÓN DE STOPWORDS ---
-STOPWORDS_ES = set([
-    'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'del', 'las', 'un', 'por', 'con', 'no', 'una', 'su', 'para', 'es', 'al', 'lo', 'como', 'más', 'pero', 'sus', 'le', 'ha', 'me', 'sin', 'sobre', 'este', 'ya', 'entre', 'cuando', 'todo', 'esta', 'ser', 'son', 'dos', 'también', 'fue', 'había', 'era', 'muy', 'hasta', 'desde', 'mucho', 'hacia', 'mi', 'se', 'ni', 'ese', 'yo', 'qué', 'e', 'o', 'u', 'algunos', 'aspectos'
-])
+# --- CACHÉ DE ANÁLISIS Y TRABAJOS EN SEGUNDO PLANO ---
+@st.cache_resource
+def obtener_cache():
+    """Una sola caché de resultados compartida por todas las sesiones."""
+    return CacheAnalisis()
 
-STOPWORDS_EN = set([
-    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', "you're", "you've", "you'll", "you'd", 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', "she's", 'her', 'hers', 'herself', 'it', "it's", 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom', 'this', 'that', "that'll", 'these', 'those', 'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until', 'while', 'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between', 'into', 'through', 'during', 'before', 'after', 'above', 'below', 'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will', 'just', 'don', "don't", 'should', "should've", 'now', 'd', 'll', 'm', 'o', 're', 've', 'y', 'ain', 'aren', "aren't", 'couldn', "couldn't", 'didn', "didn't", 'doesn', "doesn't", 'hadn', "hadn't", 'hasn', "hasn't", 'haven', "haven't", 'isn', "isn't", 'ma', 'mightn', "mightn't", 'mustn', "mustn't", 'needn', "needn't", 'shan', "shan't", 'shouldn', "shouldn't", 'wasn', "wasn't", 'weren', "weren't", 'won', "won't", 'wouldn', "wouldn't"
-])
+@st.cache_resource
+def obtener_nubes():
+    """Pool de dibujo de nubes de palabras con caché de PNG por huella de frecuencias."""
+    return ServicioNubes()
+
+@st.cache_resource
+def obtener_gestor():
+    """Cola de análisis de archivos del servidor (trabajos simultáneos acotados)."""
+    return GestorTrabajos()
+
+cache = obtener_cache()
+gestor = obtener_gestor()
+nubes = obtener_nubes()
+
+OPCIONES_NUBE = dict(width=800, height=400, background_color='white', colormap='viridis')
+
+# --- VISUALIZACIÓN DE RESULTADOS ---
+def mostrar_conteo(resultado):
+    """Métricas y gráficos de la sección "Conteo palabras"."""
+    # Métricas
+    col1, col2 = st.columns(2)
+    st.metric("Total de Palabras", resultado["total"])
+    st.metric("Palabras Únicas", resultado["unicas"])
+    
+    # Visualización
+    df_top = resultado["top"]
+    if df_top.empty:
+        st.warning("No se encontraron palabras.")
+    else:
+        st.subheader("Top 10 Palabras Más Frecuentes")
+        st.bar_chart(df_top.set_index("Palabra"))
+        
+        st.subheader("Distribución Proporcional")
+        fig = px.pie(df_top, values='Frecuencia', names='Palabra', hole=0.4)
+        st.plotly_chart(fig)
+
+def mostrar_limpieza(resultado, png=None, previa=False):
+    """Métricas, comparativa antes/después y nube de palabras (PNG) de la sección de limpieza."""
+    st.subheader("✨ Métricas de Limpieza")
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Palabras Originales", resultado["total_raw"])
+    m2.metric("Palabras Limpias", resultado["total_clean"])
+    m3.metric("% Ruido Eliminado", f"{resultado['porc_ruido']:.1f}%")
+    
+    # Visualización Comparativa
+    st.markdown("---")
+    col_left, col_right = st.columns(2)
+    
+    with col_left:
+        st.subheader("Antes de Limpiar")
+        df_raw = resultado["top_raw"]
+        if not df_raw.empty:
+            st.bar_chart(df_raw.set_index("Palabra"), color="#ff9999")
+    
+    with col_right:
+        st.subheader("Después de Limpiar")
+        df_clean = resultado["top_clean"]
+        if not df_clean.empty:
+            st.bar_chart(df_clean.set_index("Palabra"), color="#99ff99")
+    
+    # Plotly comparativo (Pie Chart del texto limpio)
+    if not df_clean.empty:
+        st.subheader("Composición del Texto con Significado")
+        fig_pie = px.pie(df_clean, 
+                         values='Frecuencia', names='Palabra', hole=0.4,
+                         color_discrete_sequence=px.colors.qualitative.Alphabet)
+        st.plotly_chart(fig_pie)
+
+    # --- NUBE DE PALABRAS (WORDCLOUD) ---
+    if png is not None:
+        st.markdown("---")
+        st.subheader("☁️ Nube de Palabras (Texto Limpio)")
+        st.image(png)
+        if previa:
+            st.caption("Vista previa: la nube a resolución completa se está dibujando.")
 
 # --- APP PRINCIPAL ---
 if check_password():
@@ -64,11 +138,19 @@ if check_password():
         st.write(f"Usuario: {st.session_state.get('username', 'admin')}")
         
         idioma = st.selectbox("Idioma del texto", ["Español", "Inglés"])
+        stopwords_sel = STOPWORDS_ES if idioma == "Español" else STOPWORDS_EN
         
+        # Sin filtros en la sección de conteo puro
+        min_len, limpiar_stopwords = 1, False
         if seccion == "Limpieza texto/palabra":
             min_len = st.slider("Longitud mínima de palabra", 1, 10, 3)
             limpiar_stopwords = st.checkbox("Eliminar Stopwords", value=True)
         
+        st.markdown("---")
+        st.header("🗃️ Caché de Análisis")
+        # Se rellena al final, cuando ya se han hecho las consultas de esta ejecución
+        panel_cache = st.empty()
+
         st.markdown("---")
         if st.button("Cerrar Sesión"):
             logout()
@@ -84,126 +166,100 @@ if check_password():
     else:
         st.info("🧹 Esta sección compara el texto original frente al texto limpio (sin ruido).")
 
-    # Área de texto
-    corpus_input = st.text_area(
-        "Ingrese el texto aquí:",
-        height=200,
-        placeholder="Escribe o pega tu texto aquí..."
-    )
+    fuente = st.radio("Origen del texto", ["Pegar texto", "Subir archivo"], horizontal=True)
+    resultado, png, previa, refrescar = None, None, False, False
 
-    # Contador de caracteres
-    char_count = len(corpus_input)
-    st.caption(f"Caracteres actuales: {char_count} / 1200")
+    if fuente == "Pegar texto":
+        # Área de texto
+        corpus_input = st.text_area(
+            "Ingrese el texto aquí:",
+            height=200,
+            placeholder="Escribe o pega tu texto aquí..."
+        )
 
-    if char_count > 1200:
-        st.warning("⚠️ El texto excede los 1200 caracteres sugeridos.")
+        # Contador de caracteres
+        char_count = len(corpus_input)
+        st.caption(f"Caracteres actuales: {char_count} / 1200")
 
-    # Botón de Análisis
-    if st.button("🚀 Iniciar Análisis"):
-        if not corpus_input.strip():
-            st.error("Por favor, ingrese algún texto para analizar.")
-        else:
-            # --- PROCESAMIENTO ---
-            text_lower = corpus_input.lower()
-            words_raw = re.findall(r'\b\w+\b', text_lower)
-            
+        if char_count > 1200:
+            st.warning("⚠️ El texto excede los 1200 caracteres sugeridos. Para textos largos use \"Subir archivo\".")
+
+        # Botón de Análisis: el texto analizado se recuerda para que los reruns (p. ej. al mover
+        # un control de la barra lateral) vuelvan a mostrar los resultados desde la caché
+        if st.button("🚀 Iniciar Análisis"):
+            st.session_state["texto_analizado"] = corpus_input
+            if not corpus_input.strip():
+                st.error("Por favor, ingrese algún texto para analizar.")
+
+        if corpus_input.strip() and st.session_state.get("texto_analizado") == corpus_input:
+            # --- PROCESAMIENTO (con caché por huella del texto y configuración) ---
             if seccion == "Conteo palabras":
-                # Análisis Básico
-                word_counts = Counter(words_raw)
-                total_words = len(words_raw)
-                unique_words = len(word_counts)
-                
-                # Métricas
-                col1, col2 = st.columns(2)
-                st.metric("Total de Palabras", total_words)
-                st.metric("Palabras Únicas", unique_words)
-                
-                # Visualización
-                top_10 = word_counts.most_common(10)
-                if not top_10:
-                    st.warning("No se encontraron palabras.")
-                else:
-                    df_top = pd.DataFrame(top_10, columns=["Palabra", "Frecuencia"])
-                    st.subheader("Top 10 Palabras Más Frecuentes")
-                    st.bar_chart(df_top.set_index("Palabra"))
-                    
-                    st.subheader("Distribución Proporcional")
-                    fig = px.pie(df_top, values='Frecuencia', names='Palabra', hole=0.4)
-                    st.plotly_chart(fig)
-            
+                resultado = cache.conteo(corpus_input)
             else:
                 # Análisis con Limpieza (Lógica de Ejercicio 2)
-                stopwords_sel = STOPWORDS_ES if idioma == "Español" else STOPWORDS_EN
-                
-                # 1. Sin limpieza (para comparar)
-                word_counts_raw = Counter(words_raw)
-                
-                # 2. Con limpieza: Aplicamos los filtros de forma secuencial
-                words_clean = [w for w in words_raw if len(w) >= min_len]
-                if limpiar_stopwords:
-                    # Solo guardamos palabras que NO estén en el conjunto de stopwords
-                    words_clean = [w for w in words_clean if w not in stopwords_sel]
-                
-                word_counts_clean = Counter(words_clean)
-                
-                # Métricas de Eficiencia
-                total_raw = len(words_raw)
-                total_clean = len(words_clean)
-                ruido_eliminado = total_raw - total_clean
-                porc_ruido = (ruido_eliminado / total_raw * 100) if total_raw > 0 else 0
-                
-                st.subheader("✨ Métricas de Limpieza")
-                m1, m2, m3 = st.columns(3)
-                m1.metric("Palabras Originales", total_raw)
-                m2.metric("Palabras Limpias", total_clean)
-                m3.metric("% Ruido Eliminado", f"{porc_ruido:.1f}%")
-                
-                # Visualización Comparativa
-                st.markdown("---")
-                col_left, col_right = st.columns(2)
-                
-                with col_left:
-                    st.subheader("Antes de Limpiar")
-                    top_raw = word_counts_raw.most_common(10)
-                    if top_raw:
-                        df_raw = pd.DataFrame(top_raw, columns=["Palabra", "Frecuencia"])
-                        st.bar_chart(df_raw.set_index("Palabra"), color="#ff9999")
-                
-                with col_right:
-                    st.subheader("Después de Limpiar")
-                    top_clean = word_counts_clean.most_common(10)
-                    if top_clean:
-                        df_clean = pd.DataFrame(top_clean, columns=["Palabra", "Frecuencia"])
-                        st.bar_chart(df_clean.set_index("Palabra"), color="#99ff99")
-                
-                # Plotly comparativo (Pie Chart del texto limpio)
-                if top_clean:
-                    st.subheader("Composición del Texto con Significado")
-                    fig_pie = px.pie(pd.DataFrame(top_clean, columns=["Palabra", "Frecuencia"]), 
-                                     values='Frecuencia', names='Palabra', hole=0.4,
-                                     color_discrete_sequence=px.colors.qualitative.Alphabet)
-                    st.plotly_chart(fig_pie)
-
-                # --- NUBE DE PALABRAS (WORDCLOUD) ---
-                if words_clean:
-                    st.markdown("---")
-                    st.subheader("☁️ Nube de Palabras (Texto Limpio)")
-                    
-                    # Generar la nube
-                    wc = WordCloud(width=800, height=400, background_color='white', 
-                                  colormap='viridis').generate(' '.join(words_clean))
-                    
-                    # Mostrar usando matplotlib
-                    fig_wc, ax = plt.subplots(figsize=(10, 5))
-                    ax.imshow(wc, interpolation='bilinear')
-                    ax.axis('off')
-                    st.pyplot(fig_wc)
-
-                # --- LISTADO DE STOPWORDS ---
-                st.markdown("---")
-                with st.expander(f"📚 Ver lista de Stopwords ({idioma})"):
-                    st.write(f"Estas son las palabras que el sistema considera 'ruido' en {idioma} y que han sido filtradas (si la opción estaba activa):")
-                    # Ordenamos alfabéticamente para que sea fácil de leer
-                    sorted_stopwords = sorted(list(stopwords_sel))
-                    st.write(", ".join(sorted_stopwords))
+                resultado = cache.limpieza(corpus_input, stopwords_sel, min_len, limpiar_stopwords)
+                if resultado["total_clean"]:
+                    # Nube desde las frecuencias ya contadas; mientras se dibuja la definitiva
+                    # se muestra una vista previa reducida y se vuelve a consultar en un segundo
+                    png, definitiva = nubes.renderizar_interactivo(resultado["frecuencias_nube"], **OPCIONES_NUBE)
+                    previa = refrescar = not definitiva
+
+    else:
+        # --- ARCHIVOS GRANDES: ANÁLISIS EN SEGUNDO PLANO ---
+        archivo = st.file_uploader("Suba un archivo (un texto, o una fila/línea por registro)", type=list(FORMATOS))
+        campo = st.text_input("Columna (csv) o clave (jsonl) con el texto", placeholder="Todas las de texto")
+
+        if archivo is not None and st.button("🚀 Analizar archivo en segundo plano"):
+            try:
+                trabajo = gestor.enviar(archivo, archivo.name, campo=campo or None,
+                                        stopwords=stopwords_sel if limpiar_stopwords else None,
+                                        min_len=min_len, opciones_nube=OPCIONES_NUBE)
+                st.session_state["trabajo"] = trabajo.id
+            except (ColaLlena, ValueError) as error:
+                st.error(str(error))
+
+        trabajo = gestor.obtener(st.session_state.get("trabajo"))
+        if trabajo is not None:
+            if trabajo.pendiente:
+                st.progress(trabajo.progreso, text=f"{trabajo.nombre}: {trabajo.estado} "
+                            f"({trabajo.bytes_leidos / 1e6:.0f} de {trabajo.bytes_totales / 1e6:.0f} MB)")
+                if st.button("⏹️ Cancelar análisis"):
+                    trabajo.cancelar()
+                refrescar = True
+            elif trabajo.estado == 'terminado':
+                st.success(f"{trabajo.nombre}: {trabajo.bytes_totales / 1e6:.1f} MB analizados en {trabajo.duracion_s:.1f} s")
+                if (trabajo.min_len, trabajo.stopwords) == (min_len, stopwords_sel if limpiar_stopwords else None):
+                    resultado, png = trabajo.resultado, trabajo.png
+                else:
+                    # Otros filtros: se recalculan sobre el vocabulario guardado, sin releer el archivo
+                    resultado = trabajo.analisis.resumen(stopwords_sel if limpiar_stopwords else None, min_len)
+                    if seccion == "Limpieza texto/palabra" and resultado["frecuencias_nube"]:
+                        png, definitiva = nubes.renderizar_interactivo(resultado["frecuencias_nube"], **OPCIONES_NUBE)
+                        previa = refrescar = not definitiva
+            else:
+                st.error(f"{trabajo.nombre}: {trabajo.estado}. {trabajo.error or ''}")
+
+    if resultado is not None:
+        if seccion == "Conteo palabras":
+            mostrar_conteo(resultado)
+        else:
+            mostrar_limpieza(resultado, png, previa)
+
+            # --- LISTADO DE STOPWORDS ---
+            st.markdown("---")
+            with st.expander(f"📚 Ver lista de Stopwords ({idioma})"):
+                st.write(f"Estas son las palabras que el sistema considera 'ruido' en {idioma} y que han sido filtradas (si la opción estaba activa):")
+                # Ordenamos alfabéticamente para que sea fácil de leer
+                sorted_stopwords = sorted(list(stopwords_sel))
+                st.write(", ".join(sorted_stopwords))
+
+    # Contadores de la caché en la barra lateral
+    with panel_cache.container():
+        for nombre, datos in dict(cache.estadisticas(), imagenes=nubes.estadisticas()).items():
+            st.caption(f"{nombre.capitalize()}: {datos['aciertos']} aciertos / {datos['fallos']} fallos, "
+                       f"{datos['entradas']} entradas ({datos['mb']:.1f} MB)")
 
+    # Mientras haya un análisis o una nube en curso, se consulta su progreso cada segundo
+    if refrescar:
+        time.sleep(1)
+        st.rerun()
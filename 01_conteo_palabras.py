@@ -12,9 +12,12 @@
 # --- IMPORTACIONES --- 
 # Importamos las herramientas que necesitaremos.
 
-import re
+import argparse
 from collections import Counter
 import matplotlib.pyplot as plt
+from conteo_streaming import contar_en_flujo
+from conteo_aproximado import contar_aproximado
+from tokenizador import tokenizar
 
 # --- NUESTRO CORPUS (BASE DE DATOS DE TEXTO) ---
 corpus = [
@@ -31,29 +34,50 @@ corpus = [
 
 # --- PROCESAMIENTO ---
 
-# 1. Unificar todo el texto
-# Para analizar la frecuencia en todo el corpus, primero unimos todas las frases en un único bloque de texto.
-print("Paso 1: Unificando el corpus en un solo bloque de texto...")
-all_text = ' '.join(corpus)
-print(f"Texto completo: '{all_text[:100]}...'")
-
-# 2. Normalización: Convertir a minúsculas
-# Esto es crucial para que palabras como "Fantástico" y "fantástico" se cuenten como una sola.
-print("\nPaso 2: Normalizando el texto a minúsculas...")
-all_text_lower = all_text.lower()
-print(f"Texto normalizado: '{all_text_lower[:100]}...'")
-
-# 3. Tokenización: Dividir el texto en palabras (tokens)
-# Usamos una expresión regular `\b\w+\b` que es más robusta que un simple `.split()`.
-# `\b` asegura que solo cojamos palabras completas, ignorando signos de puntuación como comas o puntos.
-print("\nPaso 3: Tokenizando el texto en palabras...")
-words = re.findall(r'\b\w+\b', all_text_lower)
-print(f"Primeras 20 palabras (tokens): {words[:20]}")
-
-# 4. Conteo de Frecuencias
-# `collections.Counter` es una herramienta de Python extremadamente eficiente para contar la frecuencia de elementos en una lista.
-print("\nPaso 4: Contando la frecuencia de cada palabra...")
-word_counts = Counter(words)
+# MODO STREAMING (opcional): si se pasan rutas de archivo (o '-' para stdin),
+# leemos por bloques y contamos de forma incremental, sin cargar todo el texto en memoria.
+# Ejemplo: python 01_conteo_palabras.py reseñas.txt
+# Con `--aproximado` usamos un Count-Min Sketch de memoria fija (ideal para vocabularios sin límite).
+parser = argparse.ArgumentParser(description="Ejercicio 1: conteo de palabras.")
+parser.add_argument('fuentes', nargs='*', help="archivos de texto ('-' para stdin); sin ellos se usa el corpus de ejemplo")
+parser.add_argument('--aproximado', action='store_true', help="Count-Min Sketch de memoria fija (requiere archivos)")
+args = parser.parse_args()
+if args.aproximado and not args.fuentes:
+    parser.error("--aproximado necesita al menos un archivo (o '-' para stdin)")
+modo_aproximado, fuentes = args.aproximado, args.fuentes
+
+if fuentes and modo_aproximado:
+    print(f"Modo aproximado: estimando las palabras más frecuentes de {', '.join(fuentes)}...")
+    word_counts, total_words = contar_aproximado(fuentes)
+elif fuentes:
+    print(f"Modo streaming: contando palabras de {', '.join(fuentes)} por bloques...")
+    word_counts, total_words = contar_en_flujo(fuentes)
+else:
+    # 1. Unificar todo el texto
+    # Para analizar la frecuencia en todo el corpus, primero unimos todas las frases en un único bloque de texto.
+    print("Paso 1: Unificando el corpus en un solo bloque de texto...")
+    all_text = ' '.join(corpus)
+    print(f"Texto completo: '{all_text[:100]}...'")
+
+    # 2. Normalización: Convertir a minúsculas
+    # Esto es crucial para que palabras como "Fantástico" y "fantástico" se cuenten como una sola.
+    print("\nPaso 2: Normalizando el texto a minúsculas...")
+    all_text_lower = all_text.lower()
+    print(f"Texto normalizado: '{all_text_lower[:100]}...'")
+
+    # 3. Tokenización: Dividir el texto en palabras (tokens)
+    # Usamos una expresión regular `\b\w+\b` que es más robusta que un simple `.split()`.
+    # `\b` asegura que solo cojamos palabras completas, ignorando signos de puntuación como comas o puntos.
+    print("\nPaso 3: Tokenizando el texto en palabras...")
+    # (El patrón está precompilado en `tokenizador.py`, compartido por todos los ejercicios.)
+    words = tokenizar(all_text_lower, minusculas=False)
+    print(f"Primeras 20 palabras (tokens): {words[:20]}")
+
+    # 4. Conteo de Frecuencias
+    # `collections.Counter` es una herramienta de Python extremadamente eficiente para contar la frecuencia de elementos en una lista.
+    print("\nPaso 4: Contando la frecuencia de cada palabra...")
+    word_counts = Counter(words)
+    total_words = len(words)
 
 # `most_common(10)` nos da una lista de las 10 tuplas (palabra, frecuencia) más comunes.
 top_10_words = word_counts.most_common(10)
@@ -64,16 +88,19 @@ for word, count in top_10_words:
     print(f"- '{word}': {count} veces")
 
 # 5. Total de palabras
-# Calculamos la longitud de la lista 'words' para saber cuántas palabras hay en total.
+# Es la longitud de la lista 'words' (en modo streaming se acumula mientras leemos).
 print(f"\nPaso 5: Calculando el total de palabras...")
-total_words = len(words)
 print(f"Total de palabras en el corpus: {total_words}")
 
 # 6. Palabras únicas
 # El objeto Counter (word_counts) ya contiene las palabras únicas como llaves.
 print("\nPaso 6: Calculando el número de palabras únicas...")
-unique_words = len(word_counts)
-print(f"Número de palabras únicas: {unique_words}")
+if modo_aproximado and fuentes:
+    # El sketch no guarda el vocabulario, así que informamos su margen de error.
+    print(f"No disponible en modo aproximado (error máximo estimado por palabra: ±{word_counts.cota_error():.0f})")
+else:
+    unique_words = len(word_counts)
+    print(f"Número de palabras únicas: {unique_words}")
 
 # --- VISUALIZACIÓN ---
 # Un análisis no está completo si no podemos comunicarlo visualmente.
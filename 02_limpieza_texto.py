@@ -9,14 +9,15 @@
 # pero no nos dicen nada sobre el tema o el sentimiento de un texto. Son el "ruido" del lenguaje.
 
 # --- IMPORTACIONES ---
-import re
-from collections import Counter
+import io
 import matplotlib.pyplot as plt
-from wordcloud import WordCloud
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich import print as rprint
+from collections import Counter
+from conteo_fusionado import contar_filtrado, iterar_filtrado
+from nube_palabras import ServicioNubes
 
 # Inicializar consola de Rich
 console = Console()
@@ -47,37 +48,38 @@ negativas = {'terrible', 'decepcionante', 'caro', 'pésima', 'mal', 'desastre',
 
 # 2. MEJORA: Filtrado por longitud (ignorar palabras muy cortas)
 def procesar_y_contar(text, stopwords=None, min_len=1):
-    """Toma un bloque de texto, lo normaliza, tokeniza y opcionalmente elimina stopwords y palabras cortas."""
-    text_lower = text.lower()
-    words = re.findall(r'\b\w+\b', text_lower)
-    
-    # Aplicamos filtros
-    if stopwords:
-        words = [word for word in words if word not in stopwords]
-    
-    if min_len > 1:
-        words = [word for word in words if len(word) >= min_len]
-        
+    """Toma un bloque de texto, lo normaliza, tokeniza y opcionalmente elimina stopwords y palabras cortas.
+
+    Devuelve (lista de palabras filtradas, Counter).
+    """
+    words = list(iterar_filtrado(text, stopwords, min_len))
     return words, Counter(words)
 
+def contar_limpio(text, stopwords=None, min_len=1):
+    """Como `procesar_y_contar`, pero sin la lista de palabras: devuelve (Counter, total de palabras),
+    en el mismo orden que `contar_filtrado` y `contar_en_flujo`.
+
+    Cuenta los tokens del texto y aplica los filtros después, sobre el vocabulario
+    (`contar_filtrado`), así que nunca se crea una lista del tamaño del texto.
+    """
+    return contar_filtrado(text, stopwords, min_len)
+
 # 1. Análisis SIN limpieza
 console.rule("[bold blue]PASO 1: Análisis Inicial (Sin Limpiar)")
 rprint("[italic]Procesando texto original para detectar ruido y frecuencia base...[/italic]")
 # rprint(f"Palabras detectadas: {total_sin}") # Opcional: mostrar total inicial
 all_text = ' '.join(corpus)
-words_sin, word_counts_sin_limpieza = procesar_y_contar(all_text)
+word_counts_sin_limpieza, total_sin = contar_limpio(all_text)
 top_10_sin_limpieza = word_counts_sin_limpieza.most_common(10)
 
 # 2. Análisis CON limpieza (Opción 1 y 2 integradas)
 console.print()
 console.rule("[bold green]PASO 2: Procesamiento NLP (Con Limpieza)")
 rprint("[italic]Aplicando filtros: Stopwords + Longitud mínima (3 letras)...[/italic]")
-words_con, word_counts_con_limpieza = procesar_y_contar(all_text, stopwords=stopwords_es, min_len=3)
+word_counts_con_limpieza, total_con = contar_limpio(all_text, stopwords=stopwords_es, min_len=3)
 top_10_con_limpieza = word_counts_con_limpieza.most_common(10)
 
 # 1. MEJORA: Cálculo de métricas de eficiencia (Porcentaje de Ruido)
-total_sin = len(words_sin)
-total_con = len(words_con)
 ruido_eliminado = total_sin - total_con
 porcentaje_ruido = (ruido_eliminado / total_sin) * 100
 
@@ -100,10 +102,17 @@ for palabra, frecuencia in top_10_con_limpieza:
 console.print(tabla)
 
 # 4. MEJORA: Análisis de Sentimiento Básico
-pos_count = sum(1 for w in words_con if w in positivas)
-neg_count = sum(1 for w in words_con if w in negativas)
+# Sumamos directamente desde el Counter: recorremos el vocabulario, no cada palabra.
+pos_count = sum(word_counts_con_limpieza[w] for w in positivas)
+neg_count = sum(word_counts_con_limpieza[w] for w in negativas)
 neu_count = total_con - (pos_count + neg_count)
 
+# La nube se dibuja en segundo plano (a partir del Counter, sin volver a unir el texto)
+# mientras el usuario elige qué visualizar en el menú
+servicio_nubes = ServicioNubes(max_trabajadores=1)
+nube_pendiente = servicio_nubes.enviar(word_counts_con_limpieza, width=800, height=500,
+                                       background_color='#f0f2f6', colormap='magma', max_words=50)
+
 # --- FUNCIONES DE VISUALIZACIÓN ---
 
 def mostrar_dashboard_360():
@@ -125,9 +134,7 @@ def mostrar_dashboard_360():
 
     # 2. Nube de Palabras
     ax2 = fig.add_subplot(2, 2, 2)
-    wordcloud = WordCloud(width=800, height=500, background_color='#f0f2f6', 
-                          colormap='magma', max_words=50).generate(' '.join(words_con))
-    ax2.imshow(wordcloud, interpolation='bilinear')
+    ax2.imshow(plt.imread(io.BytesIO(nube_pendiente.result())), interpolation='bilinear')
     ax2.axis('off')
     ax2.set_title('2. Mapa Interactivo de Conceptos', fontsize=14, fontweight='bold', pad=15)
     ax2.text(0.5, -0.20, "El tamaño de cada palabra indica su importancia relativa.\nA mayor tamaño, más presencia en el corpus analizado.", 
@@ -208,28 +215,32 @@ def mostrar_comparativa():
 console.print()
 console.rule("[bold cyan]CENTRO DE VISUALIZACIÓN INTERACTIVO")
 
-while True:
-    console.print("\n[bold yellow]¿Qué deseas visualizar?[/]")
-    console.print("1. [bold blue]Dashboard Analítico 360°[/] (Gráficos, Nube, Sentimiento)")
-    console.print("2. [bold green]Comparativa Directa[/] (Antes vs Después)")
-    console.print("3. [bold red]Salir y finalizar[/]")
+# El pool de la nube se cierra aunque el menú termine con un error o con Ctrl+C
+try:
+    while True:
+        console.print("\n[bold yellow]¿Qué deseas visualizar?[/]")
+        console.print("1. [bold blue]Dashboard Analítico 360°[/] (Gráficos, Nube, Sentimiento)")
+        console.print("2. [bold green]Comparativa Directa[/] (Antes vs Después)")
+        console.print("3. [bold red]Salir y finalizar[/]")
     
-    opcion = console.input("\n[bold cyan]Selecciona una opción (1-3): [/]")
+        opcion = console.input("\n[bold cyan]Selecciona una opción (1-3): [/]")
     
-    if opcion == '1':
-        rprint("[blue]Generando Figura 1...[/]")
-        mostrar_dashboard_360()
-    elif opcion == '2':
-        rprint("[green]Generando Figura 2...[/]")
-        mostrar_comparativa()
-    elif opcion == '3':
-        break
-    else:
-        rprint("[red]Opción no válida, intenta de nuevo.[/]")
-
-conclusion_footer = (
-    "[bold white]--- PROCESADO COMPLETADO CON ÉXITO ---[/bold white]\n"
-    "[italic cyan]Observación:[/italic cyan] El ahorro de ruido permite que el análisis\n"
-    "sea mucho más preciso al enfocarse en palabras con carga semántica real."
-)
-console.print(Panel(conclusion_footer, border_style="blue", title="[bold white]Cierre del Programa[/]"))
+        if opcion == '1':
+            rprint("[blue]Generando Figura 1...[/]")
+            mostrar_dashboard_360()
+        elif opcion == '2':
+            rprint("[green]Generando Figura 2...[/]")
+            mostrar_comparativa()
+        elif opcion == '3':
+            break
+        else:
+            rprint("[red]Opción no válida, intenta de nuevo.[/]")
+
+    conclusion_footer = (
+        "[bold white]--- PROCESADO COMPLETADO CON ÉXITO ---[/bold white]\n"
+        "[italic cyan]Observación:[/italic cyan] El ahorro de ruido permite que el análisis\n"
+        "sea mucho más preciso al enfocarse en palabras con carga semántica real."
+    )
+    console.print(Panel(conclusion_footer, border_style="blue", title="[bold white]Cierre del Programa[/]"))
+finally:
+    servicio_nubes.cerrar()
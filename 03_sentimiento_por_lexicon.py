@@ -43,9 +43,13 @@ Repositorio: https://github.com/TodoEconometria/certificaciones
 # palabras de cada léxico contiene.
 
 # --- IMPORTACIONES ---
-import re
+import os
 import matplotlib.pyplot as plt
 from collections import Counter
+from sentimiento_lote import ClasificadorLote
+from sentimiento_frases import AnalizadorFrases
+from lexico_binario import LexicoMapeado
+from lexicos import LEXICO_NEGATIVO, LEXICO_POSITIVO, STOPWORDS_SENTIMIENTO
 
 # --- CORPUS, STOPWORDS Y LÉXICOS ---
 corpus = [
@@ -60,48 +64,36 @@ corpus = [
     "La batería dura poquísimo, un desastre."
 ]
 
-stopwords_es = set([
-    'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'del', 'las', 'un', 'por', 'con', 'una', 'su', 'para', 'es', 'al', 'lo', 'como', 'más', 'pero', 'sus', 'le', 'ha', 'me', 'sin', 'sobre', 'este', 'ya', 'entre', 'cuando', 'todo', 'esta', 'ser', 'son', 'dos', 'también', 'fue', 'había', 'era', 'muy', 'hasta', 'desde', 'mucho', 'hacia', 'mi', 'se', 'ni', 'ese', 'yo', 'qué', 'e', 'o', 'u', 'algunos', 'aspectos'
-])
-
-# Léxicos de sentimiento (simplificados)
-lexico_positivo = {"encanta", "fantástico", "útil", "adecuado", "increíble", "recomiendo", "totalmente", "mejorar"}
-lexico_negativo = {"terrible", "decepcionante", "caro", "barato", "pésima", "tardó", "mal", "poquísimo", "desastre"}
+# Stopwords y léxicos de sentimiento (simplificados), compartidos con el servicio de
+# sentimiento y el dashboard en `lexicos.py`. Las stopwords son las del dashboard salvo
+# "no", que conservamos porque cambia el sentido de la frase.
+stopwords_es = STOPWORDS_SENTIMIENTO
+lexico_positivo = LEXICO_POSITIVO
+lexico_negativo = LEXICO_NEGATIVO
 
 # --- PROCESAMIENTO ---
 
-def analizar_sentimiento(frase, stopwords, lexico_pos, lexico_neg):
+# El clasificador se construye una sola vez (sentimiento_lote.py): convierte los léxicos en un
+# vector de pesos y puntúa las frases sin volver a recorrer los léxicos en cada llamada.
+# Si la variable de entorno LEXICO_SENTIMIENTO apunta a un léxico externo compilado con
+# `lexico_binario.py` (p. ej. SEL), lo usamos mapeado en memoria en lugar de los conjuntos de arriba.
+ruta_lexico = os.environ.get("LEXICO_SENTIMIENTO")
+if ruta_lexico:
+    clasificador = ClasificadorLote(LexicoMapeado(ruta_lexico), stopwords_es)
+else:
+    clasificador = ClasificadorLote.desde_lexicos(lexico_positivo, lexico_negativo, stopwords_es)
+
+def analizar_sentimiento(frase, clasificador=clasificador):
     """Analiza una sola frase y devuelve su puntaje y clasificación de sentimiento."""
-    # 1. Limpieza (Normalización y eliminación de stopwords)
-    frase_lower = frase.lower()
-    words = re.findall(r'\b\w+\b', frase_lower)
-    words_cleaned = [word for word in words if word not in stopwords]
-
-    # 2. Conteo de palabras positivas y negativas
-    score_pos = sum(1 for word in words_cleaned if word in lexico_pos)
-    score_neg = sum(1 for word in words_cleaned if word in lexico_neg)
-
-    # 3. Cálculo del puntaje final
-    # La lógica más simple: palabras positivas suman 1, negativas restan 1.
-    puntaje_final = score_pos - score_neg
-
-    # 4. Clasificación basada en el puntaje
-    if puntaje_final > 0:
-        clasificacion = "Positiva"
-    elif puntaje_final < 0:
-        clasificacion = "Negativa"
-    else:
-        clasificacion = "Neutra"
-        
-    return {
-        "frase": frase,
-        "puntaje": puntaje_final,
-        "clasificacion": clasificacion,
-        "palabras_clave": [word for word in words_cleaned if word in lexico_pos or word in lexico_neg]
-    }
-
-# Analizamos cada frase del corpus
-resultados_analisis = [analizar_sentimiento(frase, stopwords_es, lexico_positivo, lexico_negativo) for frase in corpus]
+    # 1. Limpieza: tokens en minúsculas sin stopwords.
+    # 2. Conteo: cada palabra del léxico positivo suma 1 y cada una del negativo resta 1
+    #    (puntaje_final = score_pos - score_neg).
+    # 3. Clasificación: Positiva si el puntaje es > 0, Negativa si es < 0, Neutra si es 0.
+    return clasificador.analizar_frase(frase)
+
+# Analizamos todo el corpus de una vez con el mismo clasificador, por lotes: da los mismos
+# resultados que llamar a `analizar_sentimiento` frase a frase, con una sola suma vectorizada.
+resultados_analisis = clasificador.analizar(corpus, palabras_clave=True).to_dict("records")
 
 print("--- RESULTADOS DEL ANÁLISIS DE SENTIMIENTO ---")
 for resultado in resultados_analisis:
@@ -137,3 +129,12 @@ print("\n--- FIN DEL EJERCICIO 3 ---")
 print("Observación: Nuestro clasificador simple funciona razonablemente bien, pero tiene fallos.")
 print("Por ejemplo, 'No está mal' se clasifica como Negativa por la palabra 'mal', ignorando la negación 'No'.")
 print("Este es un problema clásico en NLP llamado 'manejo de la negación', que requiere técnicas más avanzadas.")
+
+# --- MEJORA: EXPRESIONES MULTIPALABRA Y NEGACIÓN ---
+# `sentimiento_frases.py` compila el léxico en un autómata (Aho-Corasick) que reconoce
+# expresiones de varias palabras e invierte la polaridad si hay un negador cerca.
+analizador_frases = AnalizadorFrases.desde_lexicos(lexico_positivo, lexico_negativo)
+resultado_negacion = analizador_frases.analizar("No está mal, pero podría mejorar.")
+print(f"\nCon manejo de la negación: '{resultado_negacion['frase']}'")
+print(f"  -> Palabras Clave: {resultado_negacion['palabras_clave']}")
+print(f"  -> Puntaje: {resultado_negacion['puntaje']}, Clasificación: {resultado_negacion['clasificacion']}")
@@ -32,10 +32,17 @@ REFERENCIA ACADÉMICA:
 # y un valor de 0 significa que no tienen ninguna palabra en común.
 
 # --- IMPORTACIONES ---
-import re
+import os
+import tempfile
 import seaborn as sns
 import matplotlib.pyplot as plt
 import numpy as np
+from tokenizador import tokenizar
+from jaccard_disperso import matriz_jaccard
+from similitud_bloques import guardar_matriz
+from cache_similitud import CacheSimilitud
+from clustering_jerarquico import agrupar, dibujar_clustermap
+from estadisticas_similitud import codificar_etiquetas
 
 # --- CORPUS Y STOPWORDS ---
 # Corpus organizado por CATEGORÍAS TEMÁTICAS
@@ -73,6 +80,10 @@ etiquetas = [
     "Cocina: Chef"
 ]
 
+# Categoría de cada documento. Las estadísticas solo usan este arreglo de etiquetas, así que
+# no dependen de cuántas categorías haya ni de cuántos documentos tenga cada una.
+categoria_de_documento = np.repeat(["Fútbol", "Tecnología", "Cocina"], 3)
+
 stopwords_es = set([
     'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'del', 'las', 'un', 'por',
     'con', 'no', 'una', 'su', 'para', 'es', 'al', 'lo', 'como', 'más', 'pero',
@@ -87,8 +98,7 @@ stopwords_es = set([
 # 1. Preprocesamiento: Convertir cada frase en un conjunto de palabras limpias
 def preprocess_to_set(frase, stopwords):
     """Limpia una frase y la convierte en un conjunto de palabras únicas."""
-    frase_lower = frase.lower()
-    words = re.findall(r'\b\w+\b', frase_lower)
+    words = tokenizar(frase)
     words_cleaned = [word for word in words if word not in stopwords]
     return set(words_cleaned)
 
@@ -98,39 +108,69 @@ sets_de_palabras = [preprocess_to_set(frase, stopwords_es) for frase in corpus]
 print("\n" + "-"*50)
 print("CONJUNTOS DE PALABRAS POR CATEGORÍA:")
 print("-"*50)
-categorias = ["FÚTBOL", "TECNOLOGÍA", "COCINA"]
-for cat_idx, categoria in enumerate(categorias):
-    print(f"\n{categoria}:")
-    for i in range(3):
-        idx = cat_idx * 3 + i
+categorias, codigos_categoria = codificar_etiquetas(categoria_de_documento)
+for codigo, categoria in enumerate(categorias):
+    print(f"\n{categoria.upper()}:")
+    for idx in np.flatnonzero(codigos_categoria == codigo):
         print(f"  Doc {idx} ({etiquetas[idx]}): {sets_de_palabras[idx]}")
 
-# 2. Cálculo de la Similitud de Jaccard
-def jaccard_similarity(set1, set2):
-    """Calcula la similitud de Jaccard entre dos conjuntos."""
-    interseccion = set1.intersection(set2)
-    union = set1.union(set2)
-    
-    # Evitamos la división por cero si ambos conjuntos están vacíos
-    if not union:
-        return 1.0
-    else:
-        return len(interseccion) / len(union)
+# 2. Similitud de Jaccard: |A ∩ B| / |A ∪ B| (1.0 si ambos conjuntos están vacíos)
 
 # 3. Creación de la Matriz de Similitud
 # Esta matriz cuadrada nos dirá la similitud de cada frase con cada otra frase.
+# En lugar de calcular cada par en un doble bucle (n² pares; la versión con conjuntos de
+# Python queda como referencia en el benchmark de jaccard_disperso.py), usamos
+# `matriz_jaccard` (jaccard_disperso.py): codifica cada conjunto como fila de una matriz
+# binaria dispersa y obtiene todas las intersecciones con X @ X.T, solo en el triángulo
+# superior. El resultado es idéntico al del doble bucle.
 num_frases = len(corpus)
-matriz_similitud = np.zeros((num_frases, num_frases))
 
 print("\nPaso 2: Calculando la matriz de similitud... (Jaccard)")
-for i in range(num_frases):
-    for j in range(num_frases):
-        similitud = jaccard_similarity(sets_de_palabras[i], sets_de_palabras[j])
-        matriz_similitud[i, j] = similitud
+# Si la variable de entorno CACHE_SIMILITUD apunta a un archivo SQLite (cache_similitud.py),
+# solo se calculan los pares de documentos nuevos o modificados desde la última ejecución;
+# el resto se lee de la caché, que se identifica por el contenido de cada documento.
+ruta_cache = os.environ.get("CACHE_SIMILITUD")
+resultado_cache = None
+if ruta_cache:
+    with CacheSimilitud(ruta_cache) as cache:
+        resultado_cache = cache.actualizar(sets_de_palabras)
+    matriz_similitud = resultado_cache.matriz()
+    estadisticas_cache = resultado_cache.estadisticas
+    print(f"Caché de similitudes: {estadisticas_cache['tasa_acierto']:.0%} de aciertos, "
+          f"{estadisticas_cache['nuevos']} documentos nuevos, {estadisticas_cache['podados']} podados, "
+          f"ahorro estimado {estadisticas_cache['tiempo_ahorrado_s']:.3f} s")
+else:
+    matriz_similitud = matriz_jaccard(sets_de_palabras)
 
 print("Matriz de similitud calculada (primeras 5x5 filas/columnas):")
 print(np.round(matriz_similitud[:5, :5], 2))
 
+# 4. Pares de similitud en disco
+# Las estadísticas por categoría (estadisticas_similitud.py: una pasada por los pares con
+# np.bincount sobre las etiquetas) y el informe de pares más similares leen los pares i < j
+# de un archivo (formato COO en `.npy` mapeados en memoria). Aquí los pares salen de la
+# matriz ya calculada (`guardar_matriz`), sin volver a calcular Jaccard. En corpus grandes,
+# donde la matriz densa no cabe (80 GB con 100.000 documentos), `escribir_pares`
+# (similitud_bloques.py) los calcula por bloques con memoria acotada en un pool de procesos.
+# Se guardan los pares con similitud > 0 (los nulos cuentan como ceros en las estadísticas).
+with tempfile.TemporaryDirectory() as directorio_pares:
+    if resultado_cache:
+        pares = resultado_cache.escribir_pares(directorio_pares)
+    else:
+        pares = guardar_matriz(directorio_pares, matriz_similitud)
+    print(f"Pares guardados en disco: {len(pares)}")
+    estadisticas = pares.estadisticas(categoria_de_documento)
+    pares_ordenados = pares.top(6)
+    pares.cerrar()
+
+resumen_categorias = estadisticas.por_categoria()
+similitud_intra = resumen_categorias['media_intra'].to_numpy()
+similitud_inter = resumen_categorias['media_inter'].to_numpy()
+bordes_histograma, histograma_intra, histograma_inter = estadisticas.histogramas()
+media_intra_global, media_inter_global = estadisticas.medias_globales()
+print("\nEstadísticas por categoría:")
+print(resumen_categorias[['categoria', 'documentos', 'media_intra', 'media_inter']].round(3).to_string(index=False))
+
 # --- VISUALIZACIÓN ---
 
 print("\nGenerando visualizaciones...")
@@ -163,22 +203,9 @@ ax1.set_yticklabels(etiquetas, rotation=0, fontsize=8)
 # --- GRÁFICO 2: Similitud promedio por categoría (barras agrupadas) ---
 ax2 = fig.add_subplot(2, 2, 2)
 
-# Calcular similitud promedio intra-categoría y entre-categorías
-categorias_nombres = ["Fútbol", "Tecnología", "Cocina"]
-similitud_intra = []
-similitud_inter = []
-
-for cat_idx in range(3):
-    inicio = cat_idx * 3
-    fin = inicio + 3
-    # Similitud dentro de la misma categoría (excluyendo diagonal)
-    bloque = matriz_similitud[inicio:fin, inicio:fin]
-    mask_diag = ~np.eye(3, dtype=bool)
-    similitud_intra.append(bloque[mask_diag].mean())
-
-    # Similitud con otras categorías
-    otros_indices = [i for i in range(9) if i < inicio or i >= fin]
-    similitud_inter.append(matriz_similitud[inicio:fin, otros_indices].mean())
+# Similitud promedio intra-categoría y entre-categorías (calculada en el paso 4 a partir
+# de los pares en disco: la media intra excluye la diagonal)
+categorias_nombres = list(resumen_categorias['categoria'])
 
 x = np.arange(len(categorias_nombres))
 width = 0.35
@@ -206,42 +233,26 @@ for bar in bars2:
 # --- GRÁFICO 3: Distribución de similitudes (histograma) ---
 ax3 = fig.add_subplot(2, 2, 3)
 
-# Extraer valores del triángulo inferior (sin diagonal)
-indices_tril = np.tril_indices(num_frases, k=-1)
-similitudes_unicas = matriz_similitud[indices_tril]
-
-# Separar similitudes intra e inter categoría
-similitudes_intra_todas = []
-similitudes_inter_todas = []
-
-for i, j in zip(indices_tril[0], indices_tril[1]):
-    cat_i = i // 3
-    cat_j = j // 3
-    if cat_i == cat_j:
-        similitudes_intra_todas.append(matriz_similitud[i, j])
-    else:
-        similitudes_inter_todas.append(matriz_similitud[i, j])
-
-ax3.hist(similitudes_intra_todas, bins=8, alpha=0.7, label='Misma categoría', color='#e74c3c', edgecolor='black')
-ax3.hist(similitudes_inter_todas, bins=8, alpha=0.7, label='Diferente categoría', color='#3498db', edgecolor='black')
+# Histogramas de los pares (sin diagonal) ya agregados en el paso 4: se dibujan con `weights`
+# en lugar de pasar cada similitud. Los 8 intervalos son fijos en [0, 1] e iguales para las
+# dos series (se acumulan por bloques sin conocer antes el mínimo y el máximo), así que las
+# barras no coinciden con las de `hist(similitudes, bins=8)`, que ajustaba el rango a cada serie.
+ax3.hist(bordes_histograma[:-1], bins=bordes_histograma, weights=histograma_intra, alpha=0.7,
+         label='Misma categoría', color='#e74c3c', edgecolor='black')
+ax3.hist(bordes_histograma[:-1], bins=bordes_histograma, weights=histograma_inter, alpha=0.7,
+         label='Diferente categoría', color='#3498db', edgecolor='black')
 ax3.set_xlabel('Similitud de Jaccard')
 ax3.set_ylabel('Frecuencia')
 ax3.set_title('Distribución de Similitudes', fontsize=11)
 ax3.legend()
-ax3.axvline(x=np.mean(similitudes_intra_todas), color='#c0392b', linestyle='--', linewidth=2)
-ax3.axvline(x=np.mean(similitudes_inter_todas), color='#2980b9', linestyle='--', linewidth=2)
+ax3.axvline(x=media_intra_global, color='#c0392b', linestyle='--', linewidth=2)
+ax3.axvline(x=media_inter_global, color='#2980b9', linestyle='--', linewidth=2)
 
 # --- GRÁFICO 4: Clustermap / Dendrograma con mapa de calor ---
 ax4 = fig.add_subplot(2, 2, 4)
 
 # Mostrar las palabras compartidas entre documentos de alta similitud
-# Encontrar los pares más similares (excluyendo diagonal)
-pares_similitud = []
-for i in range(num_frases):
-    for j in range(i+1, num_frases):
-        pares_similitud.append((i, j, matriz_similitud[i, j]))
-
-pares_ordenados = sorted(pares_similitud, key=lambda x: x[2], reverse=True)[:6]
+# Los 6 pares más similares (excluyendo diagonal) salen de los pares en disco (paso 4)
 
 # Crear texto para mostrar
 texto_pares = "TOP 6 PARES MÁS SIMILARES:\n" + "="*40 + "\n\n"
@@ -265,16 +276,21 @@ plt.savefig('analisis_jaccard_completo.png', dpi=300, bbox_inches='tight')
 plt.show()
 
 # --- GRÁFICO ADICIONAL: Clustermap con dendrograma ---
+# El enlace jerárquico se calcula una vez sobre la distancia 1 - Jaccard en forma condensada,
+# tomada de la matriz que ya tenemos (clustering_jerarquico.py), y el clustermap lo reutiliza
+# en filas y columnas, en lugar de recalcular distancias euclídeas sobre la matriz. Con
+# corpus grandes `agrupar` enlaza solo una muestra y el clustermap dibuja esa muestra.
+# Las celdas solo se anotan en corpus pequeños.
 print("\nGenerando clustermap con dendrograma...")
-g = sns.clustermap(matriz_similitud,
-                   annot=True,
-                   cmap='coolwarm',
-                   fmt=".2f",
-                   xticklabels=etiquetas,
-                   yticklabels=etiquetas,
-                   figsize=(10, 8),
-                   dendrogram_ratio=0.15,
-                   cbar_pos=(0.02, 0.8, 0.03, 0.15))
+grupos, muestra, enlace_documentos = agrupar(sets_de_palabras, len(categorias), matriz_similitud=matriz_similitud)
+print(f"Grupos jerárquicos ({len(categorias)}): {grupos.tolist()}")
+g = dibujar_clustermap(matriz_similitud,
+                       enlace_documentos,
+                       etiquetas,
+                       muestra=muestra,
+                       figsize=(10, 8),
+                       dendrogram_ratio=0.15,
+                       cbar_pos=(0.02, 0.8, 0.03, 0.15))
 g.figure.suptitle('Clustermap: Agrupación Jerárquica por Similitud', fontsize=12, y=1.02)
 plt.savefig('clustermap_ejercicio.png', dpi=300, bbox_inches='tight')
 plt.show()
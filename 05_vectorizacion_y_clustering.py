@@ -21,65 +21,122 @@ REFERENCIA ACADÉMICA:
 # Generaremos un corpus sintético de 1200 documentos en español distribuidos en 4 temas 
 # para asegurar que el algoritmo de Clustering tenga material suficiente para trabajar.
 
+import argparse
 import matplotlib.pyplot as plt
+import multiprocessing
 import numpy as np
 import random
+import shutil
+import tempfile
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
+from clustering_streaming import agrupar_en_flujo
+from reduccion_dimensional import coordenadas_grafico
+from modelo_clustering import cargar_modelo, guardar_modelo
+from seleccion_k import seleccionar_k
+
+# Modo streaming: `python 05_vectorizacion_y_clustering.py corpus.txt ...` (un documento por línea)
+# vectoriza con hashing y entrena MiniBatchKMeans por lotes, sin cargar el corpus en memoria.
+# Con `--seleccionar-k` el número de clusters se elige automáticamente (silueta) en vez de fijarlo.
+# Con `--guardar-modelo` el modelo entrenado se conserva en 05_modelo_clustering/ (una versión
+# nueva por ejecución); sin él se guarda en una carpeta temporal que se borra al terminar.
+# Ambas opciones son solo para el dataset sintético (TF-IDF + K-Means), no para el modo streaming.
+parser = argparse.ArgumentParser(description="Ejercicio 5: vectorización y clustering de documentos.")
+parser.add_argument('fuentes', nargs='*', help="archivos de texto (un documento por línea) para el modo streaming")
+parser.add_argument('--seleccionar-k', action='store_true', help="elegir k automáticamente (silueta)")
+parser.add_argument('--guardar-modelo', action='store_true', help="conservar el modelo en 05_modelo_clustering/")
+args = parser.parse_args()
+if args.fuentes and (args.seleccionar_k or args.guardar_modelo):
+    parser.error("--seleccionar-k y --guardar-modelo no se pueden usar en el modo streaming (con archivos)")
+fuentes, seleccionar, guardar = args.fuentes, args.seleccionar_k, args.guardar_modelo
 
 # --- 1. GENERACIÓN DE BIG DATA SINTÉTICO ---
-print("Paso 1: Generando dataset sintético de 1200 documentos...")
-
-temas = {
-    "Tecnología": ["procesador", "software", "algoritmo", "nube", "datos", "inteligencia artificial", "python", "hardware", "sistema", "redes"],
-    "Finanzas": ["mercado", "inversión", "bolsa", "acciones", "economía", "banco", "interés", "crédito", "ahorro", "finanzas"],
-    "Salud": ["paciente", "hospital", "médico", "tratamiento", "enfermedad", "diagnóstico", "salud", "vacuna", "terapia", "clínica"],
-    "Viajes": ["turismo", "hotel", "vuelo", "playa", "montaña", "vacaciones", "pasaporte", "maleta", "guía", "aventura"]
-}
-
-corpus = []
-labels_reales = []
-
-for i, (tema, palabras) in enumerate(temas.items()):
-    for _ in range(300): # 300 documentos por tema = 1200 total
-        # Creamos una "frase" aleatoria usando palabras del tema
-        n_palabras = random.randint(5, 15)
-        frase = " ".join(random.choices(palabras, k=n_palabras))
-        corpus.append(frase)
-        labels_reales.append(i)
-
-print(f"Dataset generado con {len(corpus)} documentos.")
-
-# --- 2. VECTORIZACIÓN (TF-IDF) ---
-print("\nPaso 2: Vectorizando con TF-IDF...")
-# Usamos stop_words=None porque ya son solo palabras clave, pero en un caso real usaríamos 'spanish'
-vectorizer = TfidfVectorizer(max_features=500)
-tfidf_matrix = vectorizer.fit_transform(corpus)
-
-print(f"Dimensiones de la matriz TF-IDF: {tfidf_matrix.shape}")
-
-# --- 3. CLUSTERING (K-MEANS) ---
 num_clusters = 4
-print(f"\nPaso 3: Aplicando K-Means (k={num_clusters})...")
-kmeans = KMeans(n_clusters=num_clusters, random_state=42, n_init=10)
-kmeans.fit(tfidf_matrix)
-clusters = kmeans.labels_
+
+if fuentes:
+    print(f"Modo streaming: agrupando los documentos de {', '.join(fuentes)} por lotes...")
+    modelo = agrupar_en_flujo(fuentes, n_clusters=num_clusters)
+    n_documentos = modelo.n_documentos
+    print(f"Documentos procesados: {n_documentos}")
+    # Para el gráfico basta una muestra de documentos (solo con las columnas que usan)
+    tfidf_matrix, clusters = modelo.matriz_muestra()
+    print(f"Muestra para visualizar: {tfidf_matrix.shape[0]} documentos")
+    top_palabras = modelo.terminos_principales(10)
+else:
+    print("Paso 1: Generando dataset sintético de 1200 documentos...")
+
+    temas = {
+        "Tecnología": ["procesador", "software", "algoritmo", "nube", "datos", "inteligencia artificial", "python", "hardware", "sistema", "redes"],
+        "Finanzas": ["mercado", "inversión", "bolsa", "acciones", "economía", "banco", "interés", "crédito", "ahorro", "finanzas"],
+        "Salud": ["paciente", "hospital", "médico", "tratamiento", "enfermedad", "diagnóstico", "salud", "vacuna", "terapia", "clínica"],
+        "Viajes": ["turismo", "hotel", "vuelo", "playa", "montaña", "vacaciones", "pasaporte", "maleta", "guía", "aventura"]
+    }
+
+    corpus = []
+    labels_reales = []
+
+    for i, (tema, palabras) in enumerate(temas.items()):
+        for _ in range(300): # 300 documentos por tema = 1200 total
+            # Creamos una "frase" aleatoria usando palabras del tema
+            n_palabras = random.randint(5, 15)
+            frase = " ".join(random.choices(palabras, k=n_palabras))
+            corpus.append(frase)
+            labels_reales.append(i)
+
+    n_documentos = len(corpus)
+    print(f"Dataset generado con {n_documentos} documentos.")
+
+    # --- 2. VECTORIZACIÓN (TF-IDF) ---
+    print("\nPaso 2: Vectorizando con TF-IDF...")
+    # Usamos stop_words=None porque ya son solo palabras clave, pero en un caso real usaríamos 'spanish'
+    vectorizer = TfidfVectorizer(max_features=500)
+    tfidf_matrix = vectorizer.fit_transform(corpus)
+
+    print(f"Dimensiones de la matriz TF-IDF: {tfidf_matrix.shape}")
+
+    # --- 3. CLUSTERING (K-MEANS) ---
+    if seleccionar:
+        print("\nPaso 3: Eligiendo k entre 2 y 8 (reinicios de K-Means en paralelo)...")
+        # Este script no está protegido por `if __name__ == '__main__':`, así que el pool solo
+        # puede arrancar procesos con 'fork'; donde no existe (Windows) se usa un solo proceso
+        if 'fork' in multiprocessing.get_all_start_methods():
+            opciones_pool = {'mp_context': multiprocessing.get_context('fork')}
+        else:
+            opciones_pool = {'workers': 1}
+        seleccion = seleccionar_k(tfidf_matrix, range(2, 9), n_init=10, semilla=42, **opciones_pool)
+        print(seleccion.informe.to_string(index=False, float_format='%.3f'))
+        num_clusters, kmeans = seleccion.k, seleccion.modelo
+        print(f"k elegido: {num_clusters} ({seleccion.tiempo_total_s:.1f} s)")
+    else:
+        print(f"\nPaso 3: Aplicando K-Means (k={num_clusters})...")
+        kmeans = KMeans(n_clusters=num_clusters, random_state=42, n_init=10)
+        kmeans.fit(tfidf_matrix)
+    clusters = kmeans.labels_
+    nombres_palabras = vectorizer.get_feature_names_out()
+
+    top_palabras = [[nombres_palabras[idx] for idx in fila[:10]]
+                    for fila in kmeans.cluster_centers_.argsort()[:, ::-1]]
+
+    # Guardamos vocabulario, IDF y centroides para asignar documentos nuevos sin reentrenar
+    directorio_modelo = "05_modelo_clustering" if guardar else tempfile.mkdtemp(prefix="05_modelo_")
+    ruta_modelo = guardar_modelo(directorio_modelo, vectorizer, kmeans, {"temas": list(temas)})
+    print(f"Modelo guardado en: {ruta_modelo}")
 
 # --- 4. REDUCCIÓN DE DIMENSIONALIDAD (PCA) ---
 print("\nPaso 4: Reduciendo a 2D para visualización...")
-pca = PCA(n_components=2, random_state=42)
-coords = pca.fit_transform(tfidf_matrix.toarray())
+# LSA (TruncatedSVD sobre la matriz dispersa) + PCA a 2D, sin `toarray()`; con muchos
+# documentos solo se dibuja una muestra
+coords, clusters_grafico, _ = coordenadas_grafico(tfidf_matrix, clusters)
 
 # --- 5. VISUALIZACIÓN ---
 print("\nPaso 5: Generando gráfico premium...")
 
 plt.figure(figsize=(12, 8))
 # Usamos una paleta de colores vibrante
-scatter = plt.scatter(coords[:, 0], coords[:, 1], c=clusters, cmap='Spectral', alpha=0.7, s=30, edgecolors='k', linewidth=0.5)
+scatter = plt.scatter(coords[:, 0], coords[:, 1], c=clusters_grafico, cmap='Spectral', alpha=0.7, s=30, edgecolors='k', linewidth=0.5)
 
 plt.colorbar(scatter, label='ID del Cluster')
-plt.title('Clustering de Documentos: Análisis de Tópicos Automático\n(1200 documentos en Español)', fontsize=16, fontweight='bold')
+plt.title(f'Clustering de Documentos: Análisis de Tópicos Automático\n({n_documentos} documentos en Español)', fontsize=16, fontweight='bold')
 plt.xlabel('Componente Principal 1 (PCA)', fontsize=12)
 plt.ylabel('Componente Principal 2 (PCA)', fontsize=12)
 plt.grid(True, linestyle='--', alpha=0.6)
@@ -93,11 +150,18 @@ plt.show()
 
 # --- 6. TOP PALABRAS POR CLUSTER ---
 print("\n--- PALABRAS DOMINANTES POR CLUSTER ---")
-indices_centros = kmeans.cluster_centers_.argsort()[:, ::-1]
-nombres_palabras = vectorizer.get_feature_names_out()
-
-for i in range(num_clusters):
-    top_10 = [nombres_palabras[idx] for idx in indices_centros[i, :10]]
+for i, top_10 in enumerate(top_palabras):
     print(f"Cluster {i}: {', '.join(top_10)}")
 
+if not fuentes:
+    # --- 7. ASIGNACIÓN DE DOCUMENTOS NUEVOS CON EL MODELO GUARDADO ---
+    print("\n--- ASIGNACIÓN CON EL MODELO GUARDADO ---")
+    modelo = cargar_modelo(directorio_modelo)
+    nuevos = ["el médico revisó al paciente en el hospital", "compré acciones en la bolsa"]
+    for documento, cluster in zip(nuevos, modelo.asignar(nuevos)):
+        print(f"'{documento}' -> Cluster {cluster}")
+    if not guardar:
+        del modelo  # suelta los .npy mapeados antes de borrar la carpeta
+        shutil.rmtree(directorio_modelo, ignore_errors=True)
+
 print("\n--- FIN DEL EJERCICIO 5 ---")
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from streamlit_lottie import st_lottie
-import requests
+from datos_titanic import ARCHIVO_CSV, DIRECTORIO_DATOS, URL_LOTTIE_BARCO, cargar_titanic, obtener_json_remoto
 
 # --- Configuración de la Página ---
 st.set_page_config(
@@ -63,31 +63,31 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # --- Función para Cargar Lottie ---
-@st.cache_data
+# Sin st.cache_data: se lee de la caché en disco (datos_titanic.py) y, si aún no está
+# descargada, devuelve None al momento y la descarga sigue en segundo plano
 def load_lottieurl(url: str):
-    try:
-        r = requests.get(url, timeout=5)
-        if r.status_code != 200:
-            return None
-        return r.json()
-    except:
-        return None
+    return obtener_json_remoto(url)
 
 # --- Cargar Datos ---
+# CSV local convertido una vez en una instantánea Feather tipada (mapeada en memoria)
 @st.cache_data
 def load_data():
-    url = "https://raw.githubusercontent.com/datasciencedojo/datasets/master/titanic.csv"
-    df = pd.read_csv(url)
-    return df
+    return cargar_titanic()
 
-data = load_data()
+try:
+    data = load_data()
+except OSError as error:  # sin CSV local y sin red para la primera descarga
+    st.error(f"No se pudo cargar el dataset del Titanic ({error}). Descarga `titanic.csv` y "
+             f"guárdalo en `{DIRECTORIO_DATOS}/{ARCHIVO_CSV}`, o indica su ruta con la variable "
+             "de entorno `TITANIC_CSV` (p. ej. `TITANIC_CSV=/ruta/titanic.csv streamlit run 06_Titanic_Dashboard.py`).")
+    st.stop()
 
 # --- Barra Lateral (Sidebar) ---
 st.sidebar.header("🎛️ Filtros del Tablero")
 
 # Animación Lottie en Sidebar
 # URL Alternativa: Un barco en el mar (animación más simple y fiable)
-lottie_url = "https://lottie.host/5a70498a-5309-4ffc-a335-512cb5954605/5G7e8M5g2L.json" 
+lottie_url = URL_LOTTIE_BARCO
 # Si falla, usaremos un emoji gigante como fallback
 lottie_ship = load_lottieurl(lottie_url)
 
@@ -99,20 +99,20 @@ with st.sidebar:
 
 pclass = st.sidebar.multiselect(
     "Clase del Pasajero (Pclass)",
-    options=sorted(data['Pclass'].unique()),
-    default=sorted(data['Pclass'].unique())
+    options=list(data['Pclass'].cat.categories),
+    default=list(data['Pclass'].cat.categories)
 )
 
 sex = st.sidebar.multiselect(
     "Género (Sex)",
-    options=data['Sex'].unique(),
-    default=data['Sex'].unique()
+    options=list(data['Sex'].cat.categories),
+    default=list(data['Sex'].cat.categories)
 )
 
 embarked = st.sidebar.multiselect(
     "Puerto de Embarque",
-    options=data['Embarked'].unique(),
-    default=data['Embarked'].dropna().unique()
+    options=list(data['Embarked'].cat.categories),
+    default=list(data['Embarked'].cat.categories)
 )
 
 age_range = st.sidebar.slider(
@@ -0,0 +1,181 @@
+"""
+Capa de análisis con caché para el dashboard de conteo (01_Dashboard_conteo.py).
+
+Cada clic en "Iniciar Análisis" (y cada rerun de Streamlit) volvía a tokenizar, contar y
+construir los DataFrames aunque el texto y la configuración no hubieran cambiado. Aquí:
+
+- `CacheLRU`: caché LRU acotada a la vez por número de entradas y por bytes estimados,
+  con contadores de aciertos, fallos y expulsiones. Es segura entre hilos (Streamlit
+  atiende cada sesión en un hilo distinto).
+- `CacheAnalisis`: guarda, por sha256 del texto, un `AnalisisIncremental` con el conteo
+  en bruto; las secciones de conteo y de limpieza se derivan de él filtrando el
+  vocabulario, así que cambiar idioma, min_len o stopwords no vuelve a tokenizar el
+  texto. Las nubes de palabras las dibuja y guarda `ServicioNubes` (nube_palabras.py),
+  con su propia `CacheLRU`.
+
+El dashboard crea una sola `CacheAnalisis` compartida con `st.cache_resource` y muestra
+los contadores en la barra lateral.
+
+Uso desde consola (benchmark de aciertos frente a recalcular):
+    python analisis_cache.py --kb 200
+"""
+
+import argparse
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from analisis_incremental import AnalisisIncremental
+
+MAX_ENTRADAS = 128
+MAX_MB_RESULTADOS = 64
+
+
+# --- CACHÉ LRU ---
+
+class CacheLRU:
+    """Caché LRU acotada por número de entradas y por tamaño total (bytes estimados)."""
+
+    def __init__(self, max_entradas=MAX_ENTRADAS, max_bytes=MAX_MB_RESULTADOS << 20):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()  # clave -> (valor, bytes)
+        self._bytes = 0
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, clave):
+        return clave in self._entradas
+
+    def obtener(self, clave, defecto=None):
+        with self._candado:
+            if clave not in self._entradas:
+                self.fallos += 1
+                return defecto
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return self._entradas[clave][0]
+
+    def guardar(self, clave, valor, tamano):
+        """Inserta `valor` (que ocupa `tamano` bytes) y expulsa los menos usados si hace falta."""
+        if tamano > self.max_bytes:
+            return  # no cabe ni sola: no se guarda
+        with self._candado:
+            if clave in self._entradas:
+                self._bytes -= self._entradas.pop(clave)[1]
+            self._entradas[clave] = (valor, tamano)
+            self._bytes += tamano
+            while len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes:
+                _, (_, liberado) = self._entradas.popitem(last=False)
+                self._bytes -= liberado
+                self.expulsiones += 1
+
+    def obtener_o_calcular(self, clave, funcion, medir):
+        """Devuelve el valor en caché o lo calcula con `funcion()` y lo guarda (`medir(valor)` = bytes)."""
+        valor = self.obtener(clave)
+        if valor is None:
+            valor = funcion()
+            self.guardar(clave, valor, medir(valor))
+        return valor
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self._entradas),
+            'mb': self._bytes / (1 << 20),
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'expulsiones': self.expulsiones,
+            'tasa_acierto': self.aciertos / consultas if consultas else 0.0,
+        }
+
+
+# --- ANÁLISIS ---
+
+def huella_texto(texto):
+    """sha256 del texto (UTF-8): clave compacta aunque el texto ocupe megabytes."""
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+class CacheAnalisis:
+    """Análisis por texto en una caché LRU; cada configuración se deriva del mismo análisis."""
+
+    def __init__(self, max_entradas=MAX_ENTRADAS, max_mb=MAX_MB_RESULTADOS):
+        self.resultados = CacheLRU(max_entradas, max_mb << 20)
+
+    def analisis(self, texto):
+        """`AnalisisIncremental` del texto: se tokeniza una sola vez por texto, sea cual sea la configuración."""
+        return self.resultados.obtener_o_calcular(
+            ('analisis', huella_texto(texto)), lambda: AnalisisIncremental.desde_texto(texto),
+            AnalisisIncremental.tamano_bytes)
+
+    def conteo(self, texto):
+        return self.analisis(texto).resumen()
+
+    def limpieza(self, texto, stopwords, min_len, limpiar_stopwords):
+        # O(vocabulario): solo cambia la máscara aplicada sobre el conteo en bruto
+        return self.analisis(texto).resumen(stopwords if limpiar_stopwords else None, min_len)
+
+    def estadisticas(self):
+        return {'resultados': self.resultados.estadisticas()}
+
+
+# --- BENCHMARK ---
+
+if __name__ == '__main__':
+    import pandas as pd
+
+    from conteo_fusionado import contar_filtrado, generar_corpus_sintetico
+
+    def analizar_limpieza(texto, stopwords, min_len, limpiar_stopwords):
+        """Sección "Limpieza texto/palabra" sin caché, como la calculaba antes el dashboard."""
+        word_counts_raw, total_raw = contar_filtrado(texto)
+        word_counts_clean, total_clean = contar_filtrado(texto, stopwords if limpiar_stopwords else None, min_len)
+        return {
+            'total_raw': total_raw,
+            'total_clean': total_clean,
+            'porc_ruido': ((total_raw - total_clean) / total_raw * 100) if total_raw > 0 else 0,
+            'top_raw': pd.DataFrame(word_counts_raw.most_common(10), columns=["Palabra", "Frecuencia"]),
+            'top_clean': pd.DataFrame(word_counts_clean.most_common(10), columns=["Palabra", "Frecuencia"]),
+        }
+
+    parser = argparse.ArgumentParser(description="Benchmark de la caché de análisis del dashboard.")
+    parser.add_argument('--kb', type=int, default=200, help="tamaño del texto analizado")
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    texto = generar_corpus_sintetico(1)[:args.kb * 1024]
+    stopwords = {'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los'}
+    cache = CacheAnalisis()
+
+    inicio = time.perf_counter()
+    for _ in range(args.repeticiones):
+        analizar_limpieza(texto, stopwords, 3, True)
+    t_sin_cache = (time.perf_counter() - inicio) / args.repeticiones
+
+    inicio = time.perf_counter()
+    for _ in range(args.repeticiones):
+        cache.limpieza(texto, stopwords, 3, True)
+    t_con_cache = (time.perf_counter() - inicio) / args.repeticiones
+
+    inicio = time.perf_counter()
+    for min_len in range(1, args.repeticiones + 1):
+        cache.limpieza(texto, stopwords, min_len, True)
+    t_slider = (time.perf_counter() - inicio) / args.repeticiones
+
+    print(f"Texto de {len(texto) / 1024:.0f} KB, {args.repeticiones} reruns con la misma configuración")
+    print(f"Sin caché : {t_sin_cache * 1000:.1f} ms por rerun")
+    print(f"Con caché : {t_con_cache * 1000:.1f} ms por rerun (incluye el sha256 del texto)")
+    print(f"Moviendo el slider min_len: {t_slider * 1000:.1f} ms por rerun")
+    print(f"Estadísticas: {cache.estadisticas()['resultados']}")
@@ -0,0 +1,149 @@
+"""
+Análisis incremental: conteos limpios derivados del conteo en bruto filtrando el vocabulario.
+
+En la sección "Limpieza texto/palabra" del dashboard, mover el slider `min_len` o
+activar las stopwords volvía a ejecutar `re.findall` sobre todo el texto. Pero el conteo
+en bruto ya lo contiene todo: el conteo limpio es un filtro sobre el vocabulario.
+
+`AnalisisIncremental` guarda el conteo en bruto de un documento como arreglos NumPy
+paralelos al vocabulario (palabra, frecuencia y longitud de cada palabra). Cada cambio de
+configuración es una máscara booleana sobre el vocabulario, O(vocabulario) en lugar de
+O(tokens): totales, `% Ruido Eliminado` y top 10 salen de sumas y selecciones
+vectorizadas. Las máscaras de stopwords se guardan por conjunto de stopwords (como mucho
+`MAX_MASCARAS_STOPWORDS`, ya contadas en `tamano_bytes` para que el tamaño que mide la
+caché no crezca después).
+
+Uso desde consola (benchmark con un texto de 10 MB):
+    python analisis_incremental.py --mb 10
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from conteo_fusionado import contar_filtrado
+
+TOP_N = 10
+MAX_PALABRAS_NUBE = 200  # como `WordCloud(max_words=200)`
+MAX_MASCARAS_STOPWORDS = 4  # conjuntos de stopwords recordados por documento
+
+
+class AnalisisIncremental:
+    """Conteo en bruto de un documento con filtros (stopwords, longitud) aplicados al vocabulario."""
+
+    def __init__(self, conteo_bruto):
+        # Mismo orden que el Counter: los empates de `most_common` se resuelven igual
+        self.palabras = np.array(list(conteo_bruto), dtype=object)
+        self.frecuencias = np.fromiter(conteo_bruto.values(), dtype=np.int64, count=len(conteo_bruto))
+        self.longitudes = np.fromiter(map(len, conteo_bruto), dtype=np.int64, count=len(conteo_bruto))
+        self.total_bruto = int(self.frecuencias.sum())
+        self._stopwords = {}  # frozenset(stopwords) -> máscara de palabras que son stopword (orden de uso)
+
+    @classmethod
+    def desde_texto(cls, texto):
+        conteo_bruto, _ = contar_filtrado(texto)
+        return cls(conteo_bruto)
+
+    def __len__(self):
+        return len(self.palabras)
+
+    def tamano_bytes(self):
+        """Memoria aproximada: las cadenas del vocabulario, los arreglos paralelos y el espacio
+        máximo de las máscaras de stopwords (aunque aún no se hayan calculado)."""
+        return (sum(map(sys.getsizeof, self.palabras)) + self.palabras.nbytes + self.frecuencias.nbytes + self.longitudes.nbytes
+                + MAX_MASCARAS_STOPWORDS * len(self.palabras) * np.dtype(bool).itemsize)
+
+    # --- FILTROS SOBRE EL VOCABULARIO ---
+
+    def _mascara_stopwords(self, stopwords):
+        clave = frozenset(stopwords)
+        mascara = self._stopwords.pop(clave, None)
+        if mascara is None:
+            if len(self._stopwords) >= MAX_MASCARAS_STOPWORDS:
+                del self._stopwords[next(iter(self._stopwords))]  # la usada hace más tiempo
+            mascara = np.fromiter((p in clave for p in self.palabras), dtype=bool, count=len(self.palabras))
+        self._stopwords[clave] = mascara
+        return mascara
+
+    def mascara(self, stopwords=None, min_len=1):
+        """Palabras del vocabulario que pasan los filtros (mismo criterio que `contar_filtrado`)."""
+        mascara = self.longitudes >= min_len
+        if stopwords:
+            mascara &= ~self._mascara_stopwords(stopwords)
+        return mascara
+
+    def top(self, n=TOP_N, mascara=None):
+        """Las `n` palabras más frecuentes (lista de pares, como `Counter.most_common(n)`)."""
+        indices = np.arange(len(self.palabras)) if mascara is None else np.flatnonzero(mascara)
+        if len(indices) > n:
+            # Umbral = n-ésima frecuencia; se conservan todos los empates con él para que el
+            # orden estable (orden de inserción) sea el de `most_common`
+            umbral = np.partition(self.frecuencias[indices], len(indices) - n)[len(indices) - n]
+            indices = indices[self.frecuencias[indices] >= umbral]
+        orden = indices[np.argsort(-self.frecuencias[indices], kind='stable')[:n]]
+        return list(zip(self.palabras[orden].tolist(), self.frecuencias[orden].tolist()))
+
+    def conteo_limpio(self, stopwords=None, min_len=1):
+        """`Counter` filtrado (igual al de `contar_filtrado(texto, stopwords, min_len)`)."""
+        mascara = self.mascara(stopwords, min_len)
+        return Counter(dict(zip(self.palabras[mascara].tolist(), self.frecuencias[mascara].tolist())))
+
+    def resumen(self, stopwords=None, min_len=1, top_n=TOP_N, max_palabras_nube=MAX_PALABRAS_NUBE):
+        """Métricas del dashboard (secciones de conteo y de limpieza) para una configuración."""
+        mascara = self.mascara(stopwords, min_len)
+        total_clean = int(self.frecuencias[mascara].sum())
+        top_raw = pd.DataFrame(self.top(top_n), columns=["Palabra", "Frecuencia"])
+        return {
+            'total': self.total_bruto,
+            'unicas': len(self.palabras),
+            'top': top_raw,
+            'total_raw': self.total_bruto,
+            'total_clean': total_clean,
+            'porc_ruido': ((self.total_bruto - total_clean) / self.total_bruto * 100) if self.total_bruto > 0 else 0,
+            'top_raw': top_raw,
+            'top_clean': pd.DataFrame(self.top(top_n, mascara), columns=["Palabra", "Frecuencia"]),
+            'frecuencias_nube': dict(self.top(max_palabras_nube, mascara)),
+        }
+
+
+# --- BENCHMARK ---
+
+if __name__ == '__main__':
+    from conteo_fusionado import generar_corpus_sintetico
+
+    parser = argparse.ArgumentParser(description="Benchmark del recálculo incremental de la limpieza.")
+    parser.add_argument('--mb', type=float, default=10)
+    args = parser.parse_args()
+
+    texto = generar_corpus_sintetico(args.mb)
+    stopwords = {'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'no', 'muy', 'es'}
+    configuraciones = [(stop, min_len) for min_len in range(1, 11) for stop in (None, stopwords)]
+
+    # Antes: cada cambio de slider vuelve a tokenizar y contar el texto (en bruto y limpio)
+    inicio = time.perf_counter()
+    referencia = []
+    for stop, min_len in configuraciones:
+        contar_filtrado(texto)
+        referencia.append(contar_filtrado(texto, stop, min_len))
+    t_texto = (time.perf_counter() - inicio) / len(configuraciones)
+
+    inicio = time.perf_counter()
+    analisis = AnalisisIncremental.desde_texto(texto)
+    t_inicial = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    resumenes = [analisis.resumen(stop, min_len) for stop, min_len in configuraciones]
+    t_incremental = (time.perf_counter() - inicio) / len(configuraciones)
+
+    iguales = all(r['total_clean'] == total and r['top_clean'].values.tolist() == [list(p) for p in conteo.most_common(TOP_N)]
+                  and analisis.conteo_limpio(stop, min_len) == conteo
+                  for r, (conteo, total), (stop, min_len) in zip(resumenes, referencia, configuraciones))
+    print(f"Texto de {len(texto) / 1e6:.0f} MB, {analisis.total_bruto} palabras, vocabulario de {len(analisis)}")
+    print(f"Recontar el texto por cambio de filtros : {t_texto * 1000:.0f} ms")
+    print(f"Conteo inicial (una vez por texto)      : {t_inicial * 1000:.0f} ms")
+    print(f"Filtrar el vocabulario por cambio       : {t_incremental * 1000:.2f} ms "
+          f"(x{t_texto / t_incremental:.0f}); resultados iguales: {iguales}")
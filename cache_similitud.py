@@ -0,0 +1,334 @@
+"""
+Caché persistente de similitudes de Jaccard, indexada por el contenido de cada documento.
+
+En las ejecuciones diarias del Ejercicio 4 casi todos los documentos son los mismos que
+el día anterior, pero se recalculan todos los pares. Aquí cada documento se identifica
+por una huella estable (SHA-256 de su conjunto de palabras ordenado) y las similitudes
+se guardan en SQLite, una fila por documento:
+
+    documentos(id, huella, vecinos, similitudes)
+
+`vecinos` y `similitudes` son arreglos binarios (int64 / float64) con los pares de
+similitud > 0 entre el documento y los que ya estaban antes que él (id menor). Así cada
+par se guarda una sola vez y cargar la caché es leer una fila por documento.
+
+En cada ejecución:
+  1. Los documentos que ya no están en el corpus se podan (sus pares desaparecen con su
+     fila, y las referencias que quedan en otras filas se compactan al cargar).
+  2. Solo se calculan los pares en los que interviene un documento nuevo o modificado
+     (su huella cambia), con las mismas primitivas que jaccard_disperso.py.
+  3. La matriz y los pares se reconstruyen con los valores de la caché más los nuevos.
+
+Como todos los documentos guardados se compararon entre sí, un par ausente de la tabla
+tiene similitud 0. Dos documentos con el mismo conjunto de palabras comparten huella.
+
+Uso desde consola (benchmark con un 5% de documentos modificados entre ejecuciones):
+    python cache_similitud.py --docs 5000 --cambios 0.05
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import time
+from itertools import combinations
+
+import numpy as np
+
+from jaccard_disperso import jaccard_bloque, matriz_binaria
+from similitud_bloques import guardar_pares
+
+CELDAS_POR_BLOQUE = 1 << 22  # filas x columnas calculadas de una vez (memoria acotada)
+
+
+def huella(conjunto):
+    """Huella estable (SHA-256) del conjunto de palabras, independiente de su orden."""
+    return hashlib.sha256('\x1f'.join(sorted(conjunto)).encode('utf-8')).digest()
+
+
+# --- RESULTADO DE UNA EJECUCIÓN ---
+
+class ResultadoCache:
+    """Similitudes del corpus actual, reconstruidas desde la caché y los pares nuevos.
+
+    Los pares (a, b, similitud) se refieren a huellas distintas (índices en `huellas`);
+    `inverso[i]` es la huella del documento i.
+    """
+
+    def __init__(self, huellas, inverso, filas, columnas, similitudes, estadisticas):
+        self.huellas = huellas
+        self.inverso = inverso
+        self.filas = filas
+        self.columnas = columnas
+        self.similitudes = similitudes
+        self.estadisticas = estadisticas
+
+    def matriz(self):
+        """Matriz de similitud densa (n x n), igual a la de `matriz_jaccard`."""
+        u = len(self.huellas)
+        matriz_unicos = np.eye(u)
+        matriz_unicos[self.filas, self.columnas] = self.similitudes
+        matriz_unicos[self.columnas, self.filas] = self.similitudes
+        return matriz_unicos[np.ix_(self.inverso, self.inverso)]
+
+    def pares_documentos(self):
+        """Pares (i, j, similitud) de documentos con i < j y similitud > 0 (sin orden particular)."""
+        if len(self.huellas) == len(self.inverso):
+            # Caso habitual: sin documentos repetidos, cada huella es un único documento
+            documento = np.empty(len(self.inverso), dtype=np.int64)
+            documento[self.inverso] = np.arange(len(self.inverso))
+            docs_a, docs_b = documento[self.filas], documento[self.columnas]
+            return np.minimum(docs_a, docs_b), np.maximum(docs_a, docs_b), self.similitudes
+
+        orden = np.argsort(self.inverso, kind='stable')
+        repeticiones = np.bincount(self.inverso, minlength=len(self.huellas))
+        inicios = np.cumsum(repeticiones) - repeticiones
+
+        # Cada par de huellas (a, b) se expande a todos sus documentos: rep[a] x rep[b] pares
+        por_par = repeticiones[self.filas] * repeticiones[self.columnas]
+        par = np.repeat(np.arange(len(self.similitudes)), por_par)
+        desplazamiento = np.arange(len(par)) - np.repeat(np.cumsum(por_par) - por_par, por_par)
+        a, b = self.filas[par], self.columnas[par]
+        docs_a = orden[inicios[a] + desplazamiento // repeticiones[b]]
+        docs_b = orden[inicios[b] + desplazamiento % repeticiones[b]]
+        similitudes = self.similitudes[par]
+
+        # Documentos repetidos (misma huella) tienen similitud 1.0 entre sí
+        repetidos = [combinations(orden[inicios[h]:inicios[h] + repeticiones[h]], 2)
+                     for h in np.flatnonzero(repeticiones > 1)]
+        if repetidos:
+            extra = np.array([p for grupo in repetidos for p in grupo], dtype=np.int64).reshape(-1, 2)
+            docs_a = np.concatenate([docs_a, extra[:, 0]])
+            docs_b = np.concatenate([docs_b, extra[:, 1]])
+            similitudes = np.concatenate([similitudes, np.ones(len(extra))])
+
+        return np.minimum(docs_a, docs_b), np.maximum(docs_a, docs_b), similitudes
+
+    def escribir_pares(self, directorio, umbral=None):
+        """Guarda los pares en el formato de similitud_bloques.py y devuelve un `ParesSimilitud`.
+
+        La caché no guarda pares nulos, así que `umbral` debe ser None (pares > 0) o positivo.
+        """
+        if umbral is not None and umbral <= 0:
+            raise ValueError("La caché solo contiene pares con similitud > 0: use umbral=None o un umbral positivo")
+        i, j, similitudes = self.pares_documentos()
+        if umbral is not None:
+            seleccion = similitudes >= umbral
+            i, j, similitudes = i[seleccion], j[seleccion], similitudes[seleccion]
+        return guardar_pares(directorio, len(self.inverso), i, j, similitudes, umbral)
+
+
+# --- CACHÉ EN SQLITE ---
+
+class CacheSimilitud:
+    """Almacén SQLite de similitudes entre documentos, indexado por huella de contenido."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.execute("""
+            CREATE TABLE IF NOT EXISTS documentos (
+                id INTEGER PRIMARY KEY, huella BLOB NOT NULL UNIQUE,
+                vecinos BLOB NOT NULL, similitudes BLOB NOT NULL
+            )""")
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def _podar(self, huellas):
+        """Elimina los documentos que ya no están en el corpus."""
+        cursor = self.conexion.cursor()
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS actuales (huella BLOB PRIMARY KEY) WITHOUT ROWID")
+        cursor.execute("DELETE FROM actuales")
+        cursor.executemany("INSERT INTO actuales VALUES (?)", ((h,) for h in huellas))
+        return cursor.execute("DELETE FROM documentos WHERE huella NOT IN (SELECT huella FROM actuales)").rowcount
+
+    def _cargar(self, posicion):
+        """Lee los pares guardados (índices de huella) y compacta las filas con vecinos podados."""
+        filas_guardadas = self.conexion.execute("SELECT id, huella, vecinos, similitudes FROM documentos").fetchall()
+        if not filas_guardadas:
+            vacio = np.array([], dtype=np.int64)
+            return {}, vacio, vacio, np.array([], dtype=np.float64)
+
+        ids_doc, huellas, vecinos, similitudes = zip(*filas_guardadas)
+        ids = np.array(ids_doc, dtype=np.int64)
+        indices = np.array([posicion[h] for h in huellas], dtype=np.int64)
+        longitudes = np.array([len(v) // 8 for v in vecinos], dtype=np.int64)
+        vecinos = np.frombuffer(b''.join(vecinos), dtype=np.int64)
+        similitudes = np.frombuffer(b''.join(similitudes), dtype=np.float64)
+
+        # Vecinos que siguen en la caché (los podados ya no tienen fila)
+        orden_ids = np.argsort(ids)
+        encontrados = orden_ids[np.minimum(np.searchsorted(ids, vecinos, sorter=orden_ids), len(ids) - 1)]
+        vivos = ids[encontrados] == vecinos
+        filas = np.repeat(indices, longitudes)
+
+        if not vivos.all():
+            # Se reescriben solo las filas que apuntaban a algún documento podado
+            fila_de_par = np.repeat(np.arange(len(ids)), longitudes)
+            limites = np.cumsum(longitudes)
+            compactadas = []
+            for fila in np.unique(fila_de_par[~vivos]).tolist():
+                tramo = slice(limites[fila] - longitudes[fila], limites[fila])
+                conservar = vivos[tramo]
+                compactadas.append((vecinos[tramo][conservar].tobytes(),
+                                    similitudes[tramo][conservar].tobytes(), ids_doc[fila]))
+            self.conexion.executemany("UPDATE documentos SET vecinos = ?, similitudes = ? WHERE id = ?",
+                                      compactadas)
+
+        return (dict(zip(indices.tolist(), ids_doc)), filas[vivos], indices[encontrados[vivos]],
+                similitudes[vivos])
+
+    def actualizar(self, conjuntos):
+        """Sincroniza la caché con el corpus actual y devuelve un `ResultadoCache`."""
+        inicio = time.perf_counter()
+        huellas_docs = [huella(c) for c in conjuntos]
+        posicion = {}
+        inverso = np.fromiter((posicion.setdefault(h, len(posicion)) for h in huellas_docs),
+                              dtype=np.int64, count=len(huellas_docs))
+        huellas = list(posicion)
+        unicos = [None] * len(huellas)
+        for conjunto, indice in zip(conjuntos, inverso.tolist()):
+            unicos[indice] = conjunto
+
+        with self.conexion:
+            podados = self._podar(huellas)
+            id_de_indice, cache_filas, cache_columnas, cache_similitudes = self._cargar(posicion)
+            nuevos = np.array([i for i in range(len(huellas)) if i not in id_de_indice], dtype=np.int64)
+
+            inicio_calculo = time.perf_counter()
+            filas, columnas, similitudes = self._calcular_nuevos(unicos, nuevos)
+            t_calculo = time.perf_counter() - inicio_calculo
+            self._guardar_nuevos(huellas, nuevos, id_de_indice, filas, columnas, similitudes)
+
+        u, k = len(huellas), len(huellas) - len(nuevos)
+        pares_totales = u * (u - 1) // 2
+        pares_cache = k * (k - 1) // 2
+        pares_calculados = pares_totales - pares_cache
+        estadisticas = {
+            'documentos': len(conjuntos),
+            'huellas_distintas': u,
+            'nuevos': len(nuevos),
+            'podados': podados,
+            'pares_cache': pares_cache,
+            'pares_calculados': pares_calculados,
+            'tasa_acierto': pares_cache / pares_totales if pares_totales else 1.0,
+            'tiempo_calculo_s': t_calculo,
+            # Estimación: lo que habría costado calcular los pares servidos desde la caché
+            'tiempo_ahorrado_s': t_calculo / pares_calculados * pares_cache if pares_calculados else 0.0,
+            'tiempo_total_s': time.perf_counter() - inicio,
+        }
+        return ResultadoCache(huellas, inverso, np.concatenate([cache_filas, filas]),
+                              np.concatenate([cache_columnas, columnas]),
+                              np.concatenate([cache_similitudes, similitudes]), estadisticas)
+
+    def _guardar_nuevos(self, huellas, nuevos, id_de_indice, filas, columnas, similitudes):
+        """Inserta los documentos nuevos; cada uno guarda sus pares con los documentos anteriores.
+
+        Los nuevos se insertan en orden de índice, así que sus ids crecen en ese orden y
+        todo par queda en la fila del documento más reciente (el de id mayor).
+        """
+        orden = np.argsort(filas, kind='stable')
+        filas, columnas, similitudes = filas[orden], columnas[orden], similitudes[orden]
+        limites = np.searchsorted(filas, nuevos, side='right')
+        inicio = 0
+        for indice, fin in zip(nuevos.tolist(), limites.tolist()):
+            vecinos = np.array([id_de_indice[c] for c in columnas[inicio:fin].tolist()], dtype=np.int64)
+            cursor = self.conexion.execute(
+                "INSERT INTO documentos (huella, vecinos, similitudes) VALUES (?, ?, ?)",
+                (huellas[indice], vecinos.tobytes(), similitudes[inicio:fin].tobytes()))
+            id_de_indice[indice] = cursor.lastrowid
+            inicio = fin
+
+    @staticmethod
+    def _calcular_nuevos(unicos, nuevos):
+        """Pares (a, b) con similitud > 0 en los que `a` es un documento nuevo.
+
+        Cada documento nuevo se compara con todos los anteriores y con los nuevos de
+        índice menor, de modo que cada par se calcula una sola vez (un solo triángulo).
+        """
+        vacio = np.array([], dtype=np.int64)
+        if not len(nuevos):
+            return vacio, vacio, np.array([], dtype=np.float64)
+
+        X, _ = matriz_binaria(unicos)
+        cardinalidades = np.diff(X.indptr)
+        # Columnas: primero los documentos anteriores y después los nuevos, en orden. El
+        # nuevo en la posición p solo necesita las columnas [0, anteriores + p).
+        es_nuevo = np.zeros(len(unicos), dtype=bool)
+        es_nuevo[nuevos] = True
+        columnas_orden = np.concatenate([np.flatnonzero(~es_nuevo), nuevos])
+        XT = X[columnas_orden].T.tocsc()
+        anteriores = len(unicos) - len(nuevos)
+
+        partes = []
+        tam_filas = max(1, CELDAS_POR_BLOQUE // len(unicos))
+        for inicio in range(0, len(nuevos), tam_filas):
+            fin = min(inicio + tam_filas, len(nuevos))
+            filas_nuevas = nuevos[inicio:fin]
+            limite = anteriores + fin - 1
+            bloque = jaccard_bloque(X[filas_nuevas], XT[:, :limite], cardinalidades[filas_nuevas],
+                                    cardinalidades[columnas_orden[:limite]])
+            # Dentro del propio bloque, cada nuevo solo se compara con los nuevos anteriores
+            posicion_fila = anteriores + np.arange(inicio, fin)
+            validas = np.arange(limite)[None, :] < posicion_fila[:, None]
+            filas, columnas = np.nonzero((bloque > 0) & validas)
+            partes.append((filas_nuevas[filas], columnas_orden[columnas], bloque[filas, columnas]))
+        return tuple(np.concatenate(arreglos) for arreglos in zip(*partes))
+
+
+if __name__ == '__main__':
+    import os
+    import random
+    import tempfile
+
+    from similitud_bloques import escribir_pares
+
+    parser = argparse.ArgumentParser(description="Benchmark de la caché de similitudes.")
+    parser.add_argument('--docs', type=int, default=10_000)
+    parser.add_argument('--cambios', type=float, default=0.05, help="Fracción de documentos modificados por día")
+    parser.add_argument('--dias', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulario = [f"palabra{i}" for i in range(20_000)]
+    temas = [rng.sample(vocabulario, 1000) for _ in range(50)]
+
+    def documento():
+        return set(rng.sample(rng.choice(temas), rng.randint(5, 30)))
+
+    conjuntos = [documento() for _ in range(args.docs)]
+    with tempfile.TemporaryDirectory() as directorio:
+        with CacheSimilitud(os.path.join(directorio, 'similitudes.sqlite')) as cache:
+            for dia in range(args.dias + 1):
+                if dia:
+                    # Cambian algunos documentos, se borran otros y llegan nuevos
+                    for i in rng.sample(range(len(conjuntos)), int(len(conjuntos) * args.cambios)):
+                        conjuntos[i] = documento()
+                    del conjuntos[:int(len(conjuntos) * args.cambios / 2)]
+                    conjuntos.extend(documento() for _ in range(int(args.docs * args.cambios / 2)))
+
+                inicio = time.perf_counter()
+                resultado = cache.actualizar(conjuntos)
+                i, j, similitudes = resultado.pares_documentos()
+                t_cache = time.perf_counter() - inicio
+
+                # Referencia: todos los pares recalculados por bloques (similitud_bloques.py)
+                inicio = time.perf_counter()
+                referencia = escribir_pares(conjuntos, os.path.join(directorio, f'dia{dia}'), workers=1)
+                t_completo = time.perf_counter() - inicio
+                orden, orden_ref = np.lexsort((j, i)), np.lexsort((referencia.columnas, referencia.filas))
+                identico = (np.array_equal(i[orden], referencia.filas[orden_ref])
+                            and np.array_equal(j[orden], referencia.columnas[orden_ref])
+                            and np.allclose(similitudes[orden], referencia.similitudes[orden_ref], atol=1e-6))
+                referencia.cerrar()
+
+                e = resultado.estadisticas
+                print(f"Día {dia}: {e['nuevos']} nuevos, {e['podados']} podados, "
+                      f"acierto {e['tasa_acierto']:.1%}, ahorro estimado {e['tiempo_ahorrado_s']:.2f} s")
+                print(f"    caché {t_cache:.2f} s  vs  recálculo completo {t_completo:.2f} s  (idéntico: {identico})")
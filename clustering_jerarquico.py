@@ -0,0 +1,171 @@
+"""
+Clustering jerárquico a partir de distancias de Jaccard precalculadas.
+
+`sns.clustermap(matriz_similitud, annot=True)` vuelve a calcular distancias euclídeas
+entre las filas de la matriz densa, enlaza con ellas y anota cada celda: con unos miles
+de documentos tarda minutos, consume mucha memoria y la figura es ilegible. Aquí:
+
+- La distancia es 1 - Jaccard y se escribe directamente en el vector condensado de
+  scipy (n·(n-1)/2 valores, el triángulo superior) recorriendo los bloques de
+  jaccard_disperso.py, sin pasar por la matriz n x n. Si la matriz de similitud ya
+  existe (corpus pequeños), `distancias_desde_matriz` la reutiliza en lugar de recalcularla.
+- El enlace usa `fastcluster` si está instalado (algoritmos óptimos en memoria O(n²) y
+  más rápidos) y, si no, `scipy.cluster.hierarchy.linkage`.
+- Para n grande hay un modo muestreado: se enlaza una muestra y el resto de documentos
+  se asigna al grupo de su vecino más similar de la muestra.
+- `dibujar_clustermap` reutiliza el enlace precalculado (`row_linkage`/`col_linkage`),
+  dibuja solo los documentos de la muestra si se le pasa la de `agrupar` y desactiva las
+  anotaciones por encima de `MAX_ANOTADAS` documentos.
+
+Uso desde consola (benchmark frente al enlace euclídeo sobre la matriz densa):
+    python clustering_jerarquico.py --docs 3000
+"""
+
+import argparse
+import time
+
+import numpy as np
+from scipy.cluster import hierarchy
+from scipy.spatial.distance import squareform
+
+from jaccard_disperso import TAM_BLOQUE, bloques_jaccard, jaccard_bloque, matriz_binaria
+
+try:
+    import fastcluster
+except ImportError:  # dependencia opcional
+    fastcluster = None
+
+METODO = 'average'
+MAX_ANOTADAS = 30      # por encima de este número de documentos no se anotan las celdas
+MAX_MUESTRA = 2000     # documentos enlazados en el modo muestreado
+
+
+# --- DISTANCIAS CONDENSADAS ---
+
+def distancias_condensadas(conjuntos, tam_bloque=TAM_BLOQUE):
+    """Vector condensado de distancias 1 - Jaccard (formato de `scipy.spatial.distance.pdist`)."""
+    X, _ = matriz_binaria(conjuntos)
+    n = X.shape[0]
+    distancias = np.empty(n * (n - 1) // 2)
+    for fila0, col0, bloque in bloques_jaccard(X, tam_bloque):
+        filas, columnas = np.nonzero(~np.isnan(bloque))
+        i, j = filas + fila0, columnas + col0
+        fuera_diagonal = i < j
+        i, j = i[fuera_diagonal], j[fuera_diagonal]
+        # Posición del par (i, j), i < j, en el vector condensado
+        distancias[n * i - i * (i + 1) // 2 + (j - i - 1)] = 1.0 - bloque[filas[fuera_diagonal], columnas[fuera_diagonal]]
+    return distancias
+
+
+def distancias_desde_matriz(matriz_similitud):
+    """Vector condensado 1 - similitud a partir de una matriz de similitud ya calculada."""
+    return 1.0 - squareform(matriz_similitud, checks=False)
+
+
+# --- ENLACE ---
+
+def enlace(distancias, metodo=METODO):
+    """Matriz de enlace (linkage) a partir de distancias condensadas."""
+    if fastcluster is not None:
+        return fastcluster.linkage(distancias, method=metodo, preserve_input=False)
+    return hierarchy.linkage(distancias, method=metodo)
+
+
+def agrupar(conjuntos, n_grupos, metodo=METODO, max_muestra=MAX_MUESTRA, semilla=0, matriz_similitud=None):
+    """Etiqueta cada documento con uno de `n_grupos` grupos jerárquicos.
+
+    Si hay más de `max_muestra` documentos, solo se enlaza una muestra aleatoria y cada
+    documento restante recibe el grupo de su vecino más similar (Jaccard) de la muestra.
+    Si se pasa `matriz_similitud`, las distancias de la muestra salen de ella.
+    Devuelve (etiquetas, indices_muestra, enlace_muestra).
+    """
+    n = len(conjuntos)
+    if n <= max_muestra:
+        muestra = np.arange(n)
+    else:
+        muestra = np.sort(np.random.RandomState(semilla).choice(n, max_muestra, replace=False))
+
+    if matriz_similitud is not None:
+        distancias = distancias_desde_matriz(np.asarray(matriz_similitud)[np.ix_(muestra, muestra)])
+    else:
+        distancias = distancias_condensadas([conjuntos[i] for i in muestra])
+    Z = enlace(distancias, metodo)
+    etiquetas_muestra = hierarchy.fcluster(Z, n_grupos, criterion='maxclust')
+    if len(muestra) == n:
+        return etiquetas_muestra, muestra, Z
+
+    # Asignación del resto al vecino más similar de la muestra, por bloques de filas
+    X, _ = matriz_binaria(conjuntos)
+    cardinalidades = np.diff(X.indptr)
+    XT_muestra = X[muestra].T.tocsc()
+    etiquetas = np.empty(n, dtype=etiquetas_muestra.dtype)
+    for fila0 in range(0, n, TAM_BLOQUE):
+        fila1 = min(fila0 + TAM_BLOQUE, n)
+        bloque = jaccard_bloque(X[fila0:fila1], XT_muestra, cardinalidades[fila0:fila1], cardinalidades[muestra])
+        etiquetas[fila0:fila1] = etiquetas_muestra[bloque.argmax(axis=1)]
+    etiquetas[muestra] = etiquetas_muestra
+    return etiquetas, muestra, Z
+
+
+# --- VISUALIZACIÓN ---
+
+def dibujar_clustermap(matriz_similitud, Z, etiquetas=None, max_anotadas=MAX_ANOTADAS, muestra=None, **kwargs):
+    """`sns.clustermap` con el enlace precalculado; anota las celdas solo si n <= max_anotadas.
+
+    Con `muestra` (los índices que devuelve `agrupar`) se dibujan solo esos documentos,
+    que son los que `Z` enlaza.
+    """
+    import seaborn as sns
+
+    if muestra is not None:
+        matriz_similitud = np.asarray(matriz_similitud)[np.ix_(muestra, muestra)]
+        if etiquetas is not None:
+            etiquetas = [etiquetas[i] for i in muestra]
+    n = len(matriz_similitud)
+    anotar = n <= max_anotadas
+    opciones = {'cmap': 'coolwarm', 'annot': anotar, 'fmt': '.2f'}
+    if etiquetas is not None:
+        opciones['xticklabels'] = opciones['yticklabels'] = etiquetas if anotar else 'auto'
+    opciones.update(kwargs)
+    return sns.clustermap(matriz_similitud, row_linkage=Z, col_linkage=Z, **opciones)
+
+
+if __name__ == '__main__':
+    import random
+    import tracemalloc
+
+    from jaccard_disperso import matriz_jaccard
+
+    parser = argparse.ArgumentParser(description="Benchmark del enlace jerárquico con distancias condensadas.")
+    parser.add_argument('--docs', type=int, default=3000)
+    parser.add_argument('--grupos', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulario = [f"palabra{i}" for i in range(5000)]
+    temas = [rng.sample(vocabulario, 150) for _ in range(args.grupos)]
+    conjuntos = [set(rng.sample(temas[i % args.grupos], rng.randint(5, 25))) for i in range(args.docs)]
+
+    def medir(funcion):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        resultado = funcion()
+        duracion = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return resultado, duracion, pico / (1 << 20)
+
+    # Lo que hace sns.clustermap: distancias euclídeas entre filas de la matriz densa
+    _, t_denso, m_denso = medir(lambda: hierarchy.linkage(matriz_jaccard(conjuntos), METODO, metric='euclidean'))
+    Z, t_condensado, m_condensado = medir(lambda: enlace(distancias_condensadas(conjuntos)))
+    (etiquetas, muestra, _), t_muestra, m_muestra = medir(
+        lambda: agrupar(conjuntos, args.grupos, max_muestra=min(MAX_MUESTRA, args.docs // 4)))
+
+    referencia = hierarchy.fcluster(Z, args.grupos, criterion='maxclust')
+    acuerdo = np.mean([(referencia[i] == referencia[j]) == (etiquetas[i] == etiquetas[j])
+                       for i, j in (rng.sample(range(args.docs), 2) for _ in range(20_000))])
+    print(f"Enlace con {'fastcluster' if fastcluster else 'scipy'}, método '{METODO}'")
+    print(f"Matriz densa + euclídea : {t_denso:.2f} s, pico {m_denso:.0f} MB")
+    print(f"1 - Jaccard condensada  : {t_condensado:.2f} s, pico {m_condensado:.0f} MB")
+    print(f"Muestreado ({len(muestra)} docs)  : {t_muestra:.2f} s, pico {m_muestra:.0f} MB, "
+          f"acuerdo por pares con el exacto {acuerdo:.1%}")
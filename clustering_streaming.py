@@ -0,0 +1,229 @@
+"""
+Clustering de documentos fuera de memoria (out-of-core) con HashingVectorizer y MiniBatchKMeans.
+
+El Ejercicio 5 guarda todo el corpus en una lista y ajusta `TfidfVectorizer` y `KMeans`
+en memoria. Para decenas de millones de documentos leemos el corpus por lotes:
+
+1. Primera pasada: `HashingVectorizer` (sin estado: no necesita vocabulario) y un conteo
+   de frecuencia documental por columna, para estimar el IDF igual que `TfidfVectorizer`
+   (idf suavizado: ln((1 + n) / (1 + df)) + 1).
+2. Pasadas siguientes: cada lote se pondera con el IDF, se normaliza (L2) y entrena
+   `MiniBatchKMeans.partial_fit`.
+
+La memoria es fija: el vector de frecuencias documentales, los centroides (k x n_features)
+y un lote. Como el hash no se puede invertir, durante la primera pasada guardamos una
+muestra acotada "columna -> término" para el informe de palabras dominantes por cluster.
+
+Uso desde consola (benchmark con un corpus sintético de temas, un documento por línea):
+    python clustering_streaming.py --docs 200000
+"""
+
+import argparse
+import random
+import time
+from itertools import chain, islice
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from scipy import sparse
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+N_FEATURES = 1 << 18
+TAM_LOTE = 10_000
+MAX_TERMINOS = 200_000   # tamaño máximo de la muestra columna -> término
+TAM_MUESTRA = 2000       # documentos guardados para visualizar
+
+
+# --- LECTURA POR LOTES ---
+
+def leer_documentos(fuentes):
+    """Genera los documentos (uno por línea no vacía) de uno o varios archivos UTF-8."""
+    if isinstance(fuentes, str):
+        fuentes = [fuentes]
+    for ruta in fuentes:
+        with open(ruta, encoding='utf-8', errors='replace') as archivo:
+            for linea in archivo:
+                linea = linea.strip()
+                if linea:
+                    yield linea
+
+
+def en_lotes(documentos, tam_lote=TAM_LOTE):
+    """Agrupa un iterable de documentos en listas de hasta `tam_lote` elementos."""
+    iterador = iter(documentos)
+    while lote := list(islice(iterador, tam_lote)):
+        yield lote
+
+
+# --- MODELO ---
+
+class ClusteringStreaming:
+    """TF-IDF con hashing + MiniBatchKMeans entrenados lote a lote."""
+
+    def __init__(self, n_clusters=4, n_features=N_FEATURES, tam_lote=TAM_LOTE,
+                 max_terminos=MAX_TERMINOS, tam_muestra=TAM_MUESTRA, semilla=42):
+        self.n_clusters = n_clusters
+        self.tam_lote = tam_lote
+        self.max_terminos = max_terminos
+        self.tam_muestra = tam_muestra
+        self.semilla = semilla
+        # Mismo tokenizador y minúsculas que TfidfVectorizer; sin signo alterno para que
+        # las columnas sean conteos positivos, como en el TF-IDF original
+        self.vectorizador = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+        self._analizador = self.vectorizador.build_analyzer()
+        self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=min(tam_lote, 4096),
+                                      random_state=semilla, n_init=3)
+        self.frecuencia_documental = np.zeros(n_features, dtype=np.int64)
+        self.n_documentos = 0
+        self.terminos = {}   # columna -> primer término visto con ese hash
+        self.muestra = []    # muestreo por reservorio de documentos (para visualizar)
+
+    # 1) Primera pasada: frecuencias documentales y muestra de términos
+    def contar_frecuencias(self, lote):
+        X = self.vectorizador.transform(lote)
+        # Cada fila de la CSR tiene columnas únicas: bincount de los índices = df
+        self.frecuencia_documental += np.bincount(X.indices, minlength=X.shape[1])
+        self._registrar_terminos(lote)
+        self._muestrear(lote)
+        self.n_documentos += len(lote)
+
+    def _registrar_terminos(self, lote):
+        libres = self.max_terminos - len(self.terminos)
+        if libres <= 0:
+            return
+        nuevos = list(islice(set(chain.from_iterable(map(self._analizador, lote))), libres))
+        if not nuevos:
+            return
+        # Cada término, tratado como documento, produce exactamente su propia columna
+        columnas = self.vectorizador.transform(nuevos).indices
+        for columna, termino in zip(columnas.tolist(), nuevos):
+            self.terminos.setdefault(columna, termino)
+
+    def _muestrear(self, lote):
+        rng = random.Random(self.semilla + self.n_documentos)
+        for posicion, documento in enumerate(lote, start=self.n_documentos):
+            if posicion < self.tam_muestra:
+                self.muestra.append(documento)
+            else:
+                destino = rng.randint(0, posicion)
+                if destino < self.tam_muestra:
+                    self.muestra[destino] = documento
+
+    @property
+    def idf(self):
+        return np.log((1 + self.n_documentos) / (1 + self.frecuencia_documental)) + 1
+
+    # 2) Pasadas de entrenamiento
+    def transformar(self, lote):
+        """Matriz TF-IDF (CSR, normalizada L2) de un lote de documentos."""
+        X = self.vectorizador.transform(lote)
+        X = X @ sparse.diags(self.idf)
+        return normalize(X, norm='l2', copy=False)
+
+    def ajustar_lote(self, lote):
+        self.kmeans.partial_fit(self.transformar(lote))
+
+    def predecir(self, lote):
+        return self.kmeans.predict(self.transformar(lote))
+
+    def ajustar(self, fuente, epocas=1):
+        """Entrena con `fuente`, una función sin argumentos que devuelve un iterable de
+        documentos (se llama una vez por pasada: 1 para el IDF y `epocas` para K-Means)."""
+        for lote in en_lotes(fuente(), self.tam_lote):
+            self.contar_frecuencias(lote)
+        for _ in range(epocas):
+            for lote in en_lotes(fuente(), self.tam_lote):
+                self.ajustar_lote(lote)
+        return self
+
+    def escribir_etiquetas(self, fuente, ruta):
+        """Asigna un cluster a cada documento y lo guarda en un `.npy` mapeado en memoria."""
+        etiquetas = open_memmap(ruta, mode='w+', dtype=np.int32, shape=(self.n_documentos,))
+        inicio = 0
+        for lote in en_lotes(fuente(), self.tam_lote):
+            etiquetas[inicio:inicio + len(lote)] = self.predecir(lote)
+            inicio += len(lote)
+        etiquetas.flush()
+        return etiquetas
+
+    # 3) Informe
+    def terminos_principales(self, n=10):
+        """Las `n` palabras de mayor peso en cada centroide (`#columna` si no hay término)."""
+        orden = self.kmeans.cluster_centers_.argsort()[:, ::-1]
+        informe = []
+        for fila in orden:
+            conocidas = [self.terminos.get(c, f'#{c}') for c in fila[:n]]
+            informe.append(conocidas)
+        return informe
+
+    def matriz_muestra(self):
+        """(X, etiquetas) de la muestra, con solo las columnas usadas (para PCA/gráficos)."""
+        X = self.transformar(self.muestra)
+        columnas = np.unique(X.indices)
+        return X[:, columnas], self.kmeans.predict(X)
+
+
+def agrupar_en_flujo(fuentes, n_clusters=4, epocas=1, **kwargs):
+    """Atajo: entrena un `ClusteringStreaming` leyendo los archivos `fuentes` por lotes."""
+    return ClusteringStreaming(n_clusters, **kwargs).ajustar(lambda: leer_documentos(fuentes), epocas)
+
+
+# --- BENCHMARK ---
+
+TEMAS_DEMO = {
+    "Tecnología": ["procesador", "software", "algoritmo", "nube", "datos", "inteligencia artificial", "python", "hardware", "sistema", "redes"],
+    "Finanzas": ["mercado", "inversión", "bolsa", "acciones", "economía", "banco", "interés", "crédito", "ahorro", "finanzas"],
+    "Salud": ["paciente", "hospital", "médico", "tratamiento", "enfermedad", "diagnóstico", "salud", "vacuna", "terapia", "clínica"],
+    "Viajes": ["turismo", "hotel", "vuelo", "playa", "montaña", "vacaciones", "pasaporte", "maleta", "guía", "aventura"],
+}
+
+
+def generar_corpus(ruta, documentos, semilla=0):
+    """Escribe un corpus sintético como el del Ejercicio 5 (un documento por línea).
+
+    Devuelve el tema real de cada documento.
+    """
+    rng = random.Random(semilla)
+    temas = list(TEMAS_DEMO.values())
+    reales = np.empty(documentos, dtype=np.int32)
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        for i in range(documentos):
+            reales[i] = rng.randrange(len(temas))
+            archivo.write(' '.join(rng.choices(temas[reales[i]], k=rng.randint(5, 15))) + '\n')
+    return reales
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    import tracemalloc
+
+    from sklearn.metrics import adjusted_rand_score
+
+    parser = argparse.ArgumentParser(description="Benchmark del clustering por lotes.")
+    parser.add_argument('--docs', type=int, default=200_000)
+    parser.add_argument('--clusters', type=int, default=4)
+    parser.add_argument('--epocas', type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'corpus.txt')
+        reales = generar_corpus(ruta, args.docs)
+
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        modelo = agrupar_en_flujo([ruta], args.clusters, args.epocas)
+        t_ajuste = time.perf_counter() - inicio
+        etiquetas = modelo.escribir_etiquetas(lambda: leer_documentos([ruta]), os.path.join(directorio, 'etiquetas.npy'))
+        t_total = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1] / (1 << 20)
+        tracemalloc.stop()
+
+        print(f"{args.docs} documentos: ajuste {t_ajuste:.1f} s, con asignación {t_total:.1f} s "
+              f"({args.docs / t_total:,.0f} docs/s), pico de memoria {pico:.0f} MB")
+        print(f"Acuerdo con los temas reales (ARI): {adjusted_rand_score(reales, etiquetas):.3f}")
+        for i, palabras in enumerate(modelo.terminos_principales()):
+            print(f"Cluster {i}: {', '.join(palabras)}")
+        del etiquetas
@@ -0,0 +1,199 @@
+"""
+Conteo aproximado de palabras frecuentes (heavy hitters) con memoria fija.
+
+Para los gráficos "Top 10" solo necesitamos las palabras más frecuentes, pero un
+`Counter` exacto crece con el vocabulario (typos, hashtags, URLs...). Aquí usamos un
+Count-Min Sketch: una tabla de `profundidad x ancho` contadores cuyo tamaño no depende
+del vocabulario, más un montículo (heap) con las k palabras candidatas.
+
+Garantías del Count-Min Sketch (N = total de palabras contadas):
+- La estimación nunca es menor que la frecuencia real.
+- Con probabilidad >= 1 - delta, la estimación excede la real como mucho en epsilon * N.
+
+Los hashes de cada palabra se guardan en una caché acotada (`MAX_HASHES_EN_CACHE`
+palabras): las frecuentes se hashean una sola vez y la memoria sigue siendo fija.
+Las cotas se comprueban en tests/test_conteo_aproximado.py.
+
+Uso desde consola (verifica las cotas de error contra el conteo exacto):
+    python conteo_aproximado.py --mb 20 --epsilon 0.0005 --delta 0.01
+"""
+
+import argparse
+import hashlib
+import heapq
+import math
+from collections import Counter
+from itertools import islice
+
+import numpy as np
+
+from conteo_streaming import TAM_BLOQUE, filtrar_tokens, leer_en_bloques, tokenizar_en_flujo
+
+# Número de tokens que se agregan con `Counter` antes de volcarlos en el sketch
+TAM_LOTE = 100_000
+# Palabras cuyos hashes se recuerdan (al llenarse, la caché se vacía)
+MAX_HASHES_EN_CACHE = 1 << 18
+
+
+class _HashesPalabra(dict):
+    """Caché palabra -> dos hashes de 64 bits (blake2b), acotada a `MAX_HASHES_EN_CACHE`."""
+
+    def __missing__(self, palabra):
+        if len(self) >= MAX_HASHES_EN_CACHE:
+            self.clear()
+        digest = hashlib.blake2b(palabra.encode('utf-8'), digest_size=16).digest()
+        valor = self[palabra] = (int.from_bytes(digest[:8], 'little'),
+                                 int.from_bytes(digest[8:], 'little') | 1)
+        return valor
+
+
+def _hashes(palabras, cache=None):
+    """Dos hashes de 64 bits estables por palabra (independientes de PYTHONHASHSEED)."""
+    cache = _HashesPalabra() if cache is None else cache
+    pares = np.array(list(map(cache.__getitem__, palabras)), dtype=np.uint64).reshape(-1, 2)
+    return pares[:, 0], pares[:, 1]
+
+
+# --- COUNT-MIN SKETCH + TOP-K ---
+
+class ConteoAproximado:
+    """Count-Min Sketch con seguimiento de las k palabras más frecuentes.
+
+    Se configura por cotas de error (`epsilon`, `delta`) o por presupuesto de memoria
+    (`desde_memoria`). Expone `most_common(n)` y `[palabra]` como un `Counter`, de modo
+    que encaja directamente en las visualizaciones existentes.
+    """
+
+    def __init__(self, epsilon=0.001, delta=0.01, k=100):
+        self.ancho = math.ceil(math.e / epsilon)
+        self.profundidad = math.ceil(math.log(1 / delta))
+        self.k = k
+        self.tabla = np.zeros((self.profundidad, self.ancho), dtype=np.int64)
+        self.total_palabras = 0
+        self.candidatos = {}  # palabra -> frecuencia estimada (las k mayores)
+        self._hashes = _HashesPalabra()
+
+    @classmethod
+    def desde_memoria(cls, megabytes, delta=0.01, k=100):
+        """Crea un sketch que ocupa como máximo `megabytes` MB de contadores."""
+        profundidad = math.ceil(math.log(1 / delta))
+        ancho = max(1, int(megabytes * 1e6 / (8 * profundidad)))
+        return cls(epsilon=math.e / ancho, delta=delta, k=k)
+
+    @property
+    def epsilon(self):
+        return math.e / self.ancho
+
+    @property
+    def delta(self):
+        return math.exp(-self.profundidad)
+
+    def cota_error(self):
+        """Sobreestimación máxima (con probabilidad 1 - delta): epsilon * N."""
+        return self.epsilon * self.total_palabras
+
+    def _columnas(self, palabras):
+        h1, h2 = _hashes(palabras, self._hashes)
+        filas = np.arange(self.profundidad, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + filas * h2[None, :]) % np.uint64(self.ancho)).astype(np.int64)
+
+    def _estimar_columnas(self, columnas):
+        return self.tabla[np.arange(self.profundidad)[:, None], columnas].min(axis=0)
+
+    def estimar(self, palabras):
+        """Frecuencia estimada de una lista de palabras (arreglo `int64`)."""
+        if not palabras:
+            return np.zeros(0, dtype=np.int64)
+        return self._estimar_columnas(self._columnas(palabras))
+
+    def update(self, tokens):
+        """Suma un lote de tokens. Conviene pasar lotes grandes (se preagregan)."""
+        lote = Counter(tokens)
+        if not lote:
+            return
+        palabras = list(lote)
+        columnas = self._columnas(palabras)
+        pesos = np.fromiter(lote.values(), dtype=np.int64, count=len(palabras))
+        for fila in range(self.profundidad):
+            np.add.at(self.tabla[fila], columnas[fila], pesos)
+        self.total_palabras += int(pesos.sum())
+
+        # Actualizamos el top-k: candidatos anteriores + palabras del lote
+        nuevas = [i for i, palabra in enumerate(palabras) if palabra not in self.candidatos]
+        estimados = dict(zip((palabras[i] for i in nuevas),
+                             self._estimar_columnas(columnas[:, nuevas]).tolist()))
+        previos = list(self.candidatos)
+        estimados.update(zip(previos, self.estimar(previos).tolist()))
+        self.candidatos = dict(heapq.nlargest(self.k, estimados.items(), key=lambda item: item[1]))
+
+    def __getitem__(self, palabra):
+        return int(self.estimar([palabra])[0])
+
+    def total(self):
+        return self.total_palabras
+
+    def most_common(self, n=None):
+        """Lista de (palabra, frecuencia estimada) de las candidatas, de mayor a menor."""
+        n = self.k if n is None else min(n, self.k)
+        return heapq.nlargest(n, self.candidatos.items(), key=lambda item: item[1])
+
+
+def contar_aproximado(fuentes, epsilon=0.001, delta=0.01, k=100, tam_bloque=TAM_BLOQUE,
+                      stopwords=None, min_len=1):
+    """Equivalente aproximado de `contar_en_flujo`: devuelve (sketch, total_words)."""
+    if isinstance(fuentes, str) or hasattr(fuentes, 'read'):
+        fuentes = [fuentes]
+
+    sketch = ConteoAproximado(epsilon, delta, k)
+    for fuente in fuentes:
+        tokens = filtrar_tokens(tokenizar_en_flujo(leer_en_bloques(fuente, tam_bloque)), stopwords, min_len)
+        while True:
+            lote = list(islice(tokens, TAM_LOTE))
+            if not lote:
+                break
+            sketch.update(lote)
+    return sketch, sketch.total()
+
+
+# --- VERIFICACIÓN DE COTAS ---
+
+def verificar_cotas(sketch, exacto):
+    """Compara el sketch con un `Counter` exacto y devuelve un resumen de errores."""
+    palabras = list(exacto)
+    errores = sketch.estimar(palabras) - np.fromiter(exacto.values(), dtype=np.int64, count=len(palabras))
+    cota = sketch.cota_error()
+    top_exacto = [p for p, _ in exacto.most_common(10)]
+    top_aprox = [p for p, _ in sketch.most_common(10)]
+    return {
+        'nunca_subestima': bool((errores >= 0).all()),
+        'cota_error': cota,
+        'error_maximo': int(errores.max()) if len(errores) else 0,
+        'fraccion_dentro_de_cota': float((errores <= cota).mean()) if len(errores) else 1.0,
+        'coincidencias_top_10': len(set(top_exacto) & set(top_aprox)),
+    }
+
+
+if __name__ == '__main__':
+    import io
+
+    from conteo_fusionado import generar_corpus_sintetico
+    from conteo_streaming import contar_en_flujo
+
+    parser = argparse.ArgumentParser(description="Verificación de cotas del conteo aproximado.")
+    parser.add_argument('--mb', type=float, default=20, help="Tamaño del corpus sintético en MB")
+    parser.add_argument('--epsilon', type=float, default=0.0005)
+    parser.add_argument('--delta', type=float, default=0.01)
+    args = parser.parse_args()
+
+    texto = generar_corpus_sintetico(args.mb)
+    exacto, _ = contar_en_flujo(io.StringIO(texto))
+    sketch, total = contar_aproximado(io.StringIO(texto), args.epsilon, args.delta, k=10)
+
+    resumen = verificar_cotas(sketch, exacto)
+    print(f"Sketch de {sketch.profundidad} x {sketch.ancho} contadores "
+          f"({sketch.tabla.nbytes / 1e6:.2f} MB) para {total} palabras y {len(exacto)} únicas")
+    print(f"Nunca subestima: {resumen['nunca_subestima']}")
+    print(f"Cota epsilon*N: {resumen['cota_error']:.1f}  |  error máximo observado: {resumen['error_maximo']}")
+    print(f"Fracción de palabras dentro de la cota: {resumen['fraccion_dentro_de_cota']:.4f} "
+          f"(garantía: >= {1 - sketch.delta:.4f})")
+    print(f"Coincidencias en el Top 10: {resumen['coincidencias_top_10']}/10")
@@ -0,0 +1,136 @@
+"""
+Motor de limpieza y conteo fusionado: tokens contados al vuelo, filtros sobre el vocabulario.
+
+`procesar_y_contar` del Ejercicio 2 construye una lista de tokens y luego la copia hasta
+dos veces más (una por cada filtro) antes de contar. Aquí normalizamos, tokenizamos y
+contamos los tokens en un único recorrido del texto por trozos acotados, sin listas
+intermedias del tamaño del corpus; las stopwords y las palabras cortas se descartan
+después sobre el vocabulario del conteo en bruto. Si algún paso necesita las
+palabras (por ejemplo la nube de palabras), `iterar_filtrado` las entrega de forma
+perezosa con un generador.
+
+Uso desde consola (benchmark contra la versión original):
+    python conteo_fusionado.py --mb 50
+"""
+
+import argparse
+import random
+import re
+import time
+import tracemalloc
+from collections import Counter
+
+from tokenizador import iterar_tokens, tokenizar
+
+
+# --- MOTOR FUSIONADO ---
+
+# Tamaño de cada trozo de texto (en caracteres) que se normaliza y tokeniza de una vez
+TAM_TROZO = 1 << 18
+
+_NO_PALABRA = re.compile(r'\W')
+
+
+def dividir_en_trozos(texto, tam_trozo=TAM_TROZO):
+    """Corta el texto en trozos acotados, siempre sobre un carácter que no es de palabra."""
+    inicio = 0
+    while inicio < len(texto):
+        fin = inicio + tam_trozo
+        if fin < len(texto):
+            separador = _NO_PALABRA.search(texto, fin)
+            fin = separador.start() if separador else len(texto)
+        yield texto[inicio:fin]
+        inicio = fin
+
+
+def iterar_filtrado(texto, stopwords=None, min_len=1):
+    """Genera, sin listas intermedias, las palabras que superan los filtros."""
+    stopwords = stopwords or ()
+    for trozo in dividir_en_trozos(texto):
+        for word in iterar_tokens(trozo):
+            if len(word) >= min_len and word not in stopwords:
+                yield word
+
+
+def contar_filtrado(texto, stopwords=None, min_len=1):
+    """Normaliza, tokeniza y cuenta en un recorrido del texto; luego filtra el vocabulario.
+
+    Cada trozo se cuenta directamente en C (`Counter.update`) y los filtros se aplican
+    después sobre el vocabulario, no sobre los tokens: el coste del filtrado es
+    O(vocabulario). El orden de inserción (y por tanto el de los empates en
+    `most_common`) es el mismo que el de `Counter(words)`.
+
+    Devuelve (word_counts, total_words) con los mismos valores que
+    `Counter(words)` y `len(words)` de `procesar_y_contar`.
+    """
+    conteo_bruto = Counter()
+    for trozo in dividir_en_trozos(texto):
+        conteo_bruto.update(tokenizar(trozo))
+
+    stopwords = stopwords or ()
+    word_counts = Counter({word: count for word, count in conteo_bruto.items()
+                           if len(word) >= min_len and word not in stopwords})
+    return word_counts, sum(word_counts.values())
+
+
+# --- BENCHMARK ---
+
+def _procesar_y_contar_original(text, stopwords=None, min_len=1):
+    """Copia literal de `procesar_y_contar` (02_limpieza_texto.py) como referencia."""
+    text_lower = text.lower()
+    words = re.findall(r'\b\w+\b', text_lower)
+    if stopwords:
+        words = [word for word in words if word not in stopwords]
+    if min_len > 1:
+        words = [word for word in words if len(word) >= min_len]
+    return words, Counter(words)
+
+
+def generar_corpus_sintetico(megabytes, semilla=42):
+    """Genera texto aleatorio con palabras de distinta longitud y algo de puntuación."""
+    rng = random.Random(semilla)
+    vocabulario = ['de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'producto', 'servicio',
+                   'fantástico', 'terrible', 'calidad', 'precio', 'envío', 'batería', 'no',
+                   'muy', 'es', 'recomiendo'] + [f'palabra{i}' for i in range(2000)]
+    pesos = [50] * 20 + [1] * 2000
+    partes = []
+    tam = 0
+    while tam < megabytes * 1_000_000:
+        frase = ' '.join(rng.choices(vocabulario, pesos, k=12)).capitalize() + '. '
+        partes.append(frase)
+        tam += len(frase)
+    return ''.join(partes)
+
+
+def _medir(funcion, *args):
+    """Ejecuta `funcion` y devuelve (resultado, segundos, pico de memoria en MB)."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    segundos = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return resultado, segundos, pico
+
+
+def comparar(texto, stopwords, min_len):
+    """Mide tiempo y memoria de la versión original y la fusionada y verifica que coinciden."""
+    (words, original), t_original, m_original = _medir(_procesar_y_contar_original, texto, stopwords, min_len)
+    (fusionado, total), t_fusionado, m_fusionado = _medir(contar_filtrado, texto, stopwords, min_len)
+
+    identico = total == len(words) and fusionado.most_common() == original.most_common()
+    print(f"Original : {t_original:.2f} s, pico de memoria {m_original:.1f} MB")
+    print(f"Fusionado: {t_fusionado:.2f} s, pico de memoria {m_fusionado:.1f} MB "
+          f"(idéntico: {identico})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark del conteo fusionado.")
+    parser.add_argument('--mb', type=float, default=50, help="Tamaño del corpus sintético en MB")
+    parser.add_argument('--min-len', type=int, default=3)
+    args = parser.parse_args()
+
+    stopwords_demo = {'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'no', 'muy', 'es'}
+    print(f"Generando corpus sintético de {args.mb} MB...")
+    texto = generar_corpus_sintetico(args.mb)
+    comparar(texto, stopwords_demo, args.min_len)
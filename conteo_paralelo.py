@@ -0,0 +1,190 @@
+"""
+Conteo de palabras en paralelo (multiproceso) por fragmentos de bytes.
+
+Dividimos cada archivo en rangos de bytes ("shards") cuyos límites caen siempre en un
+separador ASCII, de modo que ninguna palabra queda partida entre dos fragmentos.
+Cada fragmento se cuenta en un proceso distinto (con los mismos filtros de stopwords
+y `min_len` que `procesar_y_contar`) y los `Counter` parciales se fusionan en el proceso
+principal a medida que llegan: cada parcial cruza la frontera entre procesos una sola vez
+(de ida no viaja ningún Counter) y se libera al fusionarlo. Como mucho
+`EN_VUELO_POR_WORKER` fragmentos por proceso están enviados y sin fusionar, así que los
+parciales pendientes no se acumulan aunque la fusión vaya más lenta que el conteo. Como
+los fragmentos se fusionan en orden, el resultado (incluido el orden de empates de `most_common`) es
+idéntico al del camino serie.
+
+Uso desde consola (benchmark de escalado):
+    python conteo_paralelo.py corpus.txt --workers 1 2 4 8 --min-len 3
+"""
+
+import argparse
+import codecs
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from conteo_streaming import TAM_BLOQUE, contar_en_flujo, contar_tokens, filtrar_tokens, tokenizar_en_flujo
+
+# Tamaño mínimo de un fragmento: por debajo, el coste de lanzar la tarea domina.
+TAM_MIN_FRAGMENTO = 4 << 20
+EN_VUELO_POR_WORKER = 2  # fragmentos enviados al pool y aún no fusionados, por proceso
+
+# Bytes ASCII que forman parte de una palabra (\w): nunca cortamos sobre ellos.
+_BYTES_PALABRA = frozenset(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_')
+
+# Filtros del proceso trabajador (se fijan una sola vez con el inicializador del pool)
+_filtros = {'stopwords': None, 'min_len': 1}
+
+
+# --- DIVISIÓN EN FRAGMENTOS ---
+
+def _es_separador(byte):
+    """Un byte ASCII que no es carácter de palabra siempre es un límite de token en UTF-8."""
+    return byte < 0x80 and byte not in _BYTES_PALABRA
+
+
+def _alinear_limite(archivo, posicion, tam_archivo):
+    """Avanza `posicion` hasta el primer byte separador (o el final del archivo)."""
+    archivo.seek(posicion)
+    while posicion < tam_archivo:
+        bloque = archivo.read(64 * 1024)
+        if not bloque:
+            break
+        for desplazamiento, byte in enumerate(bloque):
+            if _es_separador(byte):
+                return posicion + desplazamiento
+        posicion += len(bloque)
+    return tam_archivo
+
+
+def dividir_en_fragmentos(ruta, num_fragmentos):
+    """Divide un archivo en rangos de bytes [inicio, fin) alineados a separadores."""
+    tam_archivo = os.path.getsize(ruta)
+    num_fragmentos = max(1, min(num_fragmentos, tam_archivo // TAM_MIN_FRAGMENTO or 1))
+    paso = tam_archivo // num_fragmentos
+
+    limites = [0]
+    with open(ruta, 'rb') as archivo:
+        for k in range(1, num_fragmentos):
+            limite = _alinear_limite(archivo, max(k * paso, limites[-1]), tam_archivo)
+            if limite > limites[-1]:
+                limites.append(limite)
+    limites.append(tam_archivo)
+
+    return [(ruta, inicio, fin) for inicio, fin in zip(limites, limites[1:]) if fin > inicio]
+
+
+# --- TRABAJO POR FRAGMENTO ---
+
+def _leer_rango(ruta, inicio, fin, tam_bloque=TAM_BLOQUE):
+    """Genera bloques de texto decodificado del rango de bytes [inicio, fin)."""
+    decodificador = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        restante = fin - inicio
+        while restante > 0:
+            datos = archivo.read(min(tam_bloque, restante))
+            if not datos:
+                break
+            restante -= len(datos)
+            yield decodificador.decode(datos)
+        yield decodificador.decode(b'', final=True)
+
+
+def _inicializar_trabajador(stopwords, min_len):
+    _filtros['stopwords'] = stopwords
+    _filtros['min_len'] = min_len
+
+
+def contar_fragmento(fragmento):
+    """Cuenta las palabras de un fragmento (ruta, inicio, fin). Devuelve (Counter, total)."""
+    ruta, inicio, fin = fragmento
+    tokens = tokenizar_en_flujo(_leer_rango(ruta, inicio, fin))
+    return contar_tokens(filtrar_tokens(tokens, _filtros['stopwords'], _filtros['min_len']))
+
+
+# --- FUSIÓN ---
+
+def fusionar_en_orden(resultados):
+    """Fusiona los (Counter, total) de los fragmentos en orden, en este proceso.
+
+    Consume `resultados` de forma perezosa: cada parcial se fusiona y se libera en cuanto
+    llega. Devuelve (word_counts, total_words).
+    """
+    word_counts, total_words = Counter(), 0
+    for parcial, total in resultados:
+        word_counts.update(parcial)
+        total_words += total
+    return word_counts, total_words
+
+
+def _en_orden_acotado(pool, funcion, tareas, en_vuelo):
+    """Como `pool.map`, pero con como mucho `en_vuelo` tareas enviadas y sin consumir."""
+    pendientes = deque()
+    for tarea in tareas:
+        if len(pendientes) >= en_vuelo:
+            yield pendientes.popleft().result()
+        pendientes.append(pool.submit(funcion, tarea))
+    while pendientes:
+        yield pendientes.popleft().result()
+
+
+# --- MOTOR PARALELO ---
+
+def contar_en_paralelo(rutas, workers=None, stopwords=None, min_len=1, fragmentos_por_worker=4):
+    """Cuenta palabras de uno o varios archivos repartiendo fragmentos en un pool de procesos.
+
+    Devuelve (word_counts, total_words), idénticos a `contar_en_flujo(rutas, ...)`.
+    """
+    if isinstance(rutas, str):
+        rutas = [rutas]
+    workers = workers or os.cpu_count() or 1
+
+    fragmentos = []
+    for ruta in rutas:
+        fragmentos.extend(dividir_en_fragmentos(ruta, workers * fragmentos_por_worker))
+
+    if workers == 1:
+        _inicializar_trabajador(stopwords, min_len)
+        return fusionar_en_orden(map(contar_fragmento, fragmentos))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_trabajador,
+                             initargs=(stopwords, min_len)) as pool:
+        return fusionar_en_orden(_en_orden_acotado(pool, contar_fragmento, fragmentos,
+                                                   workers * EN_VUELO_POR_WORKER))
+
+
+# --- BENCHMARK DE ESCALADO ---
+
+def medir_escalado(rutas, lista_workers, stopwords=None, min_len=1):
+    """Mide el tiempo del camino serie y del paralelo con distinto número de procesos."""
+    inicio = time.perf_counter()
+    referencia = contar_en_flujo(rutas, stopwords=stopwords, min_len=min_len)
+    t_serie = time.perf_counter() - inicio
+    print(f"Serie (contar_en_flujo): {t_serie:.2f} s")
+
+    for workers in lista_workers:
+        inicio = time.perf_counter()
+        word_counts, total_words = contar_en_paralelo(rutas, workers, stopwords, min_len)
+        t_paralelo = time.perf_counter() - inicio
+
+        identico = (total_words == referencia[1]
+                    and word_counts.most_common() == referencia[0].most_common())
+        print(f"{workers:>3} procesos: {t_paralelo:.2f} s  "
+              f"(aceleración x{t_serie / t_paralelo:.2f}, idéntico al serie: {identico})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark del conteo paralelo por fragmentos.")
+    parser.add_argument('rutas', nargs='+', help="Archivos de texto (UTF-8) a contar")
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument('--min-len', type=int, default=1)
+    parser.add_argument('--stopwords', help="Archivo con una stopword por línea")
+    args = parser.parse_args()
+
+    stopwords = None
+    if args.stopwords:
+        with open(args.stopwords, encoding='utf-8') as archivo:
+            stopwords = {linea.strip().lower() for linea in archivo if linea.strip()}
+
+    medir_escalado(args.rutas, args.workers, stopwords, args.min_len)
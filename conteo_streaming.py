@@ -0,0 +1,127 @@
+"""
+Conteo de palabras en flujo (streaming) para corpus que no caben en memoria.
+
+En lugar de unir todo el corpus en un solo string (`' '.join(corpus)`), leemos los
+archivos (o la entrada estándar) por bloques, tokenizamos cada bloque con la misma
+semántica `\\b\\w+\\b` y alimentamos un `Counter` de forma incremental.
+La memoria queda acotada por el tamaño del vocabulario, no por el del corpus.
+
+Uso desde consola:
+    python conteo_streaming.py reseñas.txt otra_carpeta/dump.txt
+    cat reseñas.txt | python conteo_streaming.py -
+"""
+
+import sys
+from collections import Counter
+
+from tokenizador import tokenizar
+
+# Tamaño de bloque por defecto (en caracteres): 1 MiB
+TAM_BLOQUE = 1 << 20
+
+
+# --- LECTURA POR BLOQUES ---
+
+def leer_en_bloques(fuente, tam_bloque=TAM_BLOQUE):
+    """Genera bloques de texto desde una ruta, '-' (stdin) o un objeto tipo archivo."""
+    if fuente == '-':
+        fuente = sys.stdin
+
+    if hasattr(fuente, 'read'):
+        while True:
+            bloque = fuente.read(tam_bloque)
+            if not bloque:
+                break
+            yield bloque
+        return
+
+    with open(fuente, encoding='utf-8', errors='replace') as archivo:
+        yield from leer_en_bloques(archivo, tam_bloque)
+
+
+# --- TOKENIZACIÓN ENTRE BLOQUES ---
+
+def tokenizar_bloques(bloques):
+    """Tokeniza una secuencia de bloques sin partir palabras que crucen el límite.
+
+    Devuelve una lista de tokens por bloque. Si el último token de un bloque llega justo
+    al final, puede continuar en el siguiente bloque: lo guardamos como "arrastre" (sin
+    pasar a minúsculas) y lo anteponemos al bloque siguiente. Las minúsculas se aplican
+    al texto ya unido, porque dependen del contexto (la sigma final griega: `ΣΑΣ` -> `σας`).
+    """
+    arrastre = ''
+    for bloque in bloques:
+        texto = arrastre + bloque
+        tokens = tokenizar(texto)
+
+        # El último token llega al final del bloque: puede continuar en el siguiente
+        inicio = len(texto)
+        while inicio and (texto[inicio - 1].isalnum() or texto[inicio - 1] == '_'):
+            inicio -= 1
+        arrastre = texto[inicio:]
+        if arrastre:
+            # En minúsculas puede ocupar más de un token (`İ` -> `i` + punto combinante)
+            del tokens[len(tokens) - len(tokenizar(arrastre)):]
+        yield tokens
+
+    if arrastre:
+        yield tokenizar(arrastre)
+
+
+def tokenizar_en_flujo(bloques):
+    """Genera los tokens de una secuencia de bloques uno a uno (ver `tokenizar_bloques`)."""
+    for tokens in tokenizar_bloques(bloques):
+        yield from tokens
+
+
+def filtrar_tokens(tokens, stopwords=None, min_len=1):
+    """Aplica los filtros del Ejercicio 2 (stopwords y longitud mínima) a un flujo de tokens."""
+    if stopwords:
+        tokens = (word for word in tokens if word not in stopwords)
+    if min_len > 1:
+        tokens = (word for word in tokens if len(word) >= min_len)
+    return tokens
+
+
+def contar_tokens(tokens, word_counts=None):
+    """Alimenta un `Counter` con un flujo de tokens y devuelve (word_counts, total_words)."""
+    if word_counts is None:
+        word_counts = Counter()
+    total_words = 0
+    for word in tokens:
+        word_counts[word] += 1
+        total_words += 1
+    return word_counts, total_words
+
+
+def contar_en_flujo(fuentes, tam_bloque=TAM_BLOQUE, stopwords=None, min_len=1):
+    """Cuenta palabras de una o varias fuentes leyendo por bloques.
+
+    Devuelve (word_counts, total_words), equivalentes a `Counter(words)` y `len(words)`
+    del camino en memoria (con los mismos filtros opcionales que `procesar_y_contar`).
+    """
+    if isinstance(fuentes, str) or hasattr(fuentes, 'read'):
+        fuentes = [fuentes]
+
+    word_counts = Counter()
+    total_words = 0
+    for fuente in fuentes:
+        tokens = tokenizar_en_flujo(leer_en_bloques(fuente, tam_bloque))
+        _, total = contar_tokens(filtrar_tokens(tokens, stopwords, min_len), word_counts)
+        total_words += total
+    return word_counts, total_words
+
+
+# --- EJECUCIÓN DIRECTA ---
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Uso: python conteo_streaming.py ARCHIVO [ARCHIVO ...]  (use '-' para stdin)")
+        sys.exit(1)
+
+    word_counts, total_words = contar_en_flujo(sys.argv[1:])
+
+    print("Top 10 palabras más frecuentes:")
+    for word, count in word_counts.most_common(10):
+        print(f"- '{word}': {count} veces")
+    print(f"\nTotal de palabras en el corpus: {total_words}")
+    print(f"Número de palabras únicas: {len(word_counts)}")
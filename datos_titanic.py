@@ -0,0 +1,223 @@
+"""
+Datos y recursos del dashboard del Titanic (06_Titanic_Dashboard.py) sin depender de la red.
+
+En cada arranque en frío, `load_data()` descargaba el CSV de GitHub y `load_lottieurl`
+hacía otra petición HTTP con 5 s de timeout: el arranque esperaba a la red y, en
+máquinas sin conexión, el dashboard no llegaba a cargar.
+
+- `cargar_titanic`: lee el CSV de una ruta local (argumento, variable de entorno
+  `TITANIC_CSV` o `datos/titanic.csv`) y lo convierte una sola vez en una instantánea
+  columnar Feather sin comprimir, con tipos ya resueltos (Sex, Embarked y Pclass como
+  categorías, enteros pequeños). Los arranques siguientes la leen mapeada en memoria
+  y solo la regeneran si el CSV cambia (ruta, tamaño y fecha de modificación). Solo si
+  no hay ni CSV ni instantánea se descarga el CSV una vez y se guarda en `datos/` (sin red,
+  la descarga lanza `OSError` y el dashboard explica cómo indicar `TITANIC_CSV`).
+  Sin pyarrow se lee el CSV con los mismos tipos, sin instantánea.
+- `obtener_json_remoto`: caché en disco para recursos remotos (la animación Lottie). Si
+  el recurso está en disco se devuelve al momento; si no, se descarga en un hilo en
+  segundo plano y se devuelve None para que el dashboard use su alternativa (el emoji).
+  Los fallos no se reintentan hasta pasados `REINTENTO_S` segundos.
+
+La carpeta de datos se puede cambiar con la variable de entorno `TITANIC_DATOS`.
+
+Uso desde consola (arranque en frío antes y después):
+    python datos_titanic.py --csv titanic.csv
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+
+import pandas as pd
+
+URL_TITANIC = "https://raw.githubusercontent.com/datasciencedojo/datasets/master/titanic.csv"
+URL_LOTTIE_BARCO = "https://lottie.host/5a70498a-5309-4ffc-a335-512cb5954605/5G7e8M5g2L.json"
+DIRECTORIO_DATOS = os.environ.get(
+    "TITANIC_DATOS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos"))
+ARCHIVO_CSV = "titanic.csv"
+ARCHIVO_INSTANTANEA = "titanic.feather"
+DIRECTORIO_RECURSOS = "recursos"
+VERSION_INSTANTANEA = 1
+TIMEOUT_S = 5
+REINTENTO_S = 300
+
+# Tipos de cada columna: categorías para los filtros y enteros del tamaño justo
+TIPOS = {
+    'PassengerId': 'int32',
+    'Survived': 'int8',
+    'Pclass': pd.CategoricalDtype([1, 2, 3], ordered=True),
+    'Sex': pd.CategoricalDtype(['female', 'male']),
+    'SibSp': 'int8',
+    'Parch': 'int8',
+    'Embarked': pd.CategoricalDtype(['C', 'Q', 'S']),
+}
+
+
+# --- DATOS ---
+
+def _escribir_atomico(ruta, escribir):
+    """Escribe en un temporal del mismo directorio y lo renombra (nunca queda un archivo a medias)."""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix='.tmp')
+    os.close(descriptor)
+    try:
+        escribir(temporal)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.remove(temporal)
+        raise
+
+
+def _descargar(url, ruta, timeout=TIMEOUT_S):
+    with urllib.request.urlopen(url, timeout=timeout) as respuesta:
+        contenido = respuesta.read()
+
+    def escribir(temporal):
+        with open(temporal, 'wb') as archivo:
+            archivo.write(contenido)
+    _escribir_atomico(ruta, escribir)
+
+
+def leer_csv(ruta):
+    """CSV del Titanic con los tipos de `TIPOS`."""
+    return pd.read_csv(ruta, dtype=TIPOS)
+
+
+def _firma(ruta):
+    """Identifica la versión del CSV de origen (si cambia, se regenera la instantánea)."""
+    estado = os.stat(ruta)
+    return json.dumps({'version': VERSION_INSTANTANEA, 'ruta': os.path.abspath(ruta),
+                       'bytes': estado.st_size, 'mtime_ns': estado.st_mtime_ns})
+
+
+def guardar_instantanea(df, ruta, firma):
+    """Feather sin comprimir (se puede mapear en memoria) con la firma del CSV en los metadatos."""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tabla = tabla.replace_schema_metadata({**tabla.schema.metadata, b'origen': firma.encode('utf-8')})
+    _escribir_atomico(ruta, lambda temporal: feather.write_feather(tabla, temporal, compression='uncompressed'))
+
+
+def cargar_titanic(ruta_csv=None, directorio=DIRECTORIO_DATOS):
+    """DataFrame del Titanic: instantánea mapeada en memoria si está al día, si no desde el CSV."""
+    origen = ruta_csv or os.environ.get("TITANIC_CSV") or os.path.join(directorio, ARCHIVO_CSV)
+    instantanea = os.path.join(directorio, ARCHIVO_INSTANTANEA)
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        feather = None
+
+    firma = _firma(origen) if os.path.exists(origen) else None
+    if feather is not None and os.path.exists(instantanea):
+        tabla = feather.read_table(instantanea, memory_map=True)
+        # Sin CSV (p. ej. en un nodo sin red) vale la última instantánea
+        if firma is None or (tabla.schema.metadata or {}).get(b'origen') == firma.encode('utf-8'):
+            return tabla.to_pandas()
+
+    if firma is None:
+        # Primer arranque sin CSV local: se descarga una sola vez y se guarda en `directorio`
+        origen = os.path.join(directorio, ARCHIVO_CSV)
+        _descargar(URL_TITANIC, origen)
+        firma = _firma(origen)
+    df = leer_csv(origen)
+    if feather is not None:
+        guardar_instantanea(df, instantanea, firma)
+    return df
+
+
+# --- RECURSOS REMOTOS ---
+
+_descargas = {}  # url -> hilo en curso
+_fallos = {}     # url -> momento del último fallo
+_candado = threading.Lock()
+
+
+def ruta_recurso(url, directorio=DIRECTORIO_DATOS):
+    nombre = hashlib.sha256(url.encode('utf-8')).hexdigest()[:16] + os.path.splitext(url)[1]
+    return os.path.join(directorio, DIRECTORIO_RECURSOS, nombre)
+
+
+def _descargar_en_segundo_plano(url, ruta, timeout):
+    try:
+        _descargar(url, ruta, timeout)
+    except Exception:  # sin red o URL caída: el dashboard sigue con la alternativa
+        with _candado:
+            _fallos[url] = time.monotonic()
+    finally:
+        with _candado:
+            _descargas.pop(url, None)
+
+
+def obtener_json_remoto(url, directorio=DIRECTORIO_DATOS, timeout=TIMEOUT_S):
+    """JSON de `url` desde la caché en disco; si aún no está, lanza la descarga y devuelve None."""
+    ruta = ruta_recurso(url, directorio)
+    if os.path.exists(ruta):
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except (OSError, ValueError):
+            os.remove(ruta)  # corrupto: se vuelve a descargar
+    with _candado:
+        reciente = time.monotonic() - _fallos.get(url, -REINTENTO_S) < REINTENTO_S
+        if url not in _descargas and not reciente:
+            hilo = threading.Thread(target=_descargar_en_segundo_plano, args=(url, ruta, timeout),
+                                    name='descarga-recurso', daemon=True)
+            _descargas[url] = hilo
+            hilo.start()
+    return None
+
+
+# --- BENCHMARK ---
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Arranque en frío del dashboard del Titanic, antes y después.")
+    parser.add_argument('--csv', help="CSV local (por defecto, la variable TITANIC_CSV o datos/titanic.csv)")
+    parser.add_argument('--directorio', default=None, help="carpeta de la instantánea (por defecto, una temporal)")
+    args = parser.parse_args()
+    directorio = args.directorio or tempfile.mkdtemp(prefix='titanic_')
+
+    # Antes: CSV desde GitHub y Lottie por HTTP en cada arranque en frío
+    inicio = time.perf_counter()
+    try:
+        pd.read_csv(URL_TITANIC)
+        estado_csv = "ok"
+    except Exception as error:
+        estado_csv = f"falla ({type(error).__name__})"
+    t_csv_remoto = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(URL_LOTTIE_BARCO, timeout=TIMEOUT_S) as respuesta:
+            json.load(respuesta)
+        estado_lottie = "ok"
+    except Exception as error:
+        estado_lottie = f"falla ({type(error).__name__})"
+    t_lottie_remoto = time.perf_counter() - inicio
+
+    # Después: primer arranque (crea la instantánea) y arranques siguientes (mapeo en memoria)
+    inicio = time.perf_counter()
+    df = cargar_titanic(args.csv, directorio)
+    t_primero = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    df = cargar_titanic(args.csv, directorio)
+    t_instantanea = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    obtener_json_remoto(URL_LOTTIE_BARCO, directorio)
+    t_lottie = time.perf_counter() - inicio
+
+    print(f"{len(df)} pasajeros; tipos: {dict(df.dtypes.astype(str))}")
+    print(f"Antes   CSV remoto            : {t_csv_remoto * 1000:8.1f} ms [{estado_csv}]")
+    print(f"Antes   Lottie remoto         : {t_lottie_remoto * 1000:8.1f} ms [{estado_lottie}]")
+    print(f"Después primer arranque (CSV + instantánea): {t_primero * 1000:8.1f} ms")
+    print(f"Después instantánea mapeada   : {t_instantanea * 1000:8.1f} ms")
+    print(f"Después Lottie (no bloquea)   : {t_lottie * 1000:8.1f} ms")
+    origen = args.csv or os.environ.get("TITANIC_CSV") or os.path.join(directorio, ARCHIVO_CSV)
+    sin_tipos = pd.read_csv(origen)
+    print(f"Memoria del DataFrame: {df.memory_usage(deep=True).sum() / 1024:.0f} KB "
+          f"(CSV sin tipos: {sin_tipos.memory_usage(deep=True).sum() / 1024:.0f} KB)")
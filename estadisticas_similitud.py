@@ -0,0 +1,204 @@
+"""
+Estadísticas de similitud intra/inter categoría a partir de un arreglo de etiquetas.
+
+El Ejercicio 4 separaba los pares con un bucle de Python sobre `np.tril_indices`,
+deducía la categoría con `i // 3` y suponía 3 categorías de 3 documentos. Aquí cada
+documento trae su etiqueta (cualquier valor) y `AcumuladorCategorias` agrupa los pares
+con `np.bincount` sobre los códigos de categoría:
+
+- media, desviación típica y número de pares intra e inter de cada categoría;
+- histogramas (por categoría y globales) con bordes fijos en [0, 1].
+
+El acumulador es incremental: recibe pares sueltos (formato COO de similitud_bloques.py)
+o bloques de la matriz (`bloques_jaccard`), así que funciona sin matriz densa. Los pares
+que nunca se le pasan se consideran de similitud 0, como en los pares dispersos que solo
+guardan las similitudes > 0.
+
+Uso desde consola (benchmark frente al bucle original):
+    python estadisticas_similitud.py --docs 3000 --categorias 300
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+NUM_BORDES = 8  # intervalos de los histogramas en [0, 1]
+
+
+def codificar_etiquetas(etiquetas):
+    """Convierte etiquetas arbitrarias en (categorías, códigos), en orden de primera aparición."""
+    posicion = {}
+    codigos = np.fromiter((posicion.setdefault(e, len(posicion)) for e in etiquetas), dtype=np.int64)
+    return list(posicion), codigos
+
+
+class AcumuladorCategorias:
+    """Acumula estadísticas de similitud por categoría recorriendo los pares una sola vez."""
+
+    def __init__(self, etiquetas, intervalos=NUM_BORDES):
+        self.categorias, self.codigos = codificar_etiquetas(etiquetas)
+        self.intervalos = intervalos
+        self.bordes = np.linspace(0.0, 1.0, intervalos + 1)
+        g = len(self.categorias)
+        self.documentos = np.bincount(self.codigos, minlength=g)
+
+        self.suma_intra = np.zeros(g)
+        self.cuadrados_intra = np.zeros(g)
+        self.pares_intra = np.zeros(g, dtype=np.int64)
+        self.suma_inter = np.zeros(g)
+        self.cuadrados_inter = np.zeros(g)
+        self.pares_inter = np.zeros(g, dtype=np.int64)
+        self.histograma_intra = np.zeros((g, intervalos), dtype=np.int64)
+        self.histograma_inter = np.zeros((g, intervalos), dtype=np.int64)
+        self.histograma_inter_global = np.zeros(intervalos, dtype=np.int64)
+
+    def _intervalo(self, similitudes):
+        return np.minimum((similitudes * self.intervalos).astype(np.int64), self.intervalos - 1)
+
+    def agregar_pares(self, filas, columnas, similitudes):
+        """Añade pares de documentos distintos, cada par no ordenado una sola vez."""
+        g, b = len(self.categorias), self.intervalos
+        similitudes = np.asarray(similitudes, dtype=np.float64)
+        ci, cj = self.codigos[np.asarray(filas)], self.codigos[np.asarray(columnas)]
+        intervalos = self._intervalo(similitudes)
+        misma = ci == cj
+
+        c, s, k = ci[misma], similitudes[misma], intervalos[misma]
+        self.suma_intra += np.bincount(c, weights=s, minlength=g)
+        self.cuadrados_intra += np.bincount(c, weights=s * s, minlength=g)
+        self.pares_intra += np.bincount(c, minlength=g)
+        self.histograma_intra += np.bincount(c * b + k, minlength=g * b).reshape(g, b)
+
+        # Un par entre categorías cuenta como inter para las dos
+        distinta = ~misma
+        s, k = similitudes[distinta], intervalos[distinta]
+        c = np.concatenate([ci[distinta], cj[distinta]])
+        s2, k2 = np.concatenate([s, s]), np.concatenate([k, k])
+        self.suma_inter += np.bincount(c, weights=s2, minlength=g)
+        self.cuadrados_inter += np.bincount(c, weights=s2 * s2, minlength=g)
+        self.pares_inter += np.bincount(c, minlength=g)
+        self.histograma_inter += np.bincount(c * b + k2, minlength=g * b).reshape(g, b)
+        self.histograma_inter_global += np.bincount(k, minlength=b)
+
+    def agregar_bloque(self, fila0, col0, bloque):
+        """Añade un bloque de `bloques_jaccard` (solo los pares i < j que no son NaN)."""
+        filas, columnas = np.nonzero(~np.isnan(bloque))
+        i, j = filas + fila0, columnas + col0
+        superior = i < j
+        self.agregar_pares(i[superior], j[superior], bloque[filas[superior], columnas[superior]])
+
+    def _completos(self):
+        """Totales de pares de cada categoría, con los pares no vistos como ceros."""
+        n = self.documentos
+        total_intra = n * (n - 1) // 2
+        total_inter = n * (n.sum() - n)
+        return total_intra, total_inter
+
+    def por_categoria(self):
+        """DataFrame con una fila por categoría: documentos, pares, media y desviación intra/inter."""
+        total_intra, total_inter = self._completos()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            media_intra = self.suma_intra / total_intra
+            media_inter = self.suma_inter / total_inter
+            desv_intra = np.sqrt(np.maximum(self.cuadrados_intra / total_intra - media_intra ** 2, 0))
+            desv_inter = np.sqrt(np.maximum(self.cuadrados_inter / total_inter - media_inter ** 2, 0))
+        return pd.DataFrame({
+            'categoria': self.categorias,
+            'documentos': self.documentos,
+            'pares_intra': total_intra,
+            'media_intra': media_intra,
+            'desv_intra': desv_intra,
+            'pares_inter': total_inter,
+            'media_inter': media_inter,
+            'desv_inter': desv_inter,
+        })
+
+    def histogramas(self):
+        """(bordes, intra, inter): histogramas globales de los pares intra e inter categoría."""
+        total_intra, total_inter = self._completos()
+        intra = self.histograma_intra.sum(axis=0)
+        inter = self.histograma_inter_global.copy()
+        # Los pares no vistos (similitud 0) van al primer intervalo
+        intra[0] += total_intra.sum() - self.pares_intra.sum()
+        inter[0] += total_inter.sum() // 2 - inter.sum()
+        return self.bordes, intra, inter
+
+    def histogramas_por_categoria(self):
+        """(bordes, intra, inter) con una fila de histograma por categoría."""
+        total_intra, total_inter = self._completos()
+        intra, inter = self.histograma_intra.copy(), self.histograma_inter.copy()
+        intra[:, 0] += total_intra - self.pares_intra
+        inter[:, 0] += total_inter - self.pares_inter
+        return self.bordes, intra, inter
+
+    def medias_globales(self):
+        """(media_intra, media_inter) sobre todos los pares de cada tipo."""
+        total_intra, total_inter = self._completos()
+        pares_intra, pares_inter = total_intra.sum(), total_inter.sum() // 2
+        media_intra = self.suma_intra.sum() / pares_intra if pares_intra else float('nan')
+        media_inter = self.suma_inter.sum() / 2 / pares_inter if pares_inter else float('nan')
+        return media_intra, media_inter
+
+
+def estadisticas_matriz(matriz, etiquetas, intervalos=NUM_BORDES):
+    """Atajo para una matriz de similitud densa: recorre su triángulo superior una vez."""
+    acumulador = AcumuladorCategorias(etiquetas, intervalos)
+    filas, columnas = np.triu_indices(len(matriz), k=1)
+    acumulador.agregar_pares(filas, columnas, matriz[filas, columnas])
+    return acumulador
+
+
+# --- BENCHMARK ---
+
+def _estadisticas_bucle(matriz, categorias):
+    """Bucle del Ejercicio 4 (generalizado a etiquetas) como referencia."""
+    intra, inter = [], []
+    indices_tril = np.tril_indices(len(matriz), k=-1)
+    for i, j in zip(indices_tril[0], indices_tril[1]):
+        if categorias[i] == categorias[j]:
+            intra.append(matriz[i, j])
+        else:
+            inter.append(matriz[i, j])
+    return np.mean(intra), np.mean(inter)
+
+
+if __name__ == '__main__':
+    import random
+
+    from jaccard_disperso import bloques_jaccard, matriz_binaria, matriz_jaccard
+
+    parser = argparse.ArgumentParser(description="Benchmark de las estadísticas por categoría.")
+    parser.add_argument('--docs', type=int, default=3000)
+    parser.add_argument('--categorias', type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulario = [f"palabra{i}" for i in range(5000)]
+    temas = [rng.sample(vocabulario, 60) for _ in range(args.categorias)]
+    etiquetas = [i % args.categorias for i in range(args.docs)]
+    conjuntos = [set(rng.sample(temas[e], rng.randint(5, 20))) for e in etiquetas]
+    matriz = matriz_jaccard(conjuntos)
+
+    inicio = time.perf_counter()
+    referencia = _estadisticas_bucle(matriz, etiquetas)
+    t_bucle = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    acumulador = estadisticas_matriz(matriz, etiquetas)
+    t_bincount = time.perf_counter() - inicio
+
+    # Versión por bloques: sin matriz densa
+    inicio = time.perf_counter()
+    por_bloques = AcumuladorCategorias(etiquetas)
+    for bloque in bloques_jaccard(matriz_binaria(conjuntos)[0]):
+        por_bloques.agregar_bloque(*bloque)
+    t_bloques = time.perf_counter() - inicio
+
+    print(f"Bucle sobre tril_indices : {t_bucle:.2f} s")
+    print(f"bincount (matriz densa)  : {t_bincount:.2f} s  (x{t_bucle / t_bincount:.0f}, "
+          f"medias iguales: {np.allclose(acumulador.medias_globales(), referencia)})")
+    print(f"bincount por bloques     : {t_bloques:.2f} s  (incluye el cálculo de Jaccard, "
+          f"medias iguales: {np.allclose(por_bloques.medias_globales(), referencia)})")
+    print(acumulador.por_categoria().head())
@@ -0,0 +1,138 @@
+"""
+Similitud de Jaccard vectorizada con matrices binarias dispersas.
+
+El Ejercicio 4 llena `matriz_similitud` con un doble bucle `for i / for j` que crea una
+intersección y una unión nuevas por cada par (y calcula ambos triángulos y la diagonal).
+Aquí cada conjunto de palabras es una fila de una matriz binaria CSR `X`:
+
+- Intersecciones: |A ∩ B| = (X @ X.T)[a, b]
+- Uniones:        |A ∪ B| = |A| + |B| - |A ∩ B|   (|A| = palabras de la fila)
+
+Solo se calcula el triángulo superior, por bloques de filas, y se respeta la regla del
+ejercicio: si la unión es vacía (dos conjuntos vacíos), la similitud es 1.0.
+
+Uso desde consola (benchmark contra el doble bucle):
+    python jaccard_disperso.py --docs 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+from scipy import sparse
+
+TAM_BLOQUE = 1024
+
+
+# --- CODIFICACIÓN ---
+
+def matriz_binaria(conjuntos, vocabulario=None):
+    """Codifica una lista de conjuntos como matriz CSR binaria (documentos x palabras).
+
+    Devuelve (X, vocabulario), donde `vocabulario` es un dict palabra -> columna.
+    """
+    if vocabulario is None:
+        vocabulario = {}
+    indices = []
+    indptr = [0]
+    for conjunto in conjuntos:
+        for palabra in conjunto:
+            columna = vocabulario.get(palabra)
+            if columna is None:
+                columna = vocabulario[palabra] = len(vocabulario)
+            indices.append(columna)
+        indptr.append(len(indices))
+
+    X = sparse.csr_matrix((np.ones(len(indices), dtype=np.int32), np.array(indices, dtype=np.int64),
+                           np.array(indptr, dtype=np.int64)), shape=(len(conjuntos), len(vocabulario)))
+    X.sort_indices()
+    return X, vocabulario
+
+
+# --- CÁLCULO POR BLOQUES ---
+
+def jaccard_bloque(X_filas, XT_columnas, cardinalidades_filas, cardinalidades_columnas):
+    """Similitudes densas entre las filas de `X_filas` y las columnas de `XT_columnas`."""
+    intersecciones = (X_filas @ XT_columnas).toarray()
+    uniones = cardinalidades_filas[:, None] + cardinalidades_columnas[None, :] - intersecciones
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(uniones > 0, intersecciones / uniones, 1.0)
+
+
+def bloques_jaccard(X, tam_bloque=TAM_BLOQUE):
+    """Genera (fila0, col0, bloque) recorriendo solo los bloques del triángulo superior.
+
+    `bloque[a, b]` es la similitud entre los documentos `fila0 + a` y `col0 + b`. En los
+    bloques de la diagonal, las posiciones con `col0 + b < fila0 + a` (pares que ya
+    aparecen en el triángulo superior) se dejan en NaN. La memoria por bloque es
+    O(tam_bloque²), independiente del número de documentos.
+    """
+    n = X.shape[0]
+    cardinalidades = np.diff(X.indptr)  # |A| = número de palabras de cada fila
+    XT = X.T.tocsc()
+
+    for fila0 in range(0, n, tam_bloque):
+        fila1 = min(fila0 + tam_bloque, n)
+        X_filas = X[fila0:fila1]
+        for col0 in range(fila0, n, tam_bloque):
+            col1 = min(col0 + tam_bloque, n)
+            bloque = jaccard_bloque(X_filas, XT[:, col0:col1], cardinalidades[fila0:fila1],
+                                    cardinalidades[col0:col1])
+            if col0 == fila0:
+                bloque[np.tril_indices(fila1 - fila0, k=-1, m=col1 - col0)] = np.nan
+            yield fila0, col0, bloque
+
+
+def matriz_jaccard(conjuntos, tam_bloque=TAM_BLOQUE):
+    """Matriz de similitud completa (n x n), equivalente al doble bucle del Ejercicio 4.
+
+    Solo se calcula el triángulo superior; el inferior se copia por simetría.
+    """
+    X, _ = matriz_binaria(conjuntos)
+    n = X.shape[0]
+    matriz = np.zeros((n, n))
+    for fila0, col0, bloque in bloques_jaccard(X, tam_bloque):
+        filas, columnas = np.nonzero(~np.isnan(bloque))
+        matriz[filas + fila0, columnas + col0] = bloque[filas, columnas]
+    inferior = np.tril_indices(n, k=-1)
+    matriz[inferior] = matriz.T[inferior]
+    return matriz
+
+
+# --- BENCHMARK ---
+
+def _jaccard_similarity(set1, set2):
+    """Similitud de Jaccard par a par con conjuntos de Python (la del Ejercicio 4 original), como referencia."""
+    interseccion = set1.intersection(set2)
+    union = set1.union(set2)
+    if not union:
+        return 1.0
+    return len(interseccion) / len(union)
+
+
+if __name__ == '__main__':
+    import random
+
+    parser = argparse.ArgumentParser(description="Benchmark de Jaccard disperso frente al doble bucle.")
+    parser.add_argument('--docs', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulario = [f"palabra{i}" for i in range(5000)]
+    conjuntos = [set(rng.sample(vocabulario, rng.randint(0, 30))) for _ in range(args.docs)]
+
+    inicio = time.perf_counter()
+    n = len(conjuntos)
+    referencia = np.zeros((n, n))
+    for i in range(n):
+        for j in range(n):
+            referencia[i, j] = _jaccard_similarity(conjuntos[i], conjuntos[j])
+    t_bucle = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    matriz = matriz_jaccard(conjuntos)
+    t_disperso = time.perf_counter() - inicio
+
+    print(f"Doble bucle : {t_bucle:.2f} s")
+    print(f"CSR X @ X.T : {t_disperso:.2f} s  (x{t_bucle / t_disperso:.0f}, "
+          f"idéntico: {np.array_equal(matriz, referencia)})")
@@ -0,0 +1,169 @@
+"""
+Léxicos ponderados en un formato binario compacto y mapeado en memoria.
+
+Los léxicos de los ejercicios son conjuntos escritos a mano dentro de cada script. Para
+léxicos externos grandes (por ejemplo el Spanish Sentiment Lexicon, SEL) los
+compilamos UNA vez desde CSV/TSV a un archivo binario:
+
+    cabecera (32 bytes) | claves ordenadas (n x ancho bytes, UTF-8) | pesos float32 (n)
+
+Cada proceso lo abre con `mmap`: la carga es O(1), el archivo se comparte entre procesos
+a través de la caché de páginas del sistema operativo y las búsquedas son binarias
+(`np.searchsorted`) sobre las claves, sin construir un diccionario por proceso.
+
+Uso desde consola:
+    python lexico_binario.py compilar SEL.tsv sel.lex --columna-palabra 0 --columna-peso 5
+    python lexico_binario.py consultar sel.lex feliz triste
+"""
+
+import argparse
+import csv
+import mmap
+import struct
+
+import numpy as np
+
+MAGIA = b'LEXBIN01'
+_CABECERA = struct.Struct('<8sQQQ')  # magia, n, ancho de clave, desplazamiento de los pesos
+
+
+# --- COMPILACIÓN ---
+
+def _normalizar(palabra):
+    return ' '.join(palabra.lower().split())
+
+
+def leer_lexico_csv(ruta, columna_palabra=0, columna_peso=1, delimitador=None, cabecera=True):
+    """Lee un léxico CSV/TSV y devuelve un dict palabra -> peso.
+
+    Las columnas pueden indicarse por posición o por nombre (si hay cabecera). Si una
+    palabra aparece varias veces, prevalece la última.
+    """
+    if delimitador is None:
+        delimitador = '\t' if ruta.endswith(('.tsv', '.txt')) else ','
+
+    pesos = {}
+    with open(ruta, encoding='utf-8', newline='') as archivo:
+        lector = csv.reader(archivo, delimiter=delimitador)
+        if cabecera:
+            nombres = next(lector, [])
+            if isinstance(columna_palabra, str):
+                columna_palabra = nombres.index(columna_palabra)
+            if isinstance(columna_peso, str):
+                columna_peso = nombres.index(columna_peso)
+        for fila in lector:
+            if len(fila) <= max(columna_palabra, columna_peso):
+                continue
+            palabra = _normalizar(fila[columna_palabra])
+            try:
+                peso = float(fila[columna_peso].replace(',', '.'))
+            except ValueError:
+                continue
+            if palabra:
+                pesos[palabra] = peso
+    return pesos
+
+
+def compilar_lexico(pesos, ruta_salida):
+    """Escribe un mapeo palabra -> peso en el formato binario mapeable."""
+    claves = sorted(_normalizar(p).encode('utf-8') for p in pesos)
+    valores = {_normalizar(p).encode('utf-8'): float(v) for p, v in pesos.items()}
+    ancho = max((len(c) for c in claves), default=1)
+
+    tabla = np.array(claves, dtype=f'S{ancho}')
+    arreglo_pesos = np.array([valores[c] for c in claves], dtype=np.float32)
+    desplazamiento_pesos = _CABECERA.size + tabla.nbytes
+    desplazamiento_pesos += -desplazamiento_pesos % 4  # alineamos los float32
+
+    with open(ruta_salida, 'wb') as archivo:
+        archivo.write(_CABECERA.pack(MAGIA, len(claves), ancho, desplazamiento_pesos))
+        archivo.write(tabla.tobytes())
+        archivo.write(b'\0' * (desplazamiento_pesos - _CABECERA.size - tabla.nbytes))
+        archivo.write(arreglo_pesos.tobytes())
+
+
+def compilar_csv(ruta_csv, ruta_salida, **kwargs):
+    """Atajo: lee un CSV/TSV y lo compila al formato binario."""
+    compilar_lexico(leer_lexico_csv(ruta_csv, **kwargs), ruta_salida)
+
+
+# --- CARGA MAPEADA EN MEMORIA ---
+
+class LexicoMapeado:
+    """Léxico de solo lectura respaldado por un archivo mapeado en memoria."""
+
+    def __init__(self, ruta):
+        with open(ruta, 'rb') as archivo:
+            self._mmap = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magia, n, ancho, desplazamiento_pesos = _CABECERA.unpack_from(self._mmap, 0)
+        if magia != MAGIA:
+            raise ValueError(f"{ruta} no es un léxico compilado (cabecera desconocida)")
+
+        self.ancho = ancho
+        self.claves = np.frombuffer(self._mmap, dtype=f'S{ancho}', count=n, offset=_CABECERA.size)
+        self.pesos = np.frombuffer(self._mmap, dtype=np.float32, count=n, offset=desplazamiento_pesos)
+
+    def __len__(self):
+        return len(self.claves)
+
+    def indices(self, palabras):
+        """Posición de cada palabra en el léxico (-1 si no está), en una sola búsqueda vectorizada."""
+        consulta = np.array([p.encode('utf-8') for p in palabras], dtype=f'S{self.ancho + 1}')
+        if not len(consulta) or not len(self.claves):
+            return np.full(len(consulta), -1, dtype=np.int64)
+        posiciones = np.searchsorted(self.claves, consulta)
+        encontradas = np.minimum(posiciones, len(self.claves) - 1)
+        return np.where(self.claves[encontradas] == consulta, encontradas, -1).astype(np.int64)
+
+    def pesos_de(self, palabras, defecto=0.0):
+        """Peso de cada palabra (o `defecto` si no está en el léxico)."""
+        indices = self.indices(palabras)
+        return np.where(indices >= 0, self.pesos[np.maximum(indices, 0)], defecto)
+
+    def get(self, palabra, defecto=None):
+        indice = self.indices([palabra])[0]
+        return float(self.pesos[indice]) if indice >= 0 else defecto
+
+    def __contains__(self, palabra):
+        return self.indices([palabra])[0] >= 0
+
+    def __getitem__(self, palabra):
+        peso = self.get(palabra)
+        if peso is None:
+            raise KeyError(palabra)
+        return peso
+
+    def cerrar(self):
+        """Libera el mapeo. `claves` y `pesos` son vistas del archivo: quien las guarde fuera
+        (p. ej. `ClasificadorLote`, que tiene su propio `cerrar`) debe soltarlas antes; si
+        no, `mmap.close` lanza `BufferError`."""
+        self.claves = self.pesos = None
+        self._mmap.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compila y consulta léxicos binarios.")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    compilar = subcomandos.add_parser('compilar', help="CSV/TSV -> formato binario")
+    compilar.add_argument('entrada')
+    compilar.add_argument('salida')
+    compilar.add_argument('--columna-palabra', default='0')
+    compilar.add_argument('--columna-peso', default='1')
+    compilar.add_argument('--sin-cabecera', action='store_true')
+
+    consultar = subcomandos.add_parser('consultar', help="Busca palabras en un léxico compilado")
+    consultar.add_argument('lexico')
+    consultar.add_argument('palabras', nargs='+')
+
+    args = parser.parse_args()
+    if args.comando == 'compilar':
+        columnas = [int(c) if c.isdigit() else c for c in (args.columna_palabra, args.columna_peso)]
+        pesos = leer_lexico_csv(args.entrada, *columnas, cabecera=not args.sin_cabecera)
+        compilar_lexico(pesos, args.salida)
+        print(f"Léxico compilado: {len(pesos)} entradas -> {args.salida}")
+    else:
+        lexico = LexicoMapeado(args.lexico)
+        for palabra in args.palabras:
+            print(f"{palabra}: {lexico.get(_normalizar(palabra))}")
@@ -0,0 +1,23 @@
+"""
+Stopwords y léxicos de sentimiento compartidos por los ejercicios, el dashboard y los servicios.
+
+- `STOPWORDS_ES` / `STOPWORDS_EN`: palabras vacías del dashboard de conteo y de la limpieza.
+- `STOPWORDS_SENTIMIENTO`: las de `STOPWORDS_ES` salvo "no", que se conserva porque
+  cambia el sentido de la frase (Ejercicio 3).
+- `LEXICO_POSITIVO` / `LEXICO_NEGATIVO`: léxicos simplificados del Ejercicio 3.
+"""
+
+# --- STOPWORDS ---
+STOPWORDS_ES = set([
+    'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'del', 'las', 'un', 'por', 'con', 'no', 'una', 'su', 'para', 'es', 'al', 'lo', 'como', 'más', 'pero', 'sus', 'le', 'ha', 'me', 'sin', 'sobre', 'este', 'ya', 'entre', 'cuando', 'todo', 'esta', 'ser', 'son', 'dos', 'también', 'fue', 'había', 'era', 'muy', 'hasta', 'desde', 'mucho', 'hacia', 'mi', 'se', 'ni', 'ese', 'yo', 'qué', 'e', 'o', 'u', 'algunos', 'aspectos'
+])
+
+STOPWORDS_EN = set([
+    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', "you're", "you've", "you'll", "you'd", 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', "she's", 'her', 'hers', 'herself', 'it', "it's", 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom', 'this', 'that', "that'll", 'these', 'those', 'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until', 'while', 'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between', 'into', 'through', 'during', 'before', 'after', 'above', 'below', 'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will', 'just', 'don', "don't", 'should', "should've", 'now', 'd', 'll', 'm', 'o', 're', 've', 'y', 'ain', 'aren', "aren't", 'couldn', "couldn't", 'didn', "didn't", 'doesn', "doesn't", 'hadn', "hadn't", 'hasn', "hasn't", 'haven', "haven't", 'isn', "isn't", 'ma', 'mightn', "mightn't", 'mustn', "mustn't", 'needn', "needn't", 'shan', "shan't", 'shouldn', "shouldn't", 'wasn', "wasn't", 'weren', "weren't", 'won', "won't", 'wouldn', "wouldn't"
+])
+
+STOPWORDS_SENTIMIENTO = STOPWORDS_ES - {'no'}
+
+# --- LÉXICOS DE SENTIMIENTO ---
+LEXICO_POSITIVO = {"encanta", "fantástico", "útil", "adecuado", "increíble", "recomiendo", "totalmente", "mejorar"}
+LEXICO_NEGATIVO = {"terrible", "decepcionante", "caro", "barato", "pésima", "tardó", "mal", "poquísimo", "desastre"}
@@ -0,0 +1,236 @@
+"""
+Índice MinHash + LSH para encontrar casi-duplicados a escala de corpus.
+
+El Ejercicio 4 obtiene los "pares más similares" ordenando los n² pares de la matriz.
+Para millones de documentos usamos:
+
+- MinHash: una firma de `num_perm` enteros por conjunto de palabras; la fracción de
+  posiciones iguales entre dos firmas estima su similitud de Jaccard.
+- LSH por bandas: la firma se corta en `bandas` trozos de `filas` valores; dos
+  documentos son candidatos si coinciden en al menos una banda completa. Con un buen
+  ajuste, los pares por encima del umbral casi siempre colisionan y los demás casi nunca.
+
+Los candidatos se verifican con el Jaccard exacto, así que no hay falsos positivos en
+el resultado. Buscar pares similares pasa a ser casi lineal en el número de documentos.
+
+Uso desde consola (recall y velocidad frente al cálculo exacto de todos los pares):
+    python minhash_lsh.py --docs 20000 --umbral 0.8
+"""
+
+import argparse
+import hashlib
+import time
+from collections import defaultdict
+from itertools import chain
+
+import numpy as np
+
+MAX_HASH = np.uint32((1 << 32) - 1)
+TAM_LOTE = 2048  # conjuntos por lote al calcular firmas
+PROB_OBJETIVO = 0.95  # probabilidad mínima de que un par justo en el umbral sea candidato
+
+
+def jaccard(conjunto1, conjunto2):
+    """Jaccard exacto, con la misma regla que el Ejercicio 4 (unión vacía = 1.0)."""
+    union = len(conjunto1 | conjunto2)
+    return len(conjunto1 & conjunto2) / union if union else 1.0
+
+
+def _parametros_lsh(umbral, num_perm, prob_objetivo=PROB_OBJETIVO):
+    """Elige (bandas, filas) para el umbral dado.
+
+    Un par con similitud s es candidato con probabilidad 1 - (1 - s^filas)^bandas. Se
+    toma el mayor número de filas (menos falsos candidatos) con el que un par justo en
+    el umbral sigue siendo candidato con probabilidad >= `prob_objetivo`.
+    """
+    for filas in range(num_perm, 0, -1):
+        bandas = num_perm // filas
+        if 1 - (1 - umbral ** filas) ** bandas >= prob_objetivo:
+            return bandas, filas
+    return num_perm, 1
+
+
+# --- FIRMAS MINHASH ---
+
+class _HashesPalabra(dict):
+    """Caché palabra -> hash de 32 bits (blake2b), calculado solo la primera vez."""
+
+    def __missing__(self, palabra):
+        valor = self[palabra] = int.from_bytes(
+            hashlib.blake2b(palabra.encode('utf-8'), digest_size=4).digest(), 'little')
+        return valor
+
+
+class MinHash:
+    """Generador de firmas MinHash con `num_perm` permutaciones aleatorias.
+
+    Cada permutación es un hash multiplicativo h(x) = ((a·x + b) mod 2^64) >> 32 sobre el
+    hash de 32 bits de la palabra (sin divisiones: el módulo lo hace el desbordamiento de
+    uint64); la firma guarda el mínimo de cada permutación sobre el conjunto.
+    """
+
+    def __init__(self, num_perm=128, semilla=1):
+        rng = np.random.RandomState(semilla)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, 1 << 63, size=(num_perm, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.randint(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64)
+        self._hashes = _HashesPalabra()
+
+    def firmas(self, conjuntos, tam_lote=TAM_LOTE):
+        """Firmas de varios conjuntos a la vez: arreglo (n, num_perm) de uint32.
+
+        Un conjunto vacío recibe la firma máxima, así que dos vacíos coinciden
+        (igual que en el Ejercicio 4, donde su similitud es 1.0).
+        """
+        firmas = np.full((len(conjuntos), self.num_perm), MAX_HASH, dtype=np.uint32)
+        for inicio in range(0, len(conjuntos), tam_lote):
+            lote = conjuntos[inicio:inicio + tam_lote]
+            longitudes = np.fromiter(map(len, lote), dtype=np.int64, count=len(lote))
+            no_vacios = np.flatnonzero(longitudes)
+            if not len(no_vacios):
+                continue
+            valores = np.fromiter(map(self._hashes.__getitem__, chain.from_iterable(lote)),
+                                  dtype=np.uint64, count=int(longitudes.sum()))
+            # (num_perm, palabras): cada permutación es una fila contigua
+            permutados = ((self.a * valores + self.b) >> np.uint64(32)).astype(np.uint32)
+            # Mínimo por documento: reduceat sobre el inicio de cada conjunto no vacío
+            inicios = (np.cumsum(longitudes) - longitudes)[no_vacios]
+            firmas[inicio + no_vacios] = np.minimum.reduceat(permutados, inicios, axis=1).T
+        return firmas
+
+    def firma(self, conjunto):
+        """Firma MinHash (arreglo de `num_perm` enteros) de un conjunto de palabras."""
+        return self.firmas([conjunto])[0]
+
+
+# --- ÍNDICE LSH ---
+
+class IndiceLSH:
+    """Índice LSH por bandas con inserción incremental y verificación exacta."""
+
+    def __init__(self, umbral=0.8, num_perm=128, semilla=1):
+        self.umbral = umbral
+        self.minhash = MinHash(num_perm, semilla)
+        self.bandas, self.filas = _parametros_lsh(umbral, num_perm)
+        # Cada banda se resume en un entero de 64 bits; una colisión casual solo añade
+        # un candidato de más, que la verificación exacta descarta.
+        self._coeficientes = np.random.RandomState(semilla + 1).randint(
+            1, 1 << 63, size=self.filas, dtype=np.uint64) | np.uint64(1)
+        self.tablas = [defaultdict(list) for _ in range(self.bandas)]
+        self.conjuntos = {}
+
+    def __len__(self):
+        return len(self.conjuntos)
+
+    def _claves(self, conjuntos):
+        """Clave de cada banda para cada conjunto: arreglo (n, bandas)."""
+        firmas = self.minhash.firmas(conjuntos)[:, :self.bandas * self.filas].astype(np.uint64)
+        return (firmas.reshape(len(conjuntos), self.bandas, self.filas) * self._coeficientes).sum(axis=2)
+
+    def insertar_lote(self, doc_ids, conjuntos):
+        """Añade varios documentos (sus conjuntos de palabras) al índice."""
+        conjuntos = [frozenset(c) for c in conjuntos]
+        doc_ids = list(doc_ids)
+        if len(doc_ids) != len(conjuntos):
+            raise ValueError("Debe haber un identificador por conjunto")
+        repetidos = [d for d in doc_ids if d in self.conjuntos]
+        if repetidos or len(set(doc_ids)) != len(doc_ids):
+            raise KeyError(f"Identificadores repetidos: {repetidos or doc_ids}")
+
+        self.conjuntos.update(zip(doc_ids, conjuntos))
+        for banda, claves in enumerate(self._claves(conjuntos).T.tolist()):
+            tabla = self.tablas[banda]
+            for doc_id, clave in zip(doc_ids, claves):
+                tabla[clave].append(doc_id)
+
+    def insertar(self, doc_id, conjunto):
+        """Añade un documento (su conjunto de palabras) al índice."""
+        self.insertar_lote([doc_id], [conjunto])
+
+    def candidatos(self, conjunto):
+        """Documentos que comparten al menos una banda con `conjunto`."""
+        encontrados = set()
+        for tabla, clave in zip(self.tablas, self._claves([frozenset(conjunto)])[0].tolist()):
+            encontrados.update(tabla.get(clave, ()))
+        return encontrados
+
+    def consultar(self, conjunto, umbral=None):
+        """Todos los documentos con Jaccard >= umbral respecto a `conjunto`, de mayor a menor."""
+        umbral = self.umbral if umbral is None else umbral
+        conjunto = frozenset(conjunto)
+        resultados = []
+        for doc_id in self.candidatos(conjunto):
+            similitud = jaccard(conjunto, self.conjuntos[doc_id])
+            if similitud >= umbral:
+                resultados.append((doc_id, similitud))
+        return sorted(resultados, key=lambda r: r[1], reverse=True)
+
+    def pares_similares(self, umbral=None):
+        """Pares (i, j, similitud) con Jaccard >= umbral, ordenados de mayor a menor.
+
+        `i` es el documento insertado antes. Solo se verifican los pares que comparten
+        alguna cubeta, así que el coste depende de los candidatos y no de n².
+        """
+        umbral = self.umbral if umbral is None else umbral
+        vistos = set()
+        pares = []
+        for tabla in self.tablas:
+            for cubeta in tabla.values():
+                if len(cubeta) < 2:
+                    continue
+                for posicion, primero in enumerate(cubeta):
+                    for segundo in cubeta[posicion + 1:]:
+                        par = (primero, segundo)
+                        if par in vistos:
+                            continue
+                        vistos.add(par)
+                        similitud = jaccard(self.conjuntos[primero], self.conjuntos[segundo])
+                        if similitud >= umbral:
+                            pares.append((primero, segundo, similitud))
+        return sorted(pares, key=lambda p: p[2], reverse=True)
+
+
+if __name__ == '__main__':
+    import random
+
+    from jaccard_disperso import bloques_jaccard, matriz_binaria
+
+    parser = argparse.ArgumentParser(description="Recall y velocidad de MinHash+LSH frente al cálculo exacto.")
+    parser.add_argument('--docs', type=int, default=20_000)
+    parser.add_argument('--umbral', type=float, default=0.8)
+    parser.add_argument('--num-perm', type=int, default=128)
+    args = parser.parse_args()
+
+    # Corpus sintético: documentos base y copias ligeramente modificadas (casi-duplicados)
+    rng = random.Random(0)
+    vocabulario = [f"palabra{i}" for i in range(20_000)]
+    conjuntos = []
+    while len(conjuntos) < args.docs:
+        base = set(rng.sample(vocabulario, rng.randint(20, 60)))
+        conjuntos.append(base)
+        for _ in range(rng.randint(0, 3)):
+            copia = set(base)
+            for palabra in rng.sample(sorted(copia), max(1, len(copia) // 15)):
+                copia.discard(palabra)
+                copia.add(rng.choice(vocabulario))
+            conjuntos.append(copia)
+    conjuntos = conjuntos[:args.docs]
+
+    inicio = time.perf_counter()
+    X, _ = matriz_binaria(conjuntos)
+    exactos = set()
+    for fila0, col0, bloque in bloques_jaccard(X):
+        filas, columnas = np.nonzero(bloque >= args.umbral)
+        exactos.update((int(i + fila0), int(j + col0)) for i, j in zip(filas, columnas) if i + fila0 < j + col0)
+    t_exacto = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    indice = IndiceLSH(args.umbral, args.num_perm)
+    indice.insertar_lote(range(len(conjuntos)), conjuntos)
+    encontrados = {(i, j) for i, j, _ in indice.pares_similares()}
+    t_lsh = time.perf_counter() - inicio
+
+    recall = len(encontrados & exactos) / len(exactos) if exactos else 1.0
+    print(f"LSH con {indice.bandas} bandas x {indice.filas} filas")
+    print(f"Exacto (todos los pares): {t_exacto:.2f} s, {len(exactos)} pares >= {args.umbral}")
+    print(f"MinHash + LSH           : {t_lsh:.2f} s, {len(encontrados)} pares, recall {recall:.3f}")
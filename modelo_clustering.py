@@ -0,0 +1,309 @@
+"""
+Persistencia del modelo del Ejercicio 5 (vocabulario, IDF y centroides) e inferencia rápida.
+
+Cada ejecución del Ejercicio 5 vuelve a ajustar `TfidfVectorizer` y `KMeans(n_init=10)`.
+Aquí el modelo se ajusta una vez, se guarda y después se asignan documentos nuevos:
+
+- Formato: un directorio por versión (`v0001`, `v0002`, ...) con el vocabulario ordenado
+  como bytes UTF-8 concatenados (`terminos_utf8.npy`) más sus desplazamientos
+  (`desplazamientos.npy`), `idf.npy`, `centroides.npy` y `modelo.json` (versión del
+  formato, parámetros del tokenizador y metadatos). Los `.npy` se abren mapeados en
+  memoria: cargar cuesta milisegundos aunque el vocabulario sea grande.
+- Los términos de cada lote se buscan en el vocabulario con una búsqueda binaria
+  vectorizada sobre el mapeo (como `np.searchsorted` en lexico_binario.py), sin construir
+  un diccionario de todo el vocabulario.
+- `ModeloClustering.asignar(documentos)` replica el `TfidfVectorizer` por defecto
+  (minúsculas, `(?u)\\b\\w\\w+\\b`, idf suavizado, normalización L2) solo con `re` y NumPy:
+  no importa scikit-learn, SciPy ni matplotlib. Cada lote se tokeniza con un solo
+  `findall` sobre el texto unido y el producto con los centroides se agrupa por
+  documento con `np.add.reduceat`.
+
+Uso desde consola (benchmark frente a `vectorizer.transform` + `kmeans.predict`):
+    python modelo_clustering.py --docs 200000
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+VERSION_FORMATO = 2
+ARCHIVO_METADATOS = 'modelo.json'
+TAM_LOTE = 50_000
+SEPARADOR = '\x00'   # une los documentos de un lote; no forma parte de ningún token
+SIN_TERMINO = -1
+COLUMNA_SEPARADOR = -2
+
+
+# --- GUARDADO ---
+
+def _comprobar_vectorizador(vectorizer):
+    """Solo se replican las opciones que `asignar` sabe reproducir."""
+    compatibles = {'analyzer': 'word', 'ngram_range': (1, 1), 'norm': 'l2', 'use_idf': True,
+                   'smooth_idf': True, 'sublinear_tf': False, 'binary': False,
+                   'strip_accents': None, 'preprocessor': None, 'tokenizer': None}
+    distintas = [nombre for nombre, valor in compatibles.items() if getattr(vectorizer, nombre) != valor]
+    if distintas:
+        raise ValueError(f"Opciones de TfidfVectorizer no soportadas: {', '.join(distintas)}")
+
+
+def _versiones(directorio):
+    if not os.path.isdir(directorio):
+        return []
+    return sorted(int(nombre[1:]) for nombre in os.listdir(directorio)
+                  if re.fullmatch(r'v\d+', nombre) and os.path.isdir(os.path.join(directorio, nombre)))
+
+
+def guardar_modelo(directorio, vectorizer, kmeans, metadatos=None):
+    """Guarda un `TfidfVectorizer` y un `KMeans` ajustados como nueva versión en `directorio`.
+
+    Devuelve la ruta de la versión escrita. La versión se escribe en un directorio temporal
+    y se renombra al final, así que un lector nunca ve una versión a medias.
+    """
+    _comprobar_vectorizador(vectorizer)
+    terminos = np.asarray(vectorizer.get_feature_names_out(), dtype=str)
+    orden = np.argsort(terminos)  # get_feature_names_out ya viene ordenado; por si acaso
+    centroides = np.asarray(kmeans.cluster_centers_, dtype=np.float64)[:, orden]
+    # El orden de los bytes UTF-8 es el de los puntos de código: el vocabulario sigue ordenado
+    codificados = [termino.encode('utf-8') for termino in terminos[orden].tolist()]
+    desplazamientos = np.zeros(len(codificados) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, codificados), dtype=np.int64, count=len(codificados)), out=desplazamientos[1:])
+    utf8 = np.frombuffer(b''.join(codificados), dtype=np.uint8)
+
+    os.makedirs(directorio, exist_ok=True)
+    version = (_versiones(directorio) or [0])[-1] + 1
+    temporal = tempfile.mkdtemp(prefix='.guardando-', dir=directorio)
+    try:
+        np.save(os.path.join(temporal, 'terminos_utf8.npy'), utf8)
+        np.save(os.path.join(temporal, 'desplazamientos.npy'), desplazamientos)
+        np.save(os.path.join(temporal, 'idf.npy'), np.asarray(vectorizer.idf_, dtype=np.float64)[orden])
+        np.save(os.path.join(temporal, 'centroides.npy'), np.ascontiguousarray(centroides))
+        datos = {
+            'formato': VERSION_FORMATO,
+            'version': version,
+            'creado': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'n_clusters': int(centroides.shape[0]),
+            'n_terminos': int(len(terminos)),
+            'token_pattern': vectorizer.token_pattern,
+            'lowercase': bool(vectorizer.lowercase),
+            'metadatos': metadatos or {},
+        }
+        with open(os.path.join(temporal, ARCHIVO_METADATOS), 'w', encoding='utf-8') as archivo:
+            json.dump(datos, archivo, ensure_ascii=False, indent=2)
+        destino = os.path.join(directorio, f'v{version:04d}')
+        os.rename(temporal, destino)
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+    return destino
+
+
+# --- INFERENCIA ---
+
+class ModeloClustering:
+    """Vocabulario, IDF y centroides mapeados en memoria, con asignación por lotes."""
+
+    def __init__(self, ruta):
+        with open(os.path.join(ruta, ARCHIVO_METADATOS), encoding='utf-8') as archivo:
+            self.metadatos = json.load(archivo)
+        if self.metadatos.get('formato') != VERSION_FORMATO:
+            raise ValueError(f"Formato de modelo {self.metadatos.get('formato')} no soportado "
+                             f"(se esperaba {VERSION_FORMATO})")
+        self.ruta = ruta
+        self.version = self.metadatos['version']
+        self.utf8 = np.load(os.path.join(ruta, 'terminos_utf8.npy'), mmap_mode='r')
+        self.desplazamientos = np.load(os.path.join(ruta, 'desplazamientos.npy'), mmap_mode='r')
+        self.idf = np.load(os.path.join(ruta, 'idf.npy'), mmap_mode='r')
+        self.centroides = np.load(os.path.join(ruta, 'centroides.npy'), mmap_mode='r')
+        self._patron = re.compile(self.metadatos['token_pattern'])
+        # Mismo patrón, más el separador de documentos para tokenizar un lote de una vez
+        self._patron_lote = re.compile(f"{self.metadatos['token_pattern']}|{SEPARADOR}")
+        self._minusculas = self.metadatos['lowercase']
+        self._mitad_norma = None  # ||c||² / 2 de cada centroide, se calcula al primer uso
+
+    @classmethod
+    def cargar(cls, directorio, version=None):
+        """Carga la versión indicada (o la más reciente) de `directorio`."""
+        versiones = _versiones(directorio)
+        if not versiones:
+            raise FileNotFoundError(f"No hay modelos guardados en {directorio}")
+        if version is None:
+            version = versiones[-1]
+        elif version not in versiones:
+            raise FileNotFoundError(f"No existe la versión {version} en {directorio}")
+        return cls(os.path.join(directorio, f'v{version:04d}'))
+
+    @property
+    def n_clusters(self):
+        return self.centroides.shape[0]
+
+    @property
+    def n_terminos(self):
+        return len(self.desplazamientos) - 1
+
+    def termino(self, columna):
+        """Término de una columna del vocabulario."""
+        return bytes(self.utf8[self.desplazamientos[columna]:self.desplazamientos[columna + 1]]).decode('utf-8')
+
+    def _comparar(self, posiciones, consulta, longitudes):
+        """(menor, igual): si el término de cada posición es menor / igual que su consulta."""
+        inicio = self.desplazamientos[posiciones]
+        longitud = self.desplazamientos[posiciones + 1] - inicio
+        ancho = consulta.shape[1]
+        indices = inicio[:, None] + np.arange(ancho)
+        termino = np.where(np.arange(ancho) < longitud[:, None], self.utf8[np.minimum(indices, len(self.utf8) - 1)], 0)
+        distinto = termino != consulta
+        hay_diferencia = distinto.any(axis=1)
+        primera = distinto.argmax(axis=1)
+        filas = np.arange(len(posiciones))
+        # Orden lexicográfico de bytes; si los `ancho` primeros coinciden decide la longitud
+        menor = np.where(hay_diferencia, termino[filas, primera] < consulta[filas, primera], longitud < longitudes)
+        return menor, ~hay_diferencia & (longitud == longitudes)
+
+    def columnas_de(self, terminos):
+        """Columna de cada término (o `SIN_TERMINO`), por búsqueda binaria sobre el vocabulario."""
+        codificados = [termino.encode('utf-8') for termino in terminos]
+        columnas = np.full(len(codificados), SIN_TERMINO, dtype=np.int64)
+        if not codificados or not self.n_terminos:
+            return columnas
+        consulta = np.array(codificados, dtype=bytes)
+        consulta = consulta.view(np.uint8).reshape(len(codificados), consulta.dtype.itemsize)
+        longitudes = np.fromiter(map(len, codificados), dtype=np.int64, count=len(codificados))
+        bajo = np.zeros(len(codificados), dtype=np.int64)
+        alto = np.full(len(codificados), self.n_terminos, dtype=np.int64)
+        while (activas := bajo < alto).any():
+            medio = np.minimum((bajo + alto) // 2, self.n_terminos - 1)
+            menor, _ = self._comparar(medio, consulta, longitudes)
+            bajo = np.where(activas & menor, medio + 1, bajo)
+            alto = np.where(activas & ~menor, medio, alto)
+        posiciones = np.minimum(bajo, self.n_terminos - 1)
+        _, igual = self._comparar(posiciones, consulta, longitudes)
+        columnas[igual] = posiciones[igual]
+        return columnas
+
+    def _columnas_tokens(self, tokens):
+        """Columna de cada token: cada término distinto del lote se busca una sola vez."""
+        distintos = dict(zip(dict.fromkeys(tokens), itertools.count()))
+        codigos = np.fromiter(map(distintos.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        columnas = self.columnas_de(distintos)
+        if SEPARADOR in distintos:
+            columnas[distintos[SEPARADOR]] = COLUMNA_SEPARADOR
+        return columnas[codigos]
+
+    def _tokenizar(self, documentos):
+        """(tokens, filas) de un lote con un solo `findall` sobre el texto unido."""
+        texto = SEPARADOR.join(documentos)
+        if self._minusculas:
+            texto = texto.lower()
+        if texto.count(SEPARADOR) == len(documentos) - 1:
+            columnas = self._columnas_tokens(self._patron_lote.findall(texto))
+            separador = columnas == COLUMNA_SEPARADOR
+            filas = np.cumsum(separador)
+            return columnas[~separador], filas[~separador]
+        # Algún documento contiene el separador: tokenización documento a documento
+        tokens, longitudes = [], []
+        for documento in documentos:
+            encontrados = self._patron.findall(documento.lower() if self._minusculas else documento)
+            tokens.extend(encontrados)
+            longitudes.append(len(encontrados))
+        return self._columnas_tokens(tokens), np.repeat(np.arange(len(longitudes)), longitudes)
+
+    def _ponderar(self, documentos):
+        """(filas, columnas, pesos) TF-IDF normalizados L2 de un lote, ordenados por fila."""
+        columnas, filas = self._tokenizar(documentos)
+        conocido = columnas != SIN_TERMINO
+        filas, columnas = filas[conocido], columnas[conocido]
+
+        # Frecuencia de cada par (fila, columna) = TF, y después TF-IDF + norma L2
+        n_terminos = self.n_terminos
+        claves, tf = np.unique(filas * n_terminos + columnas, return_counts=True)
+        filas, columnas = claves // n_terminos, claves % n_terminos
+        pesos = tf * self.idf[columnas]
+        normas = np.sqrt(np.bincount(filas, weights=pesos * pesos, minlength=len(documentos)))
+        return filas, columnas, pesos / normas[filas]
+
+    def transformar(self, documentos):
+        """Matriz TF-IDF (CSR) igual a la de `TfidfVectorizer.transform`."""
+        from scipy import sparse  # solo para quien necesite la matriz
+
+        documentos = list(documentos)
+        filas, columnas, pesos = self._ponderar(documentos)
+        return sparse.csr_matrix((pesos, (filas, columnas)), shape=(len(documentos), self.n_terminos))
+
+    def asignar(self, documentos, tam_lote=TAM_LOTE):
+        """Cluster más cercano (distancia euclídea, como `KMeans.predict`) de cada documento."""
+        documentos = list(documentos)
+        if self._mitad_norma is None:
+            self._mitad_norma = 0.5 * np.einsum('ij,ij->i', self.centroides, self.centroides)
+        centroides_t = np.asarray(self.centroides).T  # (n_terminos, k): filas contiguas por término
+        etiquetas = np.empty(len(documentos), dtype=np.int32)
+        for inicio in range(0, len(documentos), tam_lote):
+            lote = documentos[inicio:inicio + tam_lote]
+            filas, columnas, pesos = self._ponderar(lote)
+            # argmin ||x - c||² = argmax (x·c - ||c||²/2); x·c agrupando los términos por fila
+            productos = np.zeros((len(lote), self.n_clusters))
+            if len(filas):
+                cortes = np.flatnonzero(np.r_[True, filas[1:] != filas[:-1]])
+                productos[filas[cortes]] = np.add.reduceat(centroides_t[columnas] * pesos[:, None], cortes)
+            etiquetas[inicio:inicio + len(lote)] = (productos - self._mitad_norma).argmax(axis=1)
+        return etiquetas
+
+
+def cargar_modelo(directorio, version=None):
+    """Atajo para `ModeloClustering.cargar`."""
+    return ModeloClustering.cargar(directorio, version)
+
+
+# --- BENCHMARK ---
+
+if __name__ == '__main__':
+    import random
+    import sys
+
+    from sklearn.cluster import KMeans
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    parser = argparse.ArgumentParser(description="Benchmark de la asignación con el modelo guardado.")
+    parser.add_argument('--docs', type=int, default=200_000)
+    parser.add_argument('--entrenamiento', type=int, default=1200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulario = [f"termino{i}" for i in range(20_000)]
+    temas = [rng.sample(vocabulario, 300) for _ in range(8)]
+    def documento():
+        return ' '.join(rng.choices(rng.choice(temas), k=rng.randint(5, 30)) + rng.choices(vocabulario, k=3))
+    entrenamiento = [documento() for _ in range(args.entrenamiento)]
+    nuevos = [documento() for _ in range(args.docs)]
+
+    vectorizer = TfidfVectorizer()
+    kmeans = KMeans(n_clusters=len(temas), random_state=42, n_init=10).fit(vectorizer.fit_transform(entrenamiento))
+
+    with tempfile.TemporaryDirectory() as directorio:
+        guardar_modelo(directorio, vectorizer, kmeans)
+        inicio = time.perf_counter()
+        modelo = cargar_modelo(directorio)
+        t_carga = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        referencia = kmeans.predict(vectorizer.transform(nuevos))
+        t_sklearn = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        etiquetas = modelo.asignar(nuevos)
+        t_asignar = time.perf_counter() - inicio
+
+        print(f"Modelo v{modelo.version}: {modelo.metadatos['n_terminos']} términos, {modelo.n_clusters} clusters, "
+              f"cargado en {t_carga * 1000:.1f} ms (matplotlib importado: {'matplotlib' in sys.modules})")
+        print(f"transform + predict : {t_sklearn:.2f} s ({args.docs / t_sklearn:,.0f} docs/s)")
+        print(f"asignar             : {t_asignar:.2f} s ({args.docs / t_asignar:,.0f} docs/s), "
+              f"coincidencia {np.mean(etiquetas == referencia):.4%}")
+        print(f"Matriz TF-IDF idéntica: "
+              f"{abs(modelo.transformar(nuevos[:1000]) - vectorizer.transform(nuevos[:1000])).max() < 1e-12}")
+        del modelo
@@ -0,0 +1,207 @@
+"""
+Servicio de nubes de palabras: frecuencias ya contadas, pool de dibujo y caché por huella.
+
+Tanto 02_limpieza_texto.py como el dashboard llamaban a
+`WordCloud(...).generate(' '.join(palabras))`: unían todos los tokens en una cadena para
+que WordCloud volviera a tokenizarlos y contarlos, y dibujaban en el hilo principal.
+Con un millón de tokens, casi todo el tiempo se va en ese recuento repetido.
+
+- La nube se dibuja con `generate_from_frequencies` a partir del `Counter` que ya existe
+  (solo las `max_words` palabras más frecuentes, que son las únicas que WordCloud usa).
+  Las palabras son las del `Counter`: a diferencia de `generate`, WordCloud no añade
+  bigramas frecuentes (`collocations`), no quita sus `STOPWORDS` (en inglés) y no suma
+  las palabras terminadas en 's' a su singular (`normalize_plurals`). Las stopwords en
+  español ya se filtran antes de contar; los bigramas y la unión de plurales se pierden.
+- `ServicioNubes` dibuja en un pool de hilos acotado y guarda los PNG en una `CacheLRU`
+  indexada por la huella de las frecuencias y las opciones de dibujo: el mismo vocabulario
+  filtrado da la misma clave venga del texto que venga. Dos peticiones iguales en vuelo
+  comparten el mismo `Future`.
+- En rutas interactivas (`renderizar_interactivo`) se busca primero la nube definitiva en
+  la caché; solo si no está se devuelve una vista previa a menor resolución y con menos
+  palabras mientras la definitiva se dibuja en segundo plano. El siguiente rerun ya la
+  encuentra en la caché.
+
+Uso desde consola (benchmark con un texto de ~1M de tokens):
+    python nube_palabras.py --mb 11.5
+"""
+
+import argparse
+import hashlib
+import io
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from analisis_cache import CacheLRU
+
+MAX_PALABRAS = 200               # `max_words` por defecto de WordCloud
+MAX_TRABAJADORES = 2
+MAX_IMAGENES = 32
+MAX_MB_IMAGENES = 64
+ESCALA_INTERACTIVA = 0.5         # fracción de ancho y alto de la vista previa
+MAX_PALABRAS_INTERACTIVO = 60
+
+
+# --- FRECUENCIAS Y DIBUJO ---
+
+def frecuencias_nube(conteo, max_palabras=MAX_PALABRAS):
+    """Las `max_palabras` palabras más frecuentes de un Counter (o dict) como dict."""
+    if len(conteo) <= max_palabras:
+        return dict(conteo)
+    if not isinstance(conteo, Counter):
+        conteo = Counter(conteo)
+    return dict(conteo.most_common(max_palabras))
+
+
+def huella_frecuencias(frecuencias, opciones):
+    """sha256 de las frecuencias (en orden canónico) y de las opciones de dibujo."""
+    h = hashlib.sha256(repr(sorted(opciones.items())).encode('utf-8'))
+    for palabra, n in sorted(frecuencias.items()):
+        h.update(f'{palabra}\t{n}\n'.encode('utf-8'))
+    return h.hexdigest()
+
+
+def opciones_interactivas(opciones, escala=ESCALA_INTERACTIVA, max_palabras=MAX_PALABRAS_INTERACTIVO):
+    """Opciones de la vista previa: menos píxeles y menos palabras que colocar."""
+    previa = dict(opciones)
+    previa['width'] = max(1, int(opciones.get('width', 400) * escala))
+    previa['height'] = max(1, int(opciones.get('height', 200) * escala))
+    previa['max_words'] = min(opciones.get('max_words', MAX_PALABRAS), max_palabras)
+    return previa
+
+
+def dibujar_png(frecuencias, **opciones):
+    """PNG de una nube de palabras a partir de frecuencias ya contadas.
+
+    `collocations`, `stopwords` y `normalize_plurals` no tienen efecto: solo se aplican
+    al tokenizar texto con `generate` (ver el docstring del módulo).
+    """
+    from wordcloud import WordCloud
+
+    wc = WordCloud(**opciones).generate_from_frequencies(frecuencias)
+    buffer = io.BytesIO()
+    wc.to_image().save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+# --- SERVICIO ---
+
+class ServicioNubes:
+    """Dibuja nubes en un pool de hilos acotado y guarda los PNG por huella de frecuencias."""
+
+    def __init__(self, max_trabajadores=MAX_TRABAJADORES, max_imagenes=MAX_IMAGENES,
+                 max_mb=MAX_MB_IMAGENES):
+        self.cache = CacheLRU(max_imagenes, max_mb << 20)
+        self._pool = ThreadPoolExecutor(max_workers=max_trabajadores, thread_name_prefix='nube')
+        self._en_curso = {}  # huella -> Future
+        self._candado = threading.Lock()
+
+    def enviar(self, conteo, **opciones):
+        """`Future` con los bytes PNG de la nube de `conteo` (Counter o dict de frecuencias)."""
+        frecuencias, clave = self._frecuencias_y_clave(conteo, opciones)
+        with self._candado:
+            png = self.cache.obtener(clave)
+            if png is None:
+                return self._futuro(clave, frecuencias, opciones)
+        futuro = Future()
+        futuro.set_result(png)
+        return futuro
+
+    @staticmethod
+    def _frecuencias_y_clave(conteo, opciones):
+        frecuencias = frecuencias_nube(conteo, opciones.get('max_words', MAX_PALABRAS))
+        return frecuencias, huella_frecuencias(frecuencias, opciones)
+
+    def _futuro(self, clave, frecuencias, opciones):
+        """`Future` del dibujo de `clave` (se llama con el candado tomado)."""
+        if clave not in self._en_curso:
+            self._en_curso[clave] = self._pool.submit(self._dibujar, clave, frecuencias, opciones)
+        return self._en_curso[clave]
+
+    def _dibujar(self, clave, frecuencias, opciones):
+        try:
+            png = dibujar_png(frecuencias, **opciones)
+            self.cache.guardar(clave, png, len(png))
+            return png
+        finally:
+            with self._candado:
+                self._en_curso.pop(clave, None)
+
+    def renderizar(self, conteo, timeout=None, **opciones):
+        """Bytes PNG de la nube (espera a que se dibuje si no está en la caché)."""
+        return self.enviar(conteo, **opciones).result(timeout)
+
+    def renderizar_interactivo(self, conteo, timeout=None, **opciones):
+        """(png, definitiva): la nube si ya está dibujada; si no, una vista previa reducida
+        mientras la definitiva se dibuja en segundo plano."""
+        frecuencias, clave = self._frecuencias_y_clave(conteo, opciones)
+        with self._candado:
+            png = self.cache.obtener(clave)
+        if png is not None:
+            return png, True
+        # Fallo: la vista previa entra antes en el pool y la definitiva se encarga sin volver
+        # a consultar la caché (un solo fallo contado por petición)
+        previa = self.enviar(conteo, **opciones_interactivas(opciones))
+        with self._candado:
+            if clave not in self.cache:
+                self._futuro(clave, frecuencias, opciones)
+        return previa.result(timeout), False
+
+    def pendientes(self):
+        with self._candado:
+            return len(self._en_curso)
+
+    def estadisticas(self):
+        return dict(self.cache.estadisticas(), pendientes=self.pendientes())
+
+    def cerrar(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# --- BENCHMARK ---
+
+if __name__ == '__main__':
+    from conteo_fusionado import contar_filtrado, generar_corpus_sintetico, iterar_filtrado
+
+    parser = argparse.ArgumentParser(description="Benchmark de la nube de palabras por frecuencias.")
+    parser.add_argument('--mb', type=float, default=11.5, help="tamaño del texto (11.5 MB ~ 1M de tokens filtrados)")
+    parser.add_argument('--ancho', type=int, default=800)
+    parser.add_argument('--alto', type=int, default=400)
+    args = parser.parse_args()
+
+    texto = generar_corpus_sintetico(args.mb)
+    opciones = dict(width=args.ancho, height=args.alto, background_color='white', random_state=42)
+    conteo, total = contar_filtrado(texto, None, 3)
+
+    from wordcloud import WordCloud
+
+    # Antes: unir los tokens filtrados y dejar que WordCloud los vuelva a tokenizar y contar
+    inicio = time.perf_counter()
+    wc = WordCloud(**opciones).generate(' '.join(iterar_filtrado(texto, None, 3)))
+    buffer = io.BytesIO()
+    wc.to_image().save(buffer, format='PNG')
+    t_unir = time.perf_counter() - inicio
+
+    servicio = ServicioNubes()
+    inicio = time.perf_counter()
+    png_previa, _ = servicio.renderizar_interactivo(conteo, **opciones)
+    t_previa = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    png = servicio.renderizar(conteo, **opciones)
+    t_frecuencias = time.perf_counter() - inicio + t_previa
+
+    inicio = time.perf_counter()
+    servicio.renderizar(conteo, **opciones)
+    t_cache = time.perf_counter() - inicio
+    servicio.cerrar()
+
+    print(f"Texto de {len(texto) / 1e6:.0f} MB, {total} tokens tras el filtro, vocabulario de {len(conteo)}")
+    print(f"join + generate (antes)         : {t_unir * 1000:7.0f} ms")
+    print(f"Vista previa interactiva        : {t_previa * 1000:7.0f} ms "
+          f"({opciones_interactivas(opciones)['width']}x{opciones_interactivas(opciones)['height']}, "
+          f"{MAX_PALABRAS_INTERACTIVO} palabras)")
+    print(f"Definitiva por frecuencias      : {t_frecuencias * 1000:7.0f} ms (desde la petición)")
+    print(f"Acierto en la caché             : {t_cache * 1000:7.2f} ms")
+    print(f"Estadísticas: {servicio.estadisticas()}")
@@ -0,0 +1,117 @@
+"""
+Reducción de dimensionalidad sobre matrices TF-IDF dispersas (LSA) para visualizar clusters.
+
+El Ejercicio 5 hace `PCA().fit_transform(tfidf_matrix.toarray())`: con 1M documentos y
+100k palabras la matriz densa ocuparía 800 GB. Aquí se trabaja sobre la CSR sin densificar:
+
+1. `TruncatedSVD` aleatorizado (LSA) directamente sobre la matriz dispersa, hasta
+   `COMPONENTES_LSA` dimensiones (n x 100 en lugar de n x n_palabras).
+2. PCA a 2 dimensiones sobre esa matriz pequeña y densa: a diferencia de la SVD, el PCA
+   centra los datos, así que el gráfico se parece al del PCA original.
+3. Por encima de `MAX_PUNTOS` documentos se dibuja una muestra aleatoria: un scatter con
+   millones de puntos no aporta nada y tarda minutos en renderizarse.
+
+Uso desde consola (benchmark frente al PCA denso):
+    python reduccion_dimensional.py --docs 20000 --palabras 5000
+"""
+
+import argparse
+import time
+
+import numpy as np
+from sklearn.decomposition import PCA, TruncatedSVD
+
+COMPONENTES_LSA = 100
+MAX_PUNTOS = 5000   # puntos dibujados como máximo
+
+
+def muestrear_indices(n, max_puntos=MAX_PUNTOS, semilla=42):
+    """Índices ordenados de una muestra de `max_puntos` filas (todas si n <= max_puntos)."""
+    if max_puntos is None or n <= max_puntos:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(semilla).choice(n, max_puntos, replace=False))
+
+
+def reducir(X, n_componentes=2, componentes_lsa=COMPONENTES_LSA, semilla=42):
+    """Proyecta las filas de `X` (dispersa o densa) a `n_componentes` dimensiones.
+
+    Si `X` tiene más de `componentes_lsa` columnas, primero aplica LSA (TruncatedSVD
+    aleatorizado sobre la matriz dispersa) y después PCA sobre el resultado. Con menos
+    filas o columnas que `n_componentes`, las componentes que faltan valen 0.
+    """
+    n_filas, n_columnas = X.shape
+    if n_filas < 2:
+        # Un solo documento (o ninguno): no hay varianza que proyectar, queda en el origen
+        return np.zeros((n_filas, n_componentes))
+    if componentes_lsa and n_columnas > componentes_lsa:
+        componentes = min(componentes_lsa, n_filas - 1)
+        X = TruncatedSVD(componentes, algorithm='randomized', random_state=semilla).fit_transform(X)
+    elif hasattr(X, 'toarray'):
+        X = X.toarray()  # ya es pequeña: como mucho n x componentes_lsa
+    componentes_pca = min(n_componentes, *X.shape)
+    coordenadas = PCA(n_components=componentes_pca, random_state=semilla).fit_transform(X)
+    return np.pad(coordenadas, ((0, 0), (0, n_componentes - componentes_pca)))
+
+
+def coordenadas_grafico(X, etiquetas=None, max_puntos=MAX_PUNTOS, n_componentes=2,
+                        componentes_lsa=COMPONENTES_LSA, semilla=42):
+    """Coordenadas 2D de una muestra de documentos para un scatter.
+
+    Devuelve (coordenadas, etiquetas_muestra, indices_muestra).
+    """
+    indices = muestrear_indices(X.shape[0], max_puntos, semilla)
+    muestra = X[indices] if len(indices) < X.shape[0] else X
+    coordenadas = reducir(muestra, n_componentes, componentes_lsa, semilla)
+    if etiquetas is not None:
+        etiquetas = np.asarray(etiquetas)[indices]
+    return coordenadas, etiquetas, indices
+
+
+# --- BENCHMARK ---
+
+def _matriz_sintetica(documentos, palabras, temas=10, palabras_por_doc=30, semilla=0):
+    """TF-IDF sintética: cada tema usa un subconjunto de columnas."""
+    from scipy import sparse
+    from sklearn.preprocessing import normalize
+
+    rng = np.random.default_rng(semilla)
+    tema_columnas = [rng.choice(palabras, palabras // temas, replace=False) for _ in range(temas)]
+    reales = rng.integers(temas, size=documentos)
+    columnas = np.concatenate([rng.choice(tema_columnas[t], palabras_por_doc) for t in reales])
+    filas = np.repeat(np.arange(documentos), palabras_por_doc)
+    X = sparse.csr_matrix((rng.random(len(filas)), (filas, columnas)), shape=(documentos, palabras))
+    return normalize(X), reales
+
+
+if __name__ == '__main__':
+    import tracemalloc
+
+    parser = argparse.ArgumentParser(description="Benchmark de LSA disperso frente al PCA denso.")
+    parser.add_argument('--docs', type=int, default=20_000)
+    parser.add_argument('--palabras', type=int, default=5000)
+    parser.add_argument('--max-denso-mb', type=int, default=1000,
+                        help="no ejecutar el PCA denso si la matriz densa supera este tamaño")
+    args = parser.parse_args()
+
+    X, reales = _matriz_sintetica(args.docs, args.palabras)
+
+    def medir(funcion):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        resultado = funcion()
+        duracion = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return resultado, duracion, pico / (1 << 20)
+
+    print(f"Matriz {X.shape[0]} x {X.shape[1]}, {X.nnz} no nulos ({X.data.nbytes / (1 << 20):.0f} MB)")
+    mb_denso = X.shape[0] * X.shape[1] * 8 / (1 << 20)
+    if mb_denso <= args.max_denso_mb:
+        _, t_denso, m_denso = medir(lambda: PCA(n_components=2, random_state=42).fit_transform(X.toarray()))
+        print(f"PCA denso (toarray)     : {t_denso:.2f} s, pico {m_denso:.0f} MB")
+    else:
+        print(f"PCA denso (toarray)     : omitido, la matriz densa ocuparía {mb_denso:,.0f} MB")
+    _, t_lsa, m_lsa = medir(lambda: reducir(X))
+    print(f"LSA disperso + PCA      : {t_lsa:.2f} s, pico {m_lsa:.0f} MB")
+    (coordenadas, _, indices), t_muestra, m_muestra = medir(lambda: coordenadas_grafico(X, reales))
+    print(f"Muestra de {len(indices)} puntos  : {t_muestra:.2f} s, pico {m_muestra:.0f} MB")
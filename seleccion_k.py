@@ -0,0 +1,279 @@
+"""
+Selección automática del número de clusters (k) con reinicios de K-Means en paralelo.
+
+El Ejercicio 5 fija `KMeans(n_clusters=4, n_init=10)` y los 10 reinicios se ejecutan uno
+tras otro en un proceso. Aquí cada par (k, semilla) es una tarea `KMeans(n_init=1)`
+independiente que se reparte en un pool de procesos:
+
+- La matriz TF-IDF (CSR) se publica una sola vez en memoria compartida
+  (`multiprocessing.shared_memory`: `data`, `indices` e `indptr`) y cada proceso la
+  reconstruye sin copiarla, en lugar de enviarla serializada con cada tarea.
+- Los procesos devuelven solo inercia, semilla y etiquetas (no el `KMeans` ajustado) y para
+  cada k se queda el reinicio de menor inercia (lo mismo que hace `n_init`); al final se
+  reajusta en este proceso únicamente el modelo del k elegido, con su semilla.
+- Puntuaciones de cada k: inercia (para el codo), silueta sobre una muestra y
+  Davies-Bouldin calculado sobre la matriz dispersa (el de scikit-learn exige densa).
+
+`seleccionar_k` devuelve el modelo elegido y un informe con tiempos y puntuaciones.
+
+Con el arranque de procesos 'spawn' (Windows, macOS) o 'forkserver', cada proceso del
+pool vuelve a importar el script principal: la llamada a `seleccionar_k` tiene que estar
+protegida por `if __name__ == '__main__':`. Un script sin esa protección debe pasar
+`workers=1` (todo en el mismo proceso) o un `mp_context` con arranque 'fork'.
+
+Uso desde consola (benchmark frente al barrido secuencial):
+    python seleccion_k.py --docs 20000 --k-max 16 --workers 1 4
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+
+N_INIT = 10
+MUESTRA_SILUETA = 2000
+CRITERIOS = ('silueta', 'davies_bouldin', 'codo')
+
+# Estado de cada proceso del pool (se rellena en el inicializador)
+_datos = {}
+
+
+# --- MEMORIA COMPARTIDA ---
+
+def _publicar_csr(X):
+    """Copia data/indices/indptr de `X` a memoria compartida; devuelve (bloques, descriptor)."""
+    bloques, partes = [], {}
+    for nombre in ('data', 'indices', 'indptr'):
+        arreglo = getattr(X, nombre)
+        bloque = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+        np.ndarray(arreglo.shape, arreglo.dtype, buffer=bloque.buf)[:] = arreglo
+        bloques.append(bloque)
+        partes[nombre] = (bloque.name, arreglo.shape, arreglo.dtype.str)
+    return bloques, {'forma': X.shape, 'partes': partes}
+
+
+def _adjuntar_csr(descriptor):
+    """Reconstruye la CSR publicada por `_publicar_csr` sin copiar los datos."""
+    arreglos, bloques = {}, []
+    for nombre, (nombre_bloque, forma, tipo) in descriptor['partes'].items():
+        # Los procesos del pool comparten el resource_tracker del principal, que es quien
+        # libera los bloques (unlink) al terminar
+        bloque = shared_memory.SharedMemory(name=nombre_bloque)
+        bloques.append(bloque)
+        arreglos[nombre] = np.ndarray(forma, np.dtype(tipo), buffer=bloque.buf)
+    X = sparse.csr_matrix((arreglos['data'], arreglos['indices'], arreglos['indptr']),
+                          shape=descriptor['forma'], copy=False)
+    return X, bloques
+
+
+def _inicializar_trabajador(descriptor, muestra_silueta, hilos=None):
+    if hilos:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(hilos)  # sin sobresuscripción: un hilo BLAS/OpenMP por proceso
+    if isinstance(descriptor, dict):
+        _datos['X'], _datos['bloques'] = _adjuntar_csr(descriptor)
+    else:
+        _datos['X'] = descriptor  # ejecución en el mismo proceso: la matriz tal cual
+    _datos['muestra_silueta'] = muestra_silueta
+
+
+# --- PUNTUACIONES ---
+
+def davies_bouldin_disperso(X, etiquetas):
+    """Índice de Davies-Bouldin (igual que `sklearn.metrics.davies_bouldin_score`) sin densificar X."""
+    etiquetas = np.asarray(etiquetas)
+    k = etiquetas.max() + 1
+    indicadora = sparse.csr_matrix((np.ones(len(etiquetas)), (etiquetas, np.arange(len(etiquetas)))),
+                                   shape=(k, len(etiquetas)))
+    tamanos = np.asarray(indicadora.sum(axis=1)).ravel()
+    centroides = (indicadora @ X).toarray() / tamanos[:, None]
+
+    # ||x - c||² = ||x||² - 2 x·c + ||c||², con x·c solo para el centroide de cada fila
+    normas_x = np.asarray(X.multiply(X).sum(axis=1)).ravel()
+    productos = np.asarray(X @ centroides.T)[np.arange(len(etiquetas)), etiquetas]
+    normas_c = np.einsum('ij,ij->i', centroides, centroides)
+    distancias = np.sqrt(np.maximum(normas_x - 2 * productos + normas_c[etiquetas], 0))
+    dispersion = np.bincount(etiquetas, weights=distancias, minlength=k) / tamanos
+
+    separacion = np.sqrt(np.maximum(normas_c[:, None] - 2 * centroides @ centroides.T + normas_c[None, :], 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cocientes = (dispersion[:, None] + dispersion[None, :]) / separacion
+    np.fill_diagonal(cocientes, -np.inf)
+    cocientes[~np.isfinite(cocientes) & (cocientes > 0)] = np.inf  # centroides coincidentes
+    return float(np.mean(np.max(cocientes, axis=1)))
+
+
+def _ajustar(k, semilla):
+    """Tarea de ajuste: KMeans(k, n_init=1) con una semilla. Devuelve solo inercia y etiquetas."""
+    inicio = time.perf_counter()
+    modelo = KMeans(n_clusters=k, n_init=1, random_state=semilla).fit(_datos['X'])
+    return {'k': k, 'semilla': semilla, 'inercia': float(modelo.inertia_), 'etiquetas': modelo.labels_,
+            'tiempo_s': time.perf_counter() - inicio}
+
+
+def _puntuar(k, etiquetas, semilla):
+    """Tarea de puntuación del mejor reinicio de un k: silueta (muestreada) y Davies-Bouldin."""
+    X = _datos['X']
+    inicio = time.perf_counter()
+    if len(np.unique(etiquetas)) < 2:
+        silueta, davies_bouldin = float('nan'), float('nan')
+    else:
+        muestra = min(_datos['muestra_silueta'], X.shape[0])
+        silueta = float(silhouette_score(X, etiquetas, sample_size=muestra, random_state=semilla))
+        davies_bouldin = davies_bouldin_disperso(X, etiquetas)
+    return {'k': k, 'silueta': silueta, 'davies_bouldin': davies_bouldin,
+            'tiempo_s': time.perf_counter() - inicio}
+
+
+def _ejecutar(pool, funcion, tareas):
+    """Genera los resultados de las tareas según terminan, en el pool (o en este proceso si no hay pool)."""
+    if pool is None:
+        for tarea in tareas:
+            yield funcion(*tarea)
+        return
+    # Sin guardar la lista de futuros: cada resultado se libera en cuanto se consume
+    for futuro in as_completed([pool.submit(funcion, *tarea) for tarea in tareas]):
+        yield futuro.result()
+
+
+def k_codo(ks, inercias):
+    """k del codo: el punto de la curva de inercia (normalizada) más alejado de la recta entre extremos."""
+    ks, inercias = np.asarray(ks, dtype=float), np.asarray(inercias, dtype=float)
+    if len(ks) < 3:
+        return int(ks[0])
+    x = (ks - ks[0]) / (ks[-1] - ks[0])
+    y = (inercias - inercias.min()) / max(np.ptp(inercias), np.finfo(float).tiny)
+    # La recta va de (0, 1) a (1, 0): distancia proporcional a 1 - x - y
+    return int(ks[np.argmax(1 - x - y)])
+
+
+# --- SELECCIÓN ---
+
+class ResultadoSeleccion:
+    """Modelo elegido, su k e informe por k (inercia, silueta, Davies-Bouldin y tiempos)."""
+
+    def __init__(self, modelo, k, criterio, informe, tiempo_total_s):
+        self.modelo = modelo
+        self.k = k
+        self.criterio = criterio
+        self.informe = informe
+        self.tiempo_total_s = tiempo_total_s
+
+    def __repr__(self):
+        return f"ResultadoSeleccion(k={self.k}, criterio={self.criterio!r}, tiempo_total_s={self.tiempo_total_s:.2f})"
+
+
+def seleccionar_k(X, ks=range(2, 11), n_init=N_INIT, criterio='silueta', workers=None,
+                  muestra_silueta=MUESTRA_SILUETA, semilla=42, mp_context=None):
+    """Evalúa cada k de `ks` con `n_init` reinicios repartidos en `workers` procesos.
+
+    `criterio`: 'silueta' (máxima), 'davies_bouldin' (mínimo) o 'codo' (de la inercia).
+    `mp_context` se pasa al `ProcessPoolExecutor`; con arranque 'spawn'/'forkserver' la
+    llamada debe estar protegida por `if __name__ == '__main__':` (o usar `workers=1`).
+    """
+    if criterio not in CRITERIOS:
+        raise ValueError(f"Criterio desconocido: {criterio!r} (opciones: {', '.join(CRITERIOS)})")
+    X = sparse.csr_matrix(X)
+    ks = sorted(set(ks))
+    workers = workers or os.cpu_count() or 1
+    # Los k grandes tardan más: se encolan primero para equilibrar la carga
+    tareas = [(k, semilla + i) for k in reversed(ks) for i in range(n_init)]
+
+    inicio = time.perf_counter()
+    bloques, pool = [], None
+    try:
+        if workers == 1:
+            _inicializar_trabajador(X, muestra_silueta)
+        else:
+            bloques, descriptor = _publicar_csr(X)
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                       initializer=_inicializar_trabajador,
+                                       initargs=(descriptor, muestra_silueta, 1))
+
+        # Por cada k, el reinicio de menor inercia (desempate por semilla, como n_init);
+        # las etiquetas de los demás reinicios se descartan según llegan
+        mejores, tiempos = {}, {}
+        for r in _ejecutar(pool, _ajustar, tareas):
+            actual = mejores.get(r['k'])
+            if actual is None or (r['inercia'], r['semilla']) < (actual['inercia'], actual['semilla']):
+                mejores[r['k']] = r
+            tiempos[r['k']] = tiempos.get(r['k'], 0.0) + r['tiempo_s']
+        # Solo se puntúa el mejor reinicio de cada k
+        puntuaciones = {r['k']: r for r in _ejecutar(
+            pool, _puntuar, [(k, mejores[k]['etiquetas'], mejores[k]['semilla']) for k in reversed(ks)])}
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        for bloque in bloques:
+            bloque.close()
+            bloque.unlink()
+
+    informe = pd.DataFrame([{
+        'k': k,
+        'inercia': mejores[k]['inercia'],
+        'silueta': puntuaciones[k]['silueta'],
+        'davies_bouldin': puntuaciones[k]['davies_bouldin'],
+        'semilla': mejores[k]['semilla'],
+        'tiempo_ajuste_s': tiempos[k],
+        'tiempo_puntuacion_s': puntuaciones[k]['tiempo_s'],
+    } for k in ks])
+
+    if criterio == 'silueta':
+        k_elegido = int(informe.loc[informe['silueta'].idxmax(), 'k'])
+    elif criterio == 'davies_bouldin':
+        k_elegido = int(informe.loc[informe['davies_bouldin'].idxmin(), 'k'])
+    else:
+        k_elegido = k_codo(informe['k'], informe['inercia'])
+    informe['elegido'] = informe['k'] == k_elegido
+    # Solo se reconstruye el modelo elegido: misma semilla, mismo ajuste que en el pool
+    modelo = KMeans(n_clusters=k_elegido, n_init=1, random_state=mejores[k_elegido]['semilla']).fit(X)
+    return ResultadoSeleccion(modelo, k_elegido, criterio, informe, time.perf_counter() - inicio)
+
+
+# --- BENCHMARK ---
+
+if __name__ == '__main__':
+    import random
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics import adjusted_rand_score, davies_bouldin_score
+
+    parser = argparse.ArgumentParser(description="Benchmark de la selección de k en paralelo.")
+    parser.add_argument('--docs', type=int, default=20_000)
+    parser.add_argument('--temas', type=int, default=8)
+    parser.add_argument('--k-max', type=int, default=16)
+    parser.add_argument('--n-init', type=int, default=4)
+    parser.add_argument('--workers', nargs='+', type=int, default=sorted({1, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulario = [f"termino{i}" for i in range(5000)]
+    temas = [rng.sample(vocabulario, 100) for _ in range(args.temas)]
+    reales = [rng.randrange(args.temas) for _ in range(args.docs)]
+    corpus = [' '.join(rng.choices(temas[t], k=rng.randint(5, 20)) + rng.choices(vocabulario, k=2)) for t in reales]
+    X = TfidfVectorizer().fit_transform(corpus)
+    ks = range(2, args.k_max + 1)
+
+    db_denso = davies_bouldin_score(X[:2000].toarray(), np.array(reales[:2000]))
+    print(f"Davies-Bouldin disperso = denso: {np.isclose(davies_bouldin_disperso(X[:2000], reales[:2000]), db_denso)}")
+
+    # Referencia: el barrido secuencial con KMeans(n_init) de scikit-learn
+    inicio = time.perf_counter()
+    for k in ks:
+        KMeans(n_clusters=k, n_init=args.n_init, random_state=42).fit(X)
+    t_secuencial = time.perf_counter() - inicio
+    print(f"Matriz {X.shape}, k = {ks.start}..{ks.stop - 1}, {args.n_init} reinicios por k")
+    print(f"Barrido secuencial (sin puntuaciones): {t_secuencial:.1f} s")
+
+    for workers in args.workers:
+        resultado = seleccionar_k(X, ks, n_init=args.n_init, workers=workers)
+        print(f"{workers:>3} procesos: {resultado.tiempo_total_s:.1f} s (con puntuaciones), k elegido {resultado.k}, "
+              f"ARI con los temas reales {adjusted_rand_score(reales, resultado.modelo.labels_):.3f}")
+    print(resultado.informe.to_string(index=False, float_format='%.3f'))
@@ -0,0 +1,211 @@
+"""
+Léxicos de expresiones multipalabra con Aho-Corasick y manejo de la negación.
+
+Los léxicos del Ejercicio 3 solo reconocen palabras sueltas y el propio script admite
+que "No está mal" se clasifica mal. Aquí compilamos el léxico (palabras y frases como
+"vale la pena" o "nada del otro mundo") en un autómata de Aho-Corasick sobre secuencias
+de tokens: una sola pasada lineal por la frase encuentra todas las expresiones, sin
+importar cuántas entradas tenga el léxico (decenas de miles, como SEL).
+
+Negación: si un negador ("no", "nunca", "sin"...) aparece hasta `ventana` tokens antes
+del inicio de una expresión, su polaridad se invierte. Así "No está mal" suma +1.
+"ni" no cuenta como negador: en la correlación "ni caro ni barato" cada "ni" negaría al
+término siguiente y la frase sumaría +2 en lugar de quedar neutra.
+
+Nota: a diferencia de `analizar_sentimiento`, aquí no se eliminan stopwords antes de
+buscar, porque forman parte de las expresiones ("la", "del", "no"...).
+
+Uso desde consola (benchmark con un léxico sintético de 50.000 entradas):
+    python sentimiento_frases.py --entradas 50000 --frases 100000
+"""
+
+import argparse
+import time
+from collections import deque
+
+from tokenizador import tokenizar
+
+NEGADORES = frozenset({'no', 'nunca', 'jamás', 'tampoco', 'sin', 'nada', 'nadie'})
+VENTANA_NEGACION = 3
+
+
+# --- AUTÓMATA DE AHO-CORASICK SOBRE TOKENS ---
+
+class AutomataLexico:
+    """Autómata de Aho-Corasick cuyas transiciones son tokens (no caracteres)."""
+
+    def __init__(self, lexico):
+        """`lexico` es un mapeo expresión -> peso (p. ej. {"vale la pena": 1.0})."""
+        self.transiciones = [{}]   # nodo -> {token: nodo siguiente}
+        self.fallo = [0]           # nodo -> nodo de fallo
+        self.salidas = [()]        # nodo -> ((longitud, peso), ...) de expresiones que terminan aquí
+
+        for expresion, peso in lexico.items():
+            tokens = tokenizar(expresion)
+            if tokens:
+                self._insertar(tokens, float(peso))
+        self._construir_fallos()
+
+    def _insertar(self, tokens, peso):
+        nodo = 0
+        for token in tokens:
+            siguiente = self.transiciones[nodo].get(token)
+            if siguiente is None:
+                siguiente = len(self.transiciones)
+                self.transiciones[nodo][token] = siguiente
+                self.transiciones.append({})
+                self.fallo.append(0)
+                self.salidas.append(())
+            nodo = siguiente
+        self.salidas[nodo] = ((len(tokens), peso),)
+
+    def _construir_fallos(self):
+        """Recorrido en anchura: enlaces de fallo y salidas heredadas por sufijo."""
+        cola = deque(self.transiciones[0].values())
+        while cola:
+            nodo = cola.popleft()
+            for token, hijo in self.transiciones[nodo].items():
+                cola.append(hijo)
+                fallo = self.fallo[nodo]
+                while fallo and token not in self.transiciones[fallo]:
+                    fallo = self.fallo[fallo]
+                destino = self.transiciones[fallo].get(token, 0)
+                self.fallo[hijo] = destino if destino != hijo else 0
+                self.salidas[hijo] = self.salidas[hijo] + self.salidas[self.fallo[hijo]]
+
+    def buscar(self, tokens):
+        """Devuelve [(inicio, fin, peso)] de todas las expresiones (pueden solaparse)."""
+        transiciones, fallo, salidas = self.transiciones, self.fallo, self.salidas
+        coincidencias = []
+        nodo = 0
+        for posicion, token in enumerate(tokens):
+            while nodo and token not in transiciones[nodo]:
+                nodo = fallo[nodo]
+            nodo = transiciones[nodo].get(token, 0)
+            for longitud, peso in salidas[nodo]:
+                coincidencias.append((posicion - longitud + 1, posicion + 1, peso))
+        return coincidencias
+
+
+def _sin_solapamientos(coincidencias):
+    """Se queda con las expresiones más largas, de izquierda a derecha, sin solaparse."""
+    elegidas = []
+    fin_anterior = 0
+    for inicio, fin, peso in sorted(coincidencias, key=lambda c: (c[0], c[0] - c[1])):
+        if inicio >= fin_anterior:
+            elegidas.append((inicio, fin, peso))
+            fin_anterior = fin
+    return elegidas
+
+
+# --- ANALIZADOR CON NEGACIÓN ---
+
+class AnalizadorFrases:
+    """Clasificador de sentimiento con expresiones multipalabra y ventana de negación."""
+
+    def __init__(self, lexico, negadores=NEGADORES, ventana=VENTANA_NEGACION):
+        self.automata = AutomataLexico(lexico)
+        self.negadores = negadores
+        self.ventana = ventana
+
+    @classmethod
+    def desde_lexicos(cls, lexico_pos, lexico_neg, **kwargs):
+        """Construye el analizador a partir de conjuntos positivos y negativos."""
+        lexico = dict.fromkeys(lexico_pos, 1.0)
+        for expresion in lexico_neg:
+            lexico[expresion] = lexico.get(expresion, 0.0) - 1.0
+        return cls(lexico, **kwargs)
+
+    def analizar(self, frase):
+        """Analiza una frase y devuelve un dict como `analizar_sentimiento`."""
+        tokens = tokenizar(frase)
+        coincidencias = _sin_solapamientos(self.automata.buscar(tokens))
+
+        # Posición del último negador visto antes de cada token
+        ultimo_negador = []
+        posicion_negador = -self.ventana - 1
+        for posicion, token in enumerate(tokens):
+            ultimo_negador.append(posicion_negador)
+            if token in self.negadores:
+                posicion_negador = posicion
+
+        puntaje = 0.0
+        palabras_clave = []
+        for inicio, fin, peso in coincidencias:
+            expresion = ' '.join(tokens[inicio:fin])
+            if inicio - ultimo_negador[inicio] <= self.ventana:
+                peso = -peso
+                expresion = f"{tokens[ultimo_negador[inicio]]}…{expresion}"
+            puntaje += peso
+            palabras_clave.append(expresion)
+
+        if puntaje > 0:
+            clasificacion = "Positiva"
+        elif puntaje < 0:
+            clasificacion = "Negativa"
+        else:
+            clasificacion = "Neutra"
+
+        return {
+            "frase": frase,
+            "puntaje": int(puntaje) if puntaje == int(puntaje) else puntaje,
+            "clasificacion": clasificacion,
+            "palabras_clave": palabras_clave,
+        }
+
+
+# --- BENCHMARK ---
+
+def _buscar_por_ngramas(tokens, lexico_tuplas, max_longitud):
+    """Alternativa ingenua: para cada posición prueba todos los n-gramas del léxico."""
+    coincidencias = []
+    for inicio in range(len(tokens)):
+        for longitud in range(1, max_longitud + 1):
+            ngrama = tuple(tokens[inicio:inicio + longitud])
+            if len(ngrama) < longitud:
+                break
+            peso = lexico_tuplas.get(ngrama)
+            if peso is not None:
+                coincidencias.append((inicio, inicio + longitud, peso))
+    return coincidencias
+
+
+if __name__ == '__main__':
+    import random
+
+    parser = argparse.ArgumentParser(description="Benchmark del autómata de expresiones.")
+    parser.add_argument('--entradas', type=int, default=50_000)
+    parser.add_argument('--frases', type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulario = [f"pal{i}" for i in range(20_000)] + sorted(NEGADORES)
+    lexico = {}
+    while len(lexico) < args.entradas:
+        expresion = ' '.join(rng.choices(vocabulario, k=rng.choice([1, 1, 2, 3, 4])))
+        lexico[expresion] = rng.choice([-1.0, 1.0])
+    frases = [' '.join(rng.choices(vocabulario, k=rng.randint(8, 30))) for _ in range(args.frases)]
+
+    inicio = time.perf_counter()
+    analizador = AnalizadorFrases(lexico)
+    print(f"Compilación del autómata ({len(lexico)} entradas): {time.perf_counter() - inicio:.2f} s")
+
+    tokens_por_frase = [tokenizar(f) for f in frases]
+    inicio = time.perf_counter()
+    total_ac = sum(len(analizador.automata.buscar(tokens)) for tokens in tokens_por_frase)
+    t_ac = time.perf_counter() - inicio
+
+    lexico_tuplas = {tuple(tokenizar(e)): p for e, p in lexico.items()}
+    max_longitud = max(map(len, lexico_tuplas))
+    inicio = time.perf_counter()
+    total_ng = sum(len(_buscar_por_ngramas(tokens, lexico_tuplas, max_longitud)) for tokens in tokens_por_frase)
+    t_ng = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for frase in frases:
+        analizador.analizar(frase)
+    t_total = time.perf_counter() - inicio
+
+    print(f"Aho-Corasick     : {args.frases / t_ac:,.0f} frases/s ({total_ac} coincidencias)")
+    print(f"N-gramas ingenuo : {args.frases / t_ng:,.0f} frases/s ({total_ng} coincidencias)")
+    print(f"Análisis completo (tokenizar + negación): {args.frases / t_total:,.0f} frases/s")
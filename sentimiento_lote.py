@@ -0,0 +1,200 @@
+"""
+Clasificador de sentimiento por lotes (vectorizado) basado en léxicos.
+
+`analizar_sentimiento` (Ejercicio 3) procesa una frase cada vez, recorre sus tokens
+varias veces y construye un diccionario por frase. Aquí los léxicos se convierten en un
+vector de pesos indexado por vocabulario (+1 positivo, -1 negativo, 0 para stopwords),
+cada token del lote se traduce a su columna del vector y todos los puntajes salen de una
+sola suma ponderada por frase (`np.bincount`), equivalente al producto `X @ pesos` con la
+matriz documento-término. Con un léxico mapeado en memoria (lexico_binario.py) solo se
+leen los pesos de los tokens del lote: el vector nunca se copia entero.
+
+El resultado es columnar (un DataFrame) con los mismos `puntaje` y `clasificacion` que
+la versión frase a frase. `puntaje` es int64 si todos los pesos del léxico son enteros
+(los conjuntos del Ejercicio 3) y float64 si no (léxicos ponderados o mapeados); el tipo
+depende del clasificador, nunca del lote.
+
+Uso desde consola (benchmark de rendimiento en frases/segundo):
+    python sentimiento_lote.py --frases 200000
+"""
+
+import argparse
+import time
+from itertools import chain, repeat
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from tokenizador import tokenize_many
+
+ETIQUETAS = np.array(["Negativa", "Neutra", "Positiva"], dtype=object)
+
+
+class ClasificadorLote:
+    """Puntúa lotes de frases con una única suma ponderada por frase (`X @ pesos`)."""
+
+    def __init__(self, pesos, stopwords=None):
+        """`pesos` es un mapeo palabra -> peso o un `LexicoMapeado` (lexico_binario.py).
+
+        Las stopwords no puntúan nunca.
+        """
+        stopwords = stopwords or set()
+        if hasattr(pesos, 'indices'):
+            # Léxico mapeado en memoria: búsqueda vectorizada, sin diccionario por proceso
+            self.lexico = pesos
+            self.pesos = pesos.pesos  # vista float32 del mmap: sin copia al arrancar
+            self.enteros = False
+            indices_stopwords = pesos.indices(sorted(stopwords))
+            self._stopwords = np.unique(indices_stopwords[indices_stopwords >= 0])
+        else:
+            palabras = [p for p in pesos if p not in stopwords]
+            self.indice = {palabra: i for i, palabra in enumerate(palabras)}
+            self.lexico = None
+            self.pesos = np.array([pesos[p] for p in palabras], dtype=np.float64)
+            self.enteros = bool(np.all(self.pesos == np.round(self.pesos)))
+
+    @classmethod
+    def desde_lexicos(cls, lexico_pos, lexico_neg, stopwords=None):
+        """Construye el vector de pesos a partir de los conjuntos del Ejercicio 3."""
+        pesos = dict.fromkeys(lexico_pos, 1.0)
+        for palabra in lexico_neg:
+            pesos[palabra] = pesos.get(palabra, 0.0) - 1.0
+        return cls(pesos, stopwords)
+
+    def _columnas(self, tokens, total):
+        """Columna del léxico de cada token (-1 si no está o es una stopword)."""
+        if self.lexico is None:
+            return np.fromiter(map(self.indice.get, tokens, repeat(-1)), dtype=np.int64, count=total)
+        columnas = self.lexico.indices(list(tokens))
+        columnas[np.isin(columnas, self._stopwords)] = -1
+        return columnas
+
+    def _tokens(self, frases):
+        """Tokeniza el lote y devuelve (tokens por frase, frase de cada token, columna de cada token)."""
+        tokens_por_frase = tokenize_many(frases)
+        longitudes = np.fromiter(map(len, tokens_por_frase), dtype=np.int64, count=len(frases))
+
+        # Cada token se traduce a su columna sin bucles en Python
+        columnas = self._columnas(chain.from_iterable(tokens_por_frase), int(longitudes.sum()))
+        filas = np.repeat(np.arange(len(frases)), longitudes)
+        return tokens_por_frase, filas, columnas
+
+    def _puntajes(self, filas, columnas, n_frases):
+        """`X @ pesos` sin construir X: solo se leen (y pasan a float64) los pesos de los tokens del léxico."""
+        en_lexico = columnas >= 0
+        pesos = self.pesos[columnas[en_lexico]].astype(np.float64)
+        return np.bincount(filas[en_lexico], weights=pesos, minlength=n_frases)
+
+    def matriz_documento_termino(self, frases):
+        """Matriz CSR (frases x términos del léxico) con la frecuencia de cada término.
+
+        Solo las columnas del léxico importan para el puntaje, así que el resto de
+        tokens se descarta al construir la matriz.
+        """
+        _, filas, columnas = self._tokens(frases)
+        en_lexico = columnas >= 0
+        matriz = sparse.csr_matrix((np.ones(int(en_lexico.sum())), (filas[en_lexico], columnas[en_lexico])),
+                                   shape=(len(frases), len(self.pesos)))
+        matriz.sum_duplicates()
+        return matriz
+
+    def puntuar(self, frases):
+        """Devuelve el arreglo de puntajes (uno por frase)."""
+        frases = list(frases)
+        _, filas, columnas = self._tokens(frases)
+        return self._puntajes(filas, columnas, len(frases))
+
+    def analizar(self, frases, palabras_clave=False):
+        """Analiza un lote de frases y devuelve un DataFrame columnar.
+
+        Columnas: `frase`, `puntaje`, `clasificacion` y, si se pide, `palabras_clave`
+        (en el mismo orden y con las mismas repeticiones que `analizar_sentimiento`).
+        """
+        frases = list(frases)
+        tokens_por_frase, filas, columnas = self._tokens(frases)
+        puntajes = self._puntajes(filas, columnas, len(frases))
+
+        resultado = pd.DataFrame({
+            "frase": frases,
+            "puntaje": puntajes.astype(np.int64 if self.enteros else np.float64),
+            "clasificacion": ETIQUETAS[(np.sign(puntajes) + 1).astype(np.int64)],
+        })
+        if palabras_clave:
+            en_lexico = iter((columnas >= 0).tolist())
+            resultado["palabras_clave"] = [[t for t in tokens if next(en_lexico)] for tokens in tokens_por_frase]
+        return resultado
+
+    def analizar_frase(self, frase):
+        """Analiza una sola frase y devuelve un dict como `analizar_sentimiento` (sin DataFrame)."""
+        tokens_por_frase, filas, columnas = self._tokens([frase])
+        puntaje = self._puntajes(filas, columnas, 1)[0]
+        return {
+            "frase": frase,
+            "puntaje": int(puntaje) if self.enteros else float(puntaje),
+            "clasificacion": ETIQUETAS[int(np.sign(puntaje)) + 1],
+            "palabras_clave": [t for t, c in zip(tokens_por_frase[0], columnas.tolist()) if c >= 0],
+        }
+
+    def cerrar(self):
+        """Suelta la vista de los pesos y cierra el léxico mapeado (si lo hay)."""
+        self.pesos = None
+        if self.lexico is not None:
+            self.lexico.cerrar()
+            self.lexico = None
+
+
+# --- BENCHMARK ---
+
+def _analizar_sentimiento_original(frase, stopwords, lexico_pos, lexico_neg):
+    """Copia de `analizar_sentimiento` (03_sentimiento_por_lexicon.py) como referencia."""
+    from tokenizador import tokenizar
+    words = tokenizar(frase)
+    words_cleaned = [word for word in words if word not in stopwords]
+    score_pos = sum(1 for word in words_cleaned if word in lexico_pos)
+    score_neg = sum(1 for word in words_cleaned if word in lexico_neg)
+    puntaje_final = score_pos - score_neg
+    if puntaje_final > 0:
+        clasificacion = "Positiva"
+    elif puntaje_final < 0:
+        clasificacion = "Negativa"
+    else:
+        clasificacion = "Neutra"
+    return {
+        "frase": frase,
+        "puntaje": puntaje_final,
+        "clasificacion": clasificacion,
+        "palabras_clave": [word for word in words_cleaned if word in lexico_pos or word in lexico_neg]
+    }
+
+
+if __name__ == '__main__':
+    import random
+
+    parser = argparse.ArgumentParser(description="Benchmark del clasificador por lotes.")
+    parser.add_argument('--frases', type=int, default=200_000)
+    args = parser.parse_args()
+
+    lexico_positivo = {"encanta", "fantástico", "útil", "adecuado", "increíble", "recomiendo", "totalmente", "mejorar"}
+    lexico_negativo = {"terrible", "decepcionante", "caro", "barato", "pésima", "tardó", "mal", "poquísimo", "desastre"}
+    stopwords_demo = {'de', 'la', 'que', 'el', 'en', 'y', 'a', 'es', 'muy', 'un', 'lo'}
+    relleno = ['el', 'producto', 'servicio', 'es', 'muy', 'precio', 'envío', 'la', 'calidad', 'no']
+    vocabulario = sorted(lexico_positivo | lexico_negativo) + relleno * 3
+
+    rng = random.Random(0)
+    frases = [' '.join(rng.choices(vocabulario, k=rng.randint(5, 20))).capitalize() + '.'
+              for _ in range(args.frases)]
+
+    inicio = time.perf_counter()
+    original = [_analizar_sentimiento_original(f, stopwords_demo, lexico_positivo, lexico_negativo) for f in frases]
+    t_original = time.perf_counter() - inicio
+
+    clasificador = ClasificadorLote.desde_lexicos(lexico_positivo, lexico_negativo, stopwords_demo)
+    inicio = time.perf_counter()
+    lote = clasificador.analizar(frases)
+    t_lote = time.perf_counter() - inicio
+
+    identico = lote.drop(columns="frase").to_dict("records") == [
+        {k: r[k] for k in ("puntaje", "clasificacion")} for r in original]
+    print(f"Frase a frase: {args.frases / t_original:,.0f} frases/s")
+    print(f"Por lotes    : {args.frases / t_lote:,.0f} frases/s  (x{t_original / t_lote:.1f}, idéntico: {identico})")
@@ -0,0 +1,293 @@
+"""
+Servicio asíncrono de sentimiento con micro-lotes (micro-batching).
+
+Llamar al clasificador frase a frase desde una capa web paga el coste fijo de cada
+llamada en cada petición. Este servicio (asyncio) acumula las frases que llegan en
+micro-lotes, con un plazo máximo de espera, las puntúa de una vez con el
+`ClasificadorLote` (sentimiento_lote.py) y resuelve el futuro de cada petición.
+
+Protocolo (TCP o socket Unix): el cliente envía una frase por línea (UTF-8) y recibe una
+línea JSON por frase, en el mismo orden. La línea especial `#metricas` devuelve las
+latencias p50/p99 y el histograma de tamaños de lote.
+
+Uso desde consola:
+    python servicio_sentimiento.py servir --puerto 8765          (o --unix /tmp/sentimiento.sock)
+    python servicio_sentimiento.py carga --puerto 8765 --clientes 50 --frases 2000
+    python servicio_sentimiento.py benchmark                      (servidor + carga en el mismo proceso)
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, deque
+
+from lexicos import LEXICO_NEGATIVO, LEXICO_POSITIVO, STOPWORDS_SENTIMIENTO
+from sentimiento_lote import ClasificadorLote
+
+MAX_LOTE = 512
+MAX_ESPERA = 0.005  # segundos que una frase puede esperar a que se llene su lote
+COMANDO_METRICAS = '#metricas'
+MAX_PENDIENTES = 1024  # respuestas en vuelo por conexión; al llenarse se deja de leer (contrapresión)
+
+
+# --- MÉTRICAS ---
+
+def percentil(valores, p):
+    """Percentil `p` (0-100) de una secuencia, por el método del vecino más cercano."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+class Metricas:
+    """Latencias recientes por petición e histograma de tamaños de lote."""
+
+    def __init__(self, ventana=10_000):
+        self.latencias = deque(maxlen=ventana)
+        self.tamanos_lote = Counter()  # cubeta (potencia de 2) -> número de lotes
+        self.peticiones = 0
+
+    def registrar_lote(self, tamano, latencias):
+        self.tamanos_lote[1 << (tamano - 1).bit_length()] += 1
+        self.latencias.extend(latencias)
+        self.peticiones += tamano
+
+    def resumen(self):
+        latencias = list(self.latencias)
+        return {
+            'peticiones': self.peticiones,
+            'latencia_p50_ms': round(percentil(latencias, 50) * 1000, 3),
+            'latencia_p99_ms': round(percentil(latencias, 99) * 1000, 3),
+            'histograma_lotes': {f'<={k}': v for k, v in sorted(self.tamanos_lote.items())},
+        }
+
+
+# --- MICRO-LOTES ---
+
+class MicroLotes:
+    """Agrupa peticiones en lotes de hasta `max_lote` frases o `max_espera` segundos."""
+
+    def __init__(self, clasificador, max_lote=MAX_LOTE, max_espera=MAX_ESPERA):
+        self.clasificador = clasificador
+        self.max_lote = max_lote
+        self.max_espera = max_espera
+        self.metricas = Metricas()
+        self._cola = asyncio.Queue()
+        self._tarea = None
+
+    def iniciar(self):
+        self._tarea = asyncio.get_running_loop().create_task(self._bucle())
+
+    async def detener(self):
+        if self._tarea:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+
+    def puntuar(self, frase):
+        """Encola una frase y devuelve un futuro con su resultado (dict)."""
+        futuro = asyncio.get_running_loop().create_future()
+        self._cola.put_nowait((frase, futuro, time.perf_counter()))
+        return futuro
+
+    async def _bucle(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self._cola.get()]
+            plazo = lote[0][2] + self.max_espera
+            while len(lote) < self.max_lote:
+                if not self._cola.empty():
+                    lote.append(self._cola.get_nowait())
+                    continue
+                restante = plazo - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+
+            frases = [frase for frase, _, _ in lote]
+            try:
+                # El puntuado es CPU: lo sacamos del bucle de eventos para no bloquear la E/S
+                resultado = await loop.run_in_executor(None, self.clasificador.analizar, frases)
+                filas = resultado[['puntaje', 'clasificacion']].to_dict('records')
+            except Exception as error:  # el error se propaga a cada petición del lote
+                for _, futuro, _ in lote:
+                    if not futuro.done():
+                        futuro.set_exception(error)
+                continue
+
+            ahora = time.perf_counter()
+            for (frase, futuro, llegada), fila in zip(lote, filas):
+                if not futuro.done():
+                    futuro.set_result({'frase': frase, 'puntaje': float(fila['puntaje']),
+                                       'clasificacion': fila['clasificacion']})
+            self.metricas.registrar_lote(len(lote), [ahora - llegada for _, _, llegada in lote])
+
+
+# --- SERVIDOR ---
+
+async def _atender(micro_lotes, lector, escritor):
+    """Atiende una conexión: lee frases por línea y responde en orden (con pipelining).
+
+    Como mucho `MAX_PENDIENTES` respuestas esperan a ser escritas: si el cliente no las lee,
+    el servidor deja de leer sus frases. Una desconexión del cliente cierra la conexión sin
+    propagar el error al servidor.
+    """
+    pendientes = asyncio.Queue(maxsize=MAX_PENDIENTES)
+
+    async def responder():
+        try:
+            while (futuro := await pendientes.get()) is not None:
+                try:
+                    respuesta = await futuro
+                except Exception as error:
+                    respuesta = {'error': str(error)}
+                escritor.write(json.dumps(respuesta, ensure_ascii=False).encode('utf-8') + b'\n')
+                await escritor.drain()
+        finally:
+            # Si el cliente se fue, se vacía la cola para no dejar bloqueado al lector
+            while not pendientes.empty():
+                pendientes.get_nowait()
+
+    tarea_respuestas = asyncio.create_task(responder())
+    try:
+        while not tarea_respuestas.done() and (linea := await lector.readline()):
+            frase = linea.decode('utf-8', errors='replace').rstrip('\r\n')
+            if frase == COMANDO_METRICAS:
+                futuro = asyncio.get_running_loop().create_future()
+                futuro.set_result(micro_lotes.metricas.resumen())
+            else:
+                futuro = micro_lotes.puntuar(frase)
+            await pendientes.put(futuro)
+    except (ConnectionResetError, asyncio.IncompleteReadError):
+        pass  # el cliente cerró la conexión
+    finally:
+        try:
+            if not tarea_respuestas.done():
+                await pendientes.put(None)
+            await tarea_respuestas
+        except (ConnectionResetError, BrokenPipeError):
+            pass  # el cliente se fue antes de leer todas las respuestas
+        finally:
+            escritor.close()
+
+
+async def iniciar_servidor(clasificador, puerto=None, ruta_unix=None, host='127.0.0.1', **kwargs):
+    """Arranca el servidor y devuelve (servidor, micro_lotes)."""
+    micro_lotes = MicroLotes(clasificador, **kwargs)
+    micro_lotes.iniciar()
+
+    def atender(lector, escritor):
+        return _atender(micro_lotes, lector, escritor)
+
+    if ruta_unix:
+        servidor = await asyncio.start_unix_server(atender, path=ruta_unix)
+    else:
+        servidor = await asyncio.start_server(atender, host, puerto)
+    return servidor, micro_lotes
+
+
+# --- GENERADOR DE CARGA ---
+
+async def _conectar(puerto=None, ruta_unix=None, host='127.0.0.1'):
+    if ruta_unix:
+        return await asyncio.open_unix_connection(ruta_unix)
+    return await asyncio.open_connection(host, puerto)
+
+
+async def generar_carga(frases, puerto=None, ruta_unix=None, clientes=50, por_cliente=1000, ventana=8):
+    """Lanza `clientes` conexiones concurrentes, cada una con hasta `ventana` peticiones en vuelo."""
+    latencias = []
+
+    async def cliente(semilla):
+        rng = random.Random(semilla)
+        lector, escritor = await _conectar(puerto, ruta_unix)
+        enviadas = deque()
+        for _ in range(por_cliente):
+            escritor.write(rng.choice(frases).encode('utf-8') + b'\n')
+            enviadas.append(time.perf_counter())
+            if len(enviadas) >= ventana:
+                await lector.readline()
+                latencias.append(time.perf_counter() - enviadas.popleft())
+        await escritor.drain()
+        while enviadas:
+            await lector.readline()
+            latencias.append(time.perf_counter() - enviadas.popleft())
+        escritor.close()
+        await escritor.wait_closed()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(i) for i in range(clientes)))
+    duracion = time.perf_counter() - inicio
+
+    lector, escritor = await _conectar(puerto, ruta_unix)
+    escritor.write(COMANDO_METRICAS.encode('utf-8') + b'\n')
+    metricas_servidor = json.loads(await lector.readline())
+    escritor.close()
+    await escritor.wait_closed()
+
+    return {
+        'peticiones': len(latencias),
+        'peticiones_por_segundo': round(len(latencias) / duracion),
+        'cliente_p50_ms': round(percentil(latencias, 50) * 1000, 3),
+        'cliente_p99_ms': round(percentil(latencias, 99) * 1000, 3),
+        'servidor': metricas_servidor,
+    }
+
+
+FRASES_DEMO = [
+    "Me encanta este producto, es fantástico y muy útil.",
+    "El servicio al cliente fue terrible, muy decepcionante.",
+    "El precio es adecuado, ni caro ni barato.",
+    "No volvería a comprar, la calidad es pésima.",
+    "Una experiencia increíble, lo recomiendo totalmente.",
+    "La batería dura poquísimo, un desastre.",
+]
+
+
+def _clasificador_demo():
+    """El clasificador del Ejercicio 3: mismos léxicos y mismas stopwords (lexicos.py)."""
+    return ClasificadorLote.desde_lexicos(LEXICO_POSITIVO, LEXICO_NEGATIVO, STOPWORDS_SENTIMIENTO)
+
+
+async def _principal(args):
+    if args.comando == 'servir':
+        servidor, _ = await iniciar_servidor(_clasificador_demo(), args.puerto, args.unix,
+                                             max_lote=args.max_lote, max_espera=args.max_espera_ms / 1000)
+        print(f"Servicio escuchando en {args.unix or f'127.0.0.1:{args.puerto}'} (Ctrl+C para salir)")
+        async with servidor:
+            await servidor.serve_forever()
+    elif args.comando == 'carga':
+        print(json.dumps(await generar_carga(FRASES_DEMO, args.puerto, args.unix, args.clientes, args.frases),
+                         indent=2, ensure_ascii=False))
+    else:
+        servidor, micro_lotes = await iniciar_servidor(_clasificador_demo(), puerto=0,
+                                                       max_lote=args.max_lote, max_espera=args.max_espera_ms / 1000)
+        puerto = servidor.sockets[0].getsockname()[1]
+        informe = await generar_carga(FRASES_DEMO, puerto, clientes=args.clientes, por_cliente=args.frases)
+        await asyncio.sleep(0.1)  # deja que el servidor cierre las conexiones ya terminadas
+        servidor.close()
+        await micro_lotes.detener()
+        print(json.dumps(informe, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Servicio de sentimiento con micro-lotes.")
+    parser.add_argument('comando', choices=['servir', 'carga', 'benchmark'])
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--unix', help="Ruta de un socket Unix (en lugar de TCP)")
+    parser.add_argument('--max-lote', type=int, default=MAX_LOTE)
+    parser.add_argument('--max-espera-ms', type=float, default=MAX_ESPERA * 1000)
+    parser.add_argument('--clientes', type=int, default=50)
+    parser.add_argument('--frases', type=int, default=1000, help="Peticiones por cliente")
+    try:
+        asyncio.run(_principal(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,345 @@
+"""
+Similitud de Jaccard de todos los pares, por bloques y con memoria acotada.
+
+`matriz_jaccard` devuelve la matriz densa n x n: con 100.000 documentos son 80 GB en
+float64. Aquí la matriz nunca existe entera:
+
+- Los documentos se recorren por bloques de filas cuyo tamaño sale de un presupuesto
+  de memoria (`presupuesto_mb`, repartido entre los procesos del pool).
+- Cada bloque se calcula en paralelo (ProcessPoolExecutor) con las mismas primitivas
+  que jaccard_disperso.py (`X @ X.T` sobre la matriz binaria CSR). En modo umbral cada
+  tarea es un bloque tam_bloque x tam_bloque (como mucho tam_bloque² pares); en modo
+  top-k, un bloque de filas (tam_bloque x k vecinos). Como mucho `EN_VUELO_POR_WORKER`
+  tareas por proceso están en vuelo a la vez, así que los resultados pendientes de
+  escribir también caben en memoria acotada.
+- Solo se guarda lo necesario, en formato COO (filas, columnas, similitudes) como
+  arreglos `.npy` mapeados en memoria:
+    * modo umbral: los pares i < j con similitud >= umbral (por defecto, los no nulos);
+    * modo top-k: los k vecinos más similares de cada documento.
+
+`guardar_matriz` guarda en el mismo formato los pares de una matriz densa ya calculada
+(corpus pequeños). `ParesSimilitud` abre el resultado sin cargarlo en RAM y ofrece el informe de pares más
+similares y las estadísticas intra/inter categoría (estadisticas_similitud.py) que usa el
+Ejercicio 4.
+
+Uso desde consola:
+    python similitud_bloques.py --docs 20000 --umbral 0.3 --presupuesto-mb 256 --workers 4
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from estadisticas_similitud import NUM_BORDES, AcumuladorCategorias
+from jaccard_disperso import jaccard_bloque, matriz_binaria
+
+PRESUPUESTO_MB = 256
+# Bytes aproximados por celda de un bloque: intersecciones, uniones, similitudes y temporales
+BYTES_POR_CELDA = 40
+BYTES_POR_PAR = 24  # un par de resultado: fila y columna (int64) y similitud (float64)
+TAM_MIN_BLOQUE = 64
+TAM_COPIA = 1 << 20  # elementos por trozo al pasar los resultados a `.npy`
+EN_VUELO_POR_WORKER = 2  # tareas enviadas al pool y aún no escritas, por proceso
+ARCHIVOS = ('filas', 'columnas', 'similitudes')
+
+# Estado del proceso trabajador (se fija una sola vez con el inicializador del pool)
+_datos = {}
+
+
+def tam_bloque_para_presupuesto(presupuesto_mb, workers=1):
+    """Lado del bloque (filas x columnas) que cabe en el presupuesto de cada proceso.
+
+    Cuenta el cálculo del bloque y los `EN_VUELO_POR_WORKER` resultados pendientes de
+    escribir, en el peor caso (todos los pares del bloque sobre el umbral).
+    """
+    bytes_por_worker = presupuesto_mb * (1 << 20) / max(1, workers)
+    bytes_por_celda = BYTES_POR_CELDA + EN_VUELO_POR_WORKER * BYTES_POR_PAR
+    return max(TAM_MIN_BLOQUE, int(math.sqrt(bytes_por_worker / bytes_por_celda)))
+
+
+# --- CÁLCULO DE UN BLOQUE DE FILAS (PROCESO TRABAJADOR) ---
+
+def _inicializar_trabajador(X, umbral, k, tam_bloque):
+    _datos['X'] = X
+    _datos['XT'] = X.T.tocsc()
+    _datos['cardinalidades'] = np.diff(X.indptr)
+    _datos['umbral'] = umbral
+    _datos['k'] = k
+    _datos['tam_bloque'] = tam_bloque
+
+
+def _cumple_umbral(similitudes, umbral):
+    return similitudes > 0 if umbral is None else similitudes >= umbral
+
+
+def _pares_sobre_umbral(fila0, fila1, col0, col1):
+    """Pares (i, j) con i < j y similitud sobre el umbral en el bloque [fila0, fila1) x [col0, col1)."""
+    X, XT, cardinalidades = _datos['X'], _datos['XT'], _datos['cardinalidades']
+    bloque = jaccard_bloque(X[fila0:fila1], XT[:, col0:col1], cardinalidades[fila0:fila1], cardinalidades[col0:col1])
+    seleccion = _cumple_umbral(bloque, _datos['umbral'])
+    if col0 == fila0:
+        seleccion &= np.triu(np.ones(bloque.shape, dtype=bool), k=1)
+    filas, columnas = np.nonzero(seleccion)
+    return filas + fila0, columnas + col0, bloque[filas, columnas]
+
+
+def _vecinos_top_k(fila0, fila1):
+    """Los k vecinos más similares (j != i) de cada fila de [fila0, fila1)."""
+    X, XT, cardinalidades = _datos['X'], _datos['XT'], _datos['cardinalidades']
+    n, tam_bloque, k = X.shape[0], _datos['tam_bloque'], _datos['k']
+    X_filas = X[fila0:fila1]
+    m = fila1 - fila0
+    mejores = np.full((m, 0), -np.inf)
+    columnas_mejores = np.zeros((m, 0), dtype=np.int64)
+
+    for col0 in range(0, n, tam_bloque):
+        col1 = min(col0 + tam_bloque, n)
+        bloque = jaccard_bloque(X_filas, XT[:, col0:col1], cardinalidades[fila0:fila1], cardinalidades[col0:col1])
+        propias = np.arange(max(fila0, col0), min(fila1, col1))
+        bloque[propias - fila0, propias - col0] = -np.inf  # un documento no es vecino de sí mismo
+
+        candidatos = np.hstack([mejores, bloque])
+        columnas_candidatas = np.hstack([columnas_mejores, np.broadcast_to(np.arange(col0, col1), bloque.shape)])
+        if candidatos.shape[1] > k:
+            elegidos = np.argpartition(-candidatos, k - 1, axis=1)[:, :k]
+            candidatos = np.take_along_axis(candidatos, elegidos, axis=1)
+            columnas_candidatas = np.take_along_axis(columnas_candidatas, elegidos, axis=1)
+        mejores, columnas_mejores = candidatos, columnas_candidatas
+
+    # Orden de cada fila: similitud descendente y, en empate, columna ascendente
+    orden = np.lexsort((columnas_mejores, -mejores), axis=1)
+    mejores = np.take_along_axis(mejores, orden, axis=1)
+    columnas_mejores = np.take_along_axis(columnas_mejores, orden, axis=1)
+    filas = np.broadcast_to(np.arange(fila0, fila1)[:, None], mejores.shape)
+    seleccion = _cumple_umbral(mejores, _datos['umbral'])
+    return filas[seleccion], columnas_mejores[seleccion], mejores[seleccion]
+
+
+def _calcular_bloque(rango):
+    return _vecinos_top_k(*rango) if _datos['k'] else _pares_sobre_umbral(*rango)
+
+
+def _en_orden_acotado(pool, funcion, tareas, en_vuelo):
+    """Como `pool.map`, pero con como mucho `en_vuelo` tareas enviadas y sin consumir."""
+    pendientes = deque()
+    for tarea in tareas:
+        if len(pendientes) >= en_vuelo:
+            yield pendientes.popleft().result()
+        pendientes.append(pool.submit(funcion, tarea))
+    while pendientes:
+        yield pendientes.popleft().result()
+
+
+# --- ESCRITURA EN DISCO ---
+
+def escribir_pares(conjuntos, directorio, umbral=None, k=None, presupuesto_mb=PRESUPUESTO_MB,
+                   workers=None, tam_bloque=None):
+    """Calcula la similitud de Jaccard por bloques y guarda los pares en `directorio`.
+
+    - `k=None`: pares i < j con similitud >= `umbral` (o > 0 si `umbral` es None).
+    - `k` entero: los k vecinos más similares de cada documento (filtrados por `umbral`).
+
+    Devuelve un `ParesSimilitud` abierto sobre el resultado.
+    """
+    X, _ = matriz_binaria(conjuntos)
+    n = X.shape[0]
+    workers = workers or os.cpu_count() or 1
+    tam_bloque = tam_bloque or tam_bloque_para_presupuesto(presupuesto_mb, workers)
+    if k:
+        rangos = [(fila0, min(fila0 + tam_bloque, n)) for fila0 in range(0, n, tam_bloque)]
+    else:
+        # Solo los bloques del triángulo superior, en orden de filas y después de columnas
+        rangos = [(fila0, min(fila0 + tam_bloque, n), col0, min(col0 + tam_bloque, n))
+                  for fila0 in range(0, n, tam_bloque) for col0 in range(fila0, n, tam_bloque)]
+
+    os.makedirs(directorio, exist_ok=True)
+    tipos = _tipos(n)
+    rutas_crudas = [os.path.join(directorio, f'{nombre}.tmp') for nombre in ARCHIVOS]
+    try:
+        with contextlib.ExitStack() as pila:
+            crudos = [pila.enter_context(open(ruta, 'wb')) for ruta in rutas_crudas]
+            if workers == 1 or len(rangos) == 1:
+                _inicializar_trabajador(X, umbral, k, tam_bloque)
+                total = _volcar(map(_calcular_bloque, rangos), crudos, tipos)
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_trabajador,
+                                         initargs=(X, umbral, k, tam_bloque)) as pool:
+                    resultados = _en_orden_acotado(pool, _calcular_bloque, rangos, workers * EN_VUELO_POR_WORKER)
+                    total = _volcar(resultados, crudos, tipos)
+
+        # Con el total ya conocido, pasamos cada archivo crudo a un `.npy` mapeable
+        for nombre, tipo, ruta_cruda in zip(ARCHIVOS, tipos, rutas_crudas):
+            destino = open_memmap(os.path.join(directorio, f'{nombre}.npy'), mode='w+', dtype=tipo, shape=(total,))
+            if total:
+                origen = np.memmap(ruta_cruda, dtype=tipo, mode='r', shape=(total,))
+                for inicio in range(0, total, TAM_COPIA):
+                    destino[inicio:inicio + TAM_COPIA] = origen[inicio:inicio + TAM_COPIA]
+                del origen
+            destino.flush()
+            del destino
+            os.remove(ruta_cruda)
+    except BaseException:
+        # Un error (o Ctrl+C) a medias no deja los archivos crudos en el directorio
+        for ruta_cruda in rutas_crudas:
+            try:
+                os.remove(ruta_cruda)
+            except FileNotFoundError:
+                pass
+        raise
+
+    _guardar_metadatos(directorio, {'documentos': n, 'pares': total, 'modo': 'top_k' if k else 'umbral',
+                                    'umbral': umbral, 'k': k, 'tam_bloque': tam_bloque})
+    return ParesSimilitud(directorio)
+
+
+def guardar_pares(directorio, documentos, filas, columnas, similitudes, umbral=None):
+    """Guarda pares i < j ya calculados (en memoria) con el mismo formato que `escribir_pares`."""
+    os.makedirs(directorio, exist_ok=True)
+    for nombre, arreglo, tipo in zip(ARCHIVOS, (filas, columnas, similitudes), _tipos(documentos)):
+        np.save(os.path.join(directorio, f'{nombre}.npy'), np.asarray(arreglo, dtype=tipo))
+    _guardar_metadatos(directorio, {'documentos': documentos, 'pares': len(similitudes), 'modo': 'umbral',
+                                    'umbral': umbral, 'k': None, 'tam_bloque': None})
+    return ParesSimilitud(directorio)
+
+
+def guardar_matriz(directorio, matriz, umbral=None):
+    """Guarda los pares i < j de una matriz de similitud densa ya calculada (sin recalcularla)."""
+    seleccion = np.triu(np.ones(matriz.shape, dtype=bool), k=1) & _cumple_umbral(matriz, umbral)
+    filas, columnas = np.nonzero(seleccion)
+    return guardar_pares(directorio, len(matriz), filas, columnas, matriz[filas, columnas], umbral)
+
+
+def _tipos(documentos):
+    indice = np.int32 if documentos < 2 ** 31 else np.int64
+    return indice, indice, np.float64
+
+
+def _guardar_metadatos(directorio, metadatos):
+    with open(os.path.join(directorio, 'metadatos.json'), 'w', encoding='utf-8') as archivo:
+        json.dump(metadatos, archivo, indent=2)
+
+
+def _volcar(resultados, crudos, tipos):
+    """Añade cada resultado (filas, columnas, similitudes) a los archivos crudos."""
+    total = 0
+    for arreglos in resultados:
+        for crudo, arreglo, tipo in zip(crudos, arreglos, tipos):
+            crudo.write(np.ascontiguousarray(arreglo, dtype=tipo).tobytes())
+        total += len(arreglos[0])
+    return total
+
+
+# --- LECTURA Y ANÁLISIS ---
+
+class ParesSimilitud:
+    """Pares de similitud guardados por `escribir_pares`, mapeados en memoria."""
+
+    def __init__(self, directorio):
+        with open(os.path.join(directorio, 'metadatos.json'), encoding='utf-8') as archivo:
+            self.metadatos = json.load(archivo)
+        self.documentos = self.metadatos['documentos']
+        self.filas, self.columnas, self.similitudes = (
+            np.load(os.path.join(directorio, f'{nombre}.npy'), mmap_mode='r') for nombre in ARCHIVOS)
+
+    def __len__(self):
+        return len(self.similitudes)
+
+    def cerrar(self):
+        """Suelta los mapeos (necesario en Windows antes de borrar el directorio)."""
+        self.filas = self.columnas = self.similitudes = None
+
+    def _trozos_unicos(self):
+        """Genera los pares (i, j, similitud) con i < j por trozos de `TAM_COPIA`, sin repetidos.
+
+        En top-k un par sale dos veces si cada documento está entre los vecinos del otro:
+        se descarta la copia (i, j) con i > j cuando la fila j también contiene a i. Las
+        filas están ordenadas, así que los vecinos de cada documento son un tramo contiguo.
+        """
+        top_k = self.metadatos['modo'] == 'top_k'
+        if top_k and len(self):
+            k = self.metadatos['k']
+            inicios = np.searchsorted(self.filas, np.arange(self.documentos + 1))
+        for inicio in range(0, len(self), TAM_COPIA):
+            trozo = slice(inicio, inicio + TAM_COPIA)
+            filas = np.asarray(self.filas[trozo], dtype=np.int64)
+            columnas = np.asarray(self.columnas[trozo], dtype=np.int64)
+            similitudes = np.asarray(self.similitudes[trozo])
+            if top_k:
+                invertidos = np.flatnonzero(filas > columnas)
+                j = columnas[invertidos]
+                posiciones = inicios[j][:, None] + np.arange(k)
+                validas = posiciones < inicios[j + 1][:, None]
+                vecinos = np.asarray(self.columnas[np.minimum(posiciones, len(self) - 1)])
+                repetidos = ((vecinos == filas[invertidos][:, None]) & validas).any(axis=1)
+                conservar = np.ones(len(filas), dtype=bool)
+                conservar[invertidos[repetidos]] = False
+                filas, columnas, similitudes = filas[conservar], columnas[conservar], similitudes[conservar]
+                filas, columnas = np.minimum(filas, columnas), np.maximum(filas, columnas)
+            yield filas, columnas, similitudes
+
+    def top(self, n=10):
+        """Los `n` pares más similares como [(i, j, similitud)], en el mismo orden que
+        `sorted(pares, key=similitud, reverse=True)` sobre los pares (i, j) en orden.
+
+        Se recorre el mapeo por trozos y solo se conservan los `n` mejores hasta el momento.
+        """
+        filas, columnas, similitudes = (np.empty(0, dtype=np.int64),) * 2 + (np.empty(0),)
+        for trozo in self._trozos_unicos():
+            filas, columnas, similitudes = (np.concatenate(par) for par in zip((filas, columnas, similitudes), trozo))
+            if len(similitudes) > n:
+                corte = np.partition(similitudes, len(similitudes) - n)[len(similitudes) - n]
+                seleccion = similitudes >= corte
+                filas, columnas, similitudes = filas[seleccion], columnas[seleccion], similitudes[seleccion]
+            orden = np.lexsort((columnas, filas, -similitudes))[:n]
+            filas, columnas, similitudes = filas[orden], columnas[orden], similitudes[orden]
+        return [(int(i), int(j), float(s)) for i, j, s in zip(filas, columnas, similitudes)]
+
+    def estadisticas(self, etiquetas, intervalos=NUM_BORDES):
+        """`AcumuladorCategorias` (estadisticas_similitud.py) alimentado con los pares en disco.
+
+        Los pares se leen por trozos del mapeo, sin cargarlos enteros. Los
+        pares que no están en disco (por debajo del umbral, o nulos con `umbral=None`)
+        cuentan como ceros, así que las estadísticas son exactas con `umbral=None`.
+        """
+        acumulador = AcumuladorCategorias(etiquetas, intervalos)
+        for trozo in self._trozos_unicos():
+            acumulador.agregar_pares(*trozo)
+        return acumulador
+
+
+if __name__ == '__main__':
+    import random
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Similitud de todos los pares por bloques, sin matriz densa.")
+    parser.add_argument('--docs', type=int, default=20_000)
+    parser.add_argument('--umbral', type=float, default=0.3)
+    parser.add_argument('--top-k', type=int, default=None)
+    parser.add_argument('--presupuesto-mb', type=float, default=PRESUPUESTO_MB)
+    parser.add_argument('--workers', nargs='+', type=int, default=sorted({1, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulario = [f"palabra{i}" for i in range(5000)]
+    temas = [rng.sample(vocabulario, 200) for _ in range(20)]
+    conjuntos = [set(rng.sample(temas[i % 20], rng.randint(5, 30))) for i in range(args.docs)]
+
+    print(f"Matriz densa equivalente: {args.docs ** 2 * 8 / (1 << 30):.1f} GB")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as directorio:
+            inicio = time.perf_counter()
+            pares = escribir_pares(conjuntos, directorio, args.umbral, args.top_k, args.presupuesto_mb, workers)
+            duracion = time.perf_counter() - inicio
+            en_disco = sum(os.path.getsize(os.path.join(directorio, f'{nombre}.npy')) for nombre in ARCHIVOS)
+            print(f"{workers:>3} procesos: {duracion:.2f} s, bloque {pares.metadatos['tam_bloque']}, "
+                  f"{len(pares)} pares, {en_disco / (1 << 20):.1f} MB en disco")
+            print(f"    top 3: {pares.top(3)}")
+            pares.cerrar()
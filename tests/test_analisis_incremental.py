@@ -0,0 +1,16 @@
+"""Filtros sobre el vocabulario (analisis_incremental.py) frente a `contar_filtrado`."""
+
+from analisis_incremental import AnalisisIncremental
+from conteo_fusionado import contar_filtrado, generar_corpus_sintetico
+
+STOPWORDS = {'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'no', 'muy', 'es'}
+
+
+def test_mismo_conteo_y_top_que_contar_filtrado():
+    texto = generar_corpus_sintetico(1, semilla=3)
+    analisis = AnalisisIncremental.desde_texto(texto)
+    for stopwords, min_len in ((None, 1), (STOPWORDS, 1), (STOPWORDS, 4), (None, 6)):
+        esperado, total = contar_filtrado(texto, stopwords, min_len)
+        assert analisis.conteo_limpio(stopwords, min_len) == esperado
+        assert analisis.top(10, analisis.mascara(stopwords, min_len)) == esperado.most_common(10)
+        assert analisis.resumen(stopwords, min_len)['total_clean'] == total
@@ -0,0 +1,39 @@
+"""Cotas de error del Count-Min Sketch (conteo_aproximado.py) frente al conteo exacto."""
+
+import io
+
+from conteo_aproximado import ConteoAproximado, contar_aproximado, verificar_cotas
+from conteo_fusionado import generar_corpus_sintetico
+from conteo_streaming import contar_en_flujo
+
+# Sketch más estrecho que el vocabulario (~2000 palabras): hay colisiones de verdad
+EPSILON, DELTA = 0.002, 0.01
+
+
+def _conteos():
+    texto = generar_corpus_sintetico(1, semilla=7)
+    exacto, total_exacto = contar_en_flujo(io.StringIO(texto))
+    sketch, total = contar_aproximado(io.StringIO(texto), EPSILON, DELTA, k=10)
+    return sketch, total, exacto, total_exacto
+
+
+def test_cotas_frente_al_conteo_exacto():
+    sketch, total, exacto, total_exacto = _conteos()
+    assert sketch.ancho < len(exacto)
+    assert total == total_exacto
+
+    resumen = verificar_cotas(sketch, exacto)
+    assert resumen['nunca_subestima']
+    assert resumen['fraccion_dentro_de_cota'] >= 1 - DELTA
+    assert resumen['coincidencias_top_10'] >= 9
+
+
+def test_estimacion_igual_con_y_sin_cache_de_hashes():
+    palabras = ['producto', 'envío', 'batería', 'palabra7']
+    con_cache = ConteoAproximado(EPSILON, DELTA)
+    con_cache.update(palabras * 3)
+    con_cache.update(palabras)  # segundo lote: hashes desde la caché
+    sin_cache = ConteoAproximado(EPSILON, DELTA)
+    sin_cache.update(palabras * 4)
+    assert (con_cache.tabla == sin_cache.tabla).all()
+    assert all(con_cache[p] >= 4 for p in palabras)
@@ -0,0 +1,22 @@
+"""Tokenización por bloques (conteo_streaming.py): los bloques no parten palabras."""
+
+import io
+
+from conteo_streaming import contar_en_flujo, leer_en_bloques, tokenizar_en_flujo
+from tokenizador import tokenizar
+
+TEXTO = "Reseña: el envío llegó_tarde, ΣΑΣ ΟΔΟΣ; İstanbul 2024 y la batería dura 10h.\n" * 5
+
+
+def test_bloques_pequenos_igual_que_el_texto_entero():
+    for tam_bloque in (1, 2, 3, 7, 64):
+        tokens = list(tokenizar_en_flujo(leer_en_bloques(io.StringIO(TEXTO), tam_bloque)))
+        assert tokens == tokenizar(TEXTO), tam_bloque
+
+
+def test_conteo_en_flujo_con_filtros():
+    word_counts, total = contar_en_flujo(io.StringIO(TEXTO), tam_bloque=5, stopwords={'el', 'la'}, min_len=3)
+    esperado = [t for t in tokenizar(TEXTO) if t not in {'el', 'la'} and len(t) >= 3]
+    assert total == len(esperado)
+    assert sum(word_counts.values()) == total
+    assert word_counts['envío'] == 5 and 'el' not in word_counts
@@ -0,0 +1,31 @@
+"""Modelo guardado (modelo_clustering.py): búsqueda en el vocabulario UTF-8 y asignación."""
+
+import random
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from modelo_clustering import cargar_modelo, guardar_modelo
+
+
+def test_vocabulario_utf8_y_asignacion(tmp_path):
+    rng = random.Random(3)
+    letras = 'abcñéíóúxyzß汉字'
+    vocabulario = sorted({''.join(rng.choices(letras, k=rng.randint(2, 9))) for _ in range(2000)}) + ['ab', 'abc', 'abcd']
+    documentos = [' '.join(rng.choices(vocabulario, k=20)) for _ in range(600)]
+    vectorizer = TfidfVectorizer()
+    kmeans = KMeans(n_clusters=5, n_init=2, random_state=0).fit(vectorizer.fit_transform(documentos))
+    guardar_modelo(tmp_path, vectorizer, kmeans)
+    modelo = cargar_modelo(tmp_path)
+
+    terminos = vectorizer.get_feature_names_out().tolist()
+    consulta = terminos + ['zzzz', 'a', 'abcde', 'ñ' * 12]
+    esperado = [vectorizer.vocabulary_.get(t, -1) for t in consulta]
+    assert modelo.columnas_de(consulta).tolist() == esperado
+    assert modelo.termino(len(terminos) - 1) == terminos[-1]
+
+    nuevos = [' '.join(rng.choices(vocabulario, k=15)) for _ in range(500)]
+    assert abs(modelo.transformar(nuevos) - vectorizer.transform(nuevos)).max() < 1e-12
+    assert np.array_equal(modelo.asignar(nuevos), kmeans.predict(vectorizer.transform(nuevos)))
+    del modelo
@@ -0,0 +1,17 @@
+"""Expresiones multipalabra y negación (sentimiento_frases.py)."""
+
+from sentimiento_frases import AnalizadorFrases
+
+ANALIZADOR = AnalizadorFrases.desde_lexicos({'barato', 'vale la pena', 'bien'}, {'caro', 'mal', 'nada del otro mundo'})
+
+
+def test_negacion_invierte_la_expresion():
+    assert ANALIZADOR.analizar("No está mal, pero podría mejorar.")["puntaje"] == 1
+    assert ANALIZADOR.analizar("Nunca vale la pena")["puntaje"] == -1
+
+
+def test_ni_correlativo_no_niega():
+    resultado = ANALIZADOR.analizar("ni caro ni barato")
+    assert resultado["puntaje"] == 0
+    assert resultado["clasificacion"] == "Neutra"
+    assert resultado["palabras_clave"] == ["caro", "barato"]
@@ -0,0 +1,58 @@
+"""Jaccard por bloques (similitud_bloques.py) frente a la matriz completa."""
+
+import random
+
+import numpy as np
+import pytest
+
+import similitud_bloques
+from jaccard_disperso import matriz_jaccard
+from similitud_bloques import escribir_pares
+
+
+def _conjuntos(n=150, semilla=0):
+    rng = random.Random(semilla)
+    vocabulario = [f"palabra{i}" for i in range(60)]
+    return [set(rng.sample(vocabulario, rng.randint(1, 12))) for _ in range(n)]
+
+
+def test_umbral_igual_que_la_matriz_completa(tmp_path):
+    conjuntos = _conjuntos()
+    matriz = matriz_jaccard(conjuntos)
+    for workers in (1, 2):
+        pares = escribir_pares(conjuntos, tmp_path / f'umbral{workers}', umbral=0.2, workers=workers, tam_bloque=32)
+        filas, columnas = np.nonzero(np.triu(matriz >= 0.2, k=1))
+        assert len(pares) == len(filas)
+        obtenido = sorted(zip(pares.filas.tolist(), pares.columnas.tolist()))
+        assert obtenido == sorted(zip(filas.tolist(), columnas.tolist()))
+        assert np.allclose(matriz[pares.filas, pares.columnas], pares.similitudes)
+        pares.cerrar()
+
+
+def test_top_k_son_los_vecinos_mas_similares(tmp_path):
+    conjuntos = _conjuntos()
+    matriz = matriz_jaccard(conjuntos)
+    np.fill_diagonal(matriz, -1)
+    pares = escribir_pares(conjuntos, tmp_path / 'top_k', k=3, workers=1, tam_bloque=32)
+    for i in range(len(conjuntos)):
+        mias = np.sort(pares.similitudes[pares.filas == i])[::-1]
+        assert np.allclose(mias, np.sort(matriz[i])[::-1][:len(mias)])
+    pares.cerrar()
+
+
+def test_top_por_trozos_y_sin_crudos_tras_un_error(tmp_path, monkeypatch):
+    conjuntos = _conjuntos()
+    pares = escribir_pares(conjuntos, tmp_path / 'top_k', k=3, workers=1, tam_bloque=32)
+    esperado = pares.top(20)
+    monkeypatch.setattr(similitud_bloques, 'TAM_COPIA', 7)  # muchos trozos pequeños
+    assert pares.top(20) == esperado
+    assert len({(i, j) for i, j, _ in esperado}) == len(esperado)
+    pares.cerrar()
+
+    def fallar(*args):
+        raise RuntimeError("fallo a mitad del volcado")
+
+    monkeypatch.setattr(similitud_bloques, '_volcar', fallar)
+    with pytest.raises(RuntimeError):
+        escribir_pares(conjuntos, tmp_path / 'error', umbral=0.2, workers=1, tam_bloque=32)
+    assert not list((tmp_path / 'error').glob('*.tmp'))
@@ -0,0 +1,69 @@
+"""Cola acotada y resultados de `GestorTrabajos` (trabajos_analisis.py)."""
+
+import io
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+import trabajos_analisis
+from conteo_fusionado import contar_filtrado
+from trabajos_analisis import ColaLlena, GestorTrabajos, contar_archivo
+
+TEXTO = "el envío llegó tarde pero el producto es muy bueno\n" * 200
+
+
+def _archivo():
+    return io.BytesIO(TEXTO.encode('utf-8'))
+
+
+def test_cola_llena(tmp_path):
+    gestor = GestorTrabajos(max_concurrentes=1, max_en_cola=2, directorio=tmp_path)
+    bloqueo = threading.Event()
+    gestor._pool.submit(bloqueo.wait)  # ocupa el único hilo: los trabajos quedan en cola
+    try:
+        trabajos = [gestor.enviar(_archivo(), f'r{i}.txt') for i in range(2)]
+        with pytest.raises(ColaLlena):
+            gestor.enviar(_archivo(), 'r2.txt')
+        assert all(t.estado == 'en cola' for t in trabajos)
+    finally:
+        bloqueo.set()
+        gestor.cerrar()
+    # `cerrar` cancela los que aún no habían empezado; ninguno deja su temporal en disco
+    assert all(t.estado in ('terminado', 'cancelado') for t in trabajos)
+    assert not list(tmp_path.iterdir())
+
+
+def test_resultado_igual_que_contar_filtrado(tmp_path):
+    gestor = GestorTrabajos(directorio=tmp_path)
+    try:
+        trabajo = gestor.enviar(_archivo(), 'r.txt', min_len=3)
+        while trabajo.pendiente:
+            time.sleep(0.01)
+    finally:
+        gestor.cerrar()
+    assert trabajo.estado == 'terminado'
+    esperado, total = contar_filtrado(TEXTO, min_len=3)
+    assert trabajo.resultado['total_clean'] == total
+    assert trabajo.analisis.conteo_limpio(min_len=3) == esperado
+
+
+def test_jsonl_ignora_lo_que_no_es_objeto(tmp_path):
+    ruta = tmp_path / 'resenas.jsonl'
+    ruta.write_text('{"texto": "muy bueno"}\n[1, 2]\n"envío rápido"\n3\nnull\n{"texto": "bueno"}\n', encoding='utf-8')
+    assert contar_archivo(ruta, 'jsonl', 'texto') == Counter({'bueno': 2, 'muy': 1, 'envío': 1, 'rápido': 1})
+
+
+def test_sin_temporal_si_el_trabajo_no_se_crea(tmp_path, monkeypatch):
+    def fallar(*args):
+        raise OSError("sin espacio")
+
+    monkeypatch.setattr(trabajos_analisis.Trabajo, '__init__', fallar)
+    gestor = GestorTrabajos(directorio=tmp_path)
+    try:
+        with pytest.raises(OSError):
+            gestor.enviar(_archivo(), 'r.txt')
+    finally:
+        gestor.cerrar()
+    assert not list(tmp_path.iterdir()) and not gestor.trabajos()
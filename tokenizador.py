@@ -0,0 +1,60 @@
+"""
+Tokenizador compartido por todos los ejercicios y dashboards.
+
+Todos los scripts usaban `re.findall(r'\\b\\w+\\b', ...)` en línea, lo que obliga a buscar
+el patrón en la caché interna de `re` en cada llamada. Aquí el patrón se compila una
+sola vez y se exponen tres formas de uso:
+
+- `tokenizar(texto)`: lista de tokens (como `re.findall`).
+- `iterar_tokens(texto)`: generador perezoso basado en `finditer`.
+- `tokenize_many(docs)`: tokenización por lotes de muchos documentos.
+
+Si en el futuro queremos un motor más rápido, basta con registrarlo con
+`configurar_backend` y todos los scripts lo usarán sin cambios.
+"""
+
+import re
+
+# Patrón de palabra: `\b` delimita palabras completas y `\w+` toma letras, dígitos y '_'.
+PATRON_PALABRA = re.compile(r'\b\w+\b')
+
+# Motor activo (por defecto, el patrón compilado de `re`)
+_findall = PATRON_PALABRA.findall
+_finditer = PATRON_PALABRA.finditer
+
+
+def configurar_backend(findall, finditer=None):
+    """Sustituye el motor de tokenización (p. ej. por una implementación compilada).
+
+    `findall(texto)` debe devolver la lista de tokens; `finditer(texto)` es opcional y,
+    si se omite, el modo perezoso itera sobre el resultado de `findall`.
+    """
+    global _findall, _finditer
+    _findall = findall
+    _finditer = finditer
+
+
+def tokenizar(texto, minusculas=True):
+    """Devuelve la lista de tokens de `texto` (normalizado a minúsculas por defecto)."""
+    if minusculas:
+        texto = texto.lower()
+    return _findall(texto)
+
+
+def iterar_tokens(texto, minusculas=True):
+    """Genera los tokens de `texto` uno a uno, sin construir la lista completa."""
+    if minusculas:
+        texto = texto.lower()
+    if _finditer is None:
+        yield from _findall(texto)
+        return
+    for match in _finditer(texto):
+        yield match.group()
+
+
+def tokenize_many(docs, minusculas=True):
+    """Tokeniza un lote de documentos y devuelve una lista de listas de tokens."""
+    findall = _findall
+    if minusculas:
+        return [findall(doc.lower()) for doc in docs]
+    return [findall(doc) for doc in docs]
@@ -0,0 +1,332 @@
+"""
+Análisis de archivos grandes (txt, csv, jsonl) en trabajos de segundo plano.
+
+El dashboard solo aceptaba texto pegado en un `st.text_area` (con aviso por encima de
+1200 caracteres). Para archivos de cientos de MB:
+
+- El archivo subido se vuelca a un temporal en disco y un hilo de trabajo lo lee por
+  bloques (`leer_en_bloques`), lo tokeniza sin partir palabras entre bloques y lo cuenta
+  con `Counter.update`. El progreso son los bytes leídos sobre el tamaño total.
+- Se cuenta una sola vez el texto en bruto: los filtros (stopwords, longitud mínima) se
+  aplican después sobre el vocabulario (`AnalisisIncremental`), así que salen a la vez
+  las métricas "antes" y "después" de limpiar, y cambiar los filtros en el dashboard no
+  obliga a releer el archivo.
+- Al terminar, el trabajo deja las mismas métricas y tablas top 10 que el análisis del
+  texto pegado, y la nube de palabras como PNG (con `generate_from_frequencies`, sin
+  volver a unir el texto).
+- `GestorTrabajos` limita los trabajos simultáneos del servidor (un pool de hilos de
+  tamaño fijo) y la cola de espera; el dashboard consulta el estado cada segundo.
+
+Uso desde consola (analiza un archivo con un trabajo y muestra el progreso):
+    python trabajos_analisis.py reseñas.txt
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from analisis_incremental import AnalisisIncremental
+from conteo_streaming import TAM_BLOQUE, leer_en_bloques, tokenizar_bloques
+from nube_palabras import dibujar_png
+from tokenizador import tokenizar
+
+FORMATOS = ('txt', 'csv', 'jsonl')
+MAX_CONCURRENTES = 2      # trabajos procesándose a la vez en el servidor
+MAX_EN_COLA = 8           # trabajos pendientes (en cola o procesando) como máximo
+MAX_TERMINADOS = 32       # trabajos terminados que se conservan para consultarlos
+MAX_PALABRAS_NUBE = 200   # como `WordCloud(max_words=200)`
+TOP_N = 10
+
+
+class ColaLlena(RuntimeError):
+    """No se admiten más trabajos hasta que termine alguno de los pendientes."""
+
+
+# --- LECTURA CON PROGRESO ---
+
+class _LectorConProgreso(io.RawIOBase):
+    """Envuelve un archivo binario y cuenta los bytes leídos (para la barra de progreso)."""
+
+    def __init__(self, archivo):
+        self._archivo = archivo
+        self.leidos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        n = self._archivo.readinto(destino)
+        self.leidos += n or 0
+        return n
+
+
+def _textos_registros(registros, tam_bloque=TAM_BLOQUE):
+    """Agrupa los textos de muchos registros cortos en bloques de ~`tam_bloque` caracteres."""
+    partes, tam = [], 0
+    for texto in registros:
+        partes.append(texto)
+        tam += len(texto)
+        if tam >= tam_bloque:
+            yield '\n'.join(partes)
+            partes, tam = [], 0
+    if partes:
+        yield '\n'.join(partes)
+
+
+def _registros_csv(archivo, columna=None):
+    for fila in csv.DictReader(archivo):
+        if columna is not None:
+            yield fila.get(columna) or ''
+        else:
+            yield ' '.join(valor for valor in fila.values() if isinstance(valor, str))
+
+
+def _registros_jsonl(archivo, campo=None):
+    for linea in archivo:
+        if not linea.strip():
+            continue
+        registro = json.loads(linea)
+        if isinstance(registro, str):
+            yield registro
+        elif not isinstance(registro, dict):
+            continue  # números, listas o null: no hay texto que contar
+        elif campo is not None:
+            yield str(registro.get(campo) or '')
+        else:
+            yield ' '.join(valor for valor in registro.values() if isinstance(valor, str))
+
+
+def contar_archivo(ruta, formato='txt', campo=None, progreso=None, cancelado=None):
+    """Cuenta las palabras (sin filtros) de un archivo txt, csv o jsonl leyéndolo por bloques.
+
+    `progreso(leidos, total)` se llama tras cada bloque; si `cancelado()` devuelve True,
+    se detiene. `campo` es la columna (csv) o clave (jsonl) con el texto; por defecto se
+    usan todos los campos de texto; en jsonl se ignoran las líneas que no son un objeto
+    ni una cadena. Devuelve el `Counter` en bruto.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato!r} (opciones: {', '.join(FORMATOS)})")
+    total = os.path.getsize(ruta)
+    conteo = Counter()
+    with open(ruta, 'rb') as binario:
+        lector = _LectorConProgreso(binario)
+        texto = io.TextIOWrapper(io.BufferedReader(lector), encoding='utf-8', errors='replace', newline='')
+        if formato == 'txt':
+            bloques = leer_en_bloques(texto)
+        elif formato == 'csv':
+            bloques = _textos_registros(_registros_csv(texto, campo))
+        else:
+            bloques = _textos_registros(_registros_jsonl(texto, campo))
+        # txt: los bloques pueden cortar una palabra; csv/jsonl: cada bloque acaba en un registro
+        for bloque in (tokenizar_bloques(bloques) if formato == 'txt' else map(tokenizar, bloques)):
+            conteo.update(bloque)
+            if progreso is not None:
+                progreso(lector.leidos, total)
+            if cancelado is not None and cancelado():
+                break
+    return conteo
+
+
+# --- RESUMEN ---
+
+def resumir_conteo(conteo_bruto, stopwords=None, min_len=1, top_n=TOP_N):
+    """Métricas del dashboard a partir del conteo en bruto (filtros aplicados sobre el vocabulario)."""
+    return AnalisisIncremental(conteo_bruto).resumen(stopwords, min_len, top_n, MAX_PALABRAS_NUBE)
+
+
+# --- TRABAJOS ---
+
+class Trabajo:
+    """Estado de un análisis en segundo plano (lo consulta el dashboard en cada rerun)."""
+
+    def __init__(self, nombre, ruta, formato, campo, stopwords, min_len, opciones_nube):
+        self.id = uuid.uuid4().hex[:12]
+        self.nombre = nombre
+        self.ruta = ruta
+        self.formato = formato
+        self.campo = campo
+        self.stopwords = stopwords
+        self.min_len = min_len
+        self.opciones_nube = opciones_nube
+        self.estado = 'en cola'   # en cola -> procesando -> terminado | error | cancelado
+        self.bytes_leidos = 0
+        self.bytes_totales = os.path.getsize(ruta)
+        self.analisis = None
+        self.resultado = None
+        self.png = None
+        self.error = None
+        self.creado = time.time()
+        self.inicio = None
+        self.fin = None
+        self._cancelar = threading.Event()
+
+    @property
+    def progreso(self):
+        return self.bytes_leidos / self.bytes_totales if self.bytes_totales else 1.0
+
+    @property
+    def pendiente(self):
+        return self.estado in ('en cola', 'procesando')
+
+    @property
+    def duracion_s(self):
+        if self.inicio is None:
+            return 0.0
+        return (self.fin or time.time()) - self.inicio
+
+    def cancelar(self):
+        self._cancelar.set()
+
+    def _actualizar(self, leidos, total):
+        self.bytes_leidos, self.bytes_totales = leidos, total
+
+    def _ejecutar(self):
+        if self._cancelar.is_set():
+            self.estado = 'cancelado'
+            self._limpiar()
+            return
+        self.estado, self.inicio = 'procesando', time.time()
+        try:
+            conteo = contar_archivo(self.ruta, self.formato, self.campo, self._actualizar, self._cancelar.is_set)
+            if self._cancelar.is_set():
+                self.estado = 'cancelado'
+                return
+            # Se conserva el vocabulario (no el texto): el dashboard puede volver a filtrar
+            # el resultado con otra configuración sin releer el archivo
+            self.analisis = AnalisisIncremental(conteo)
+            del conteo
+            self.resultado = self.analisis.resumen(self.stopwords, self.min_len)
+            if self.opciones_nube is not None and self.resultado['frecuencias_nube']:
+                self.png = dibujar_png(self.resultado['frecuencias_nube'], **self.opciones_nube)
+            self.bytes_leidos = self.bytes_totales
+            self.estado = 'terminado'
+        except Exception as error:  # el error se muestra en el dashboard
+            self.error = f"{type(error).__name__}: {error}"
+            self.estado = 'error'
+        finally:
+            self.fin = time.time()
+            self._limpiar()
+
+    def _limpiar(self):
+        try:
+            os.remove(self.ruta)
+        except OSError:
+            pass
+
+
+class GestorTrabajos:
+    """Cola de análisis del servidor con un número acotado de trabajos simultáneos."""
+
+    def __init__(self, max_concurrentes=MAX_CONCURRENTES, max_en_cola=MAX_EN_COLA,
+                 max_terminados=MAX_TERMINADOS, directorio=None):
+        self.max_en_cola = max_en_cola
+        self.max_terminados = max_terminados
+        self.directorio = directorio
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrentes, thread_name_prefix='analisis')
+        self._trabajos = {}
+        self._copiando = 0  # envíos con la plaza reservada que aún copian el archivo a disco
+        self._candado = threading.Lock()
+
+    def enviar(self, archivo, nombre, formato=None, campo=None, stopwords=None, min_len=1,
+               opciones_nube=None):
+        """Encola el análisis de `archivo` (ruta u objeto binario tipo archivo, p. ej. un
+        `UploadedFile` de Streamlit). Devuelve el `Trabajo`; lanza `ColaLlena` si no cabe."""
+        formato = formato or os.path.splitext(nombre)[1].lstrip('.').lower()
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato no soportado: {formato!r} (opciones: {', '.join(FORMATOS)})")
+        # La plaza se reserva antes de copiar: los envíos simultáneos cuentan desde ya
+        with self._candado:
+            if sum(t.pendiente for t in self._trabajos.values()) + self._copiando >= self.max_en_cola:
+                raise ColaLlena(f"Hay {self.max_en_cola} análisis pendientes; inténtelo más tarde.")
+            self._copiando += 1
+            self._olvidar_antiguos()
+
+        ruta = trabajo = None
+        try:
+            ruta = self._copiar_a_disco(archivo, formato)
+            trabajo = Trabajo(nombre, ruta, formato, campo, stopwords, min_len, opciones_nube)
+            with self._candado:
+                self._trabajos[trabajo.id] = trabajo
+            self._pool.submit(trabajo._ejecutar)
+        except BaseException:
+            # Si el trabajo no llega a encolarse, nadie borraría el temporal
+            if trabajo is not None:
+                with self._candado:
+                    self._trabajos.pop(trabajo.id, None)
+            if ruta is not None:
+                os.remove(ruta)
+            raise
+        finally:
+            with self._candado:
+                self._copiando -= 1
+        return trabajo
+
+    def _copiar_a_disco(self, archivo, formato):
+        """Copia a un temporal: el hilo de trabajo lee por bloques sin retener el archivo en memoria."""
+        descriptor, ruta = tempfile.mkstemp(suffix=f'.{formato}', dir=self.directorio)
+        try:
+            with os.fdopen(descriptor, 'wb') as destino:
+                if hasattr(archivo, 'read'):
+                    if hasattr(archivo, 'seek'):
+                        archivo.seek(0)
+                    shutil.copyfileobj(archivo, destino, TAM_BLOQUE)
+                else:
+                    with open(archivo, 'rb') as origen:
+                        shutil.copyfileobj(origen, destino, TAM_BLOQUE)
+        except BaseException:
+            os.remove(ruta)
+            raise
+        return ruta
+
+    def obtener(self, id_trabajo):
+        return self._trabajos.get(id_trabajo)
+
+    def trabajos(self):
+        """Trabajos conocidos, del más reciente al más antiguo."""
+        return sorted(self._trabajos.values(), key=lambda t: t.creado, reverse=True)
+
+    def _olvidar_antiguos(self):
+        terminados = sorted((t for t in self._trabajos.values() if not t.pendiente), key=lambda t: t.creado)
+        for trabajo in terminados[:max(0, len(terminados) - self.max_terminados)]:
+            del self._trabajos[trabajo.id]
+
+    def cerrar(self):
+        for trabajo in self._trabajos.values():
+            trabajo.cancelar()
+        self._pool.shutdown(wait=True)
+
+
+# --- EJECUCIÓN DIRECTA ---
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Analiza archivos en trabajos de segundo plano.")
+    parser.add_argument('archivos', nargs='+')
+    parser.add_argument('--campo', help="columna (csv) o clave (jsonl) con el texto")
+    parser.add_argument('--min-len', type=int, default=3)
+    args = parser.parse_args()
+
+    gestor = GestorTrabajos()
+    trabajos = [gestor.enviar(ruta, os.path.basename(ruta), campo=args.campo, min_len=args.min_len)
+                for ruta in args.archivos]
+    while any(t.pendiente for t in trabajos):
+        print('  '.join(f"{t.nombre}: {t.estado} {t.progreso:.0%}" for t in trabajos), end='\r', flush=True)
+        time.sleep(0.5)
+    print()
+    for t in trabajos:
+        if t.estado != 'terminado':
+            print(f"{t.nombre}: {t.estado} {t.error or ''}")
+            continue
+        mb = t.bytes_totales / 1e6
+        print(f"{t.nombre}: {t.resultado['total_raw']} palabras ({t.resultado['unicas']} únicas), "
+              f"{mb:.1f} MB en {t.duracion_s:.2f} s ({mb / max(t.duracion_s, 1e-9):.1f} MB/s)")
+        print(t.resultado['top_clean'].to_string(index=False))
+    gestor.cerrar()
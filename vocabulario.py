@@ -0,0 +1,162 @@
+"""
+Vocabulario con IDs enteros y conteo vectorizado con NumPy.
+
+Un `Counter` actualiza un diccionario por cada token. Aquí cada palabra se "interna" una
+sola vez en el vocabulario (palabra -> ID denso 0, 1, 2, ...) y los conteos viven en un
+arreglo `int64`, que se actualiza por lotes con `np.bincount`. `most_common(n)` usa
+`argpartition` y devuelve exactamente lo mismo que `Counter.most_common`, incluido el
+orden de los empates (orden de aparición).
+
+Es una pieza independiente: los Ejercicios 1 y 2 siguen contando con `Counter`. La
+ventaja es de tiempo en lotes grandes, no de memoria: el vocabulario es un diccionario
+como el de `Counter` (más una lista ID -> palabra) y el pico de memoria lo marca el arreglo de IDs de cada lote. El
+benchmark mide el pico (`tracemalloc`) además de la memoria retenida.
+
+Uso desde consola (benchmark contra `Counter`):
+    python vocabulario.py --mb 50
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+
+
+# --- VOCABULARIO (INTERNADO DE PALABRAS) ---
+
+class Vocabulario(dict):
+    """Diccionario palabra -> ID denso; las palabras nuevas reciben el siguiente ID.
+
+    Las búsquedas de palabras conocidas ocurren en C (`dict.__getitem__`); solo las
+    palabras nuevas pasan por `__missing__`, que también las añade a la lista ID -> palabra.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._palabras = []
+
+    def __missing__(self, palabra):
+        nuevo_id = self[palabra] = len(self)
+        self._palabras.append(palabra)
+        return nuevo_id
+
+    def palabras(self):
+        """Lista de palabras indexada por ID (la interna: no hay que modificarla)."""
+        return self._palabras
+
+    def ids(self, tokens):
+        """Convierte una secuencia de tokens en un arreglo de IDs `int64`."""
+        return np.fromiter(map(self.__getitem__, tokens), dtype=np.int64)
+
+
+# --- CONTEO VECTORIZADO ---
+
+class ConteoVectorizado:
+    """Conteo de palabras sobre IDs enteros con una interfaz parecida a `Counter`."""
+
+    def __init__(self, tokens=None, vocabulario=None):
+        self.vocabulario = vocabulario if vocabulario is not None else Vocabulario()
+        self._n = len(self.vocabulario)
+        self._conteos = np.zeros(self._n, dtype=np.int64)
+        if tokens is not None:
+            self.update(tokens)
+
+    @property
+    def conteos(self):
+        """Conteo de cada ID (vista sobre el arreglo reservado)."""
+        return self._conteos[:self._n]
+
+    def update(self, tokens):
+        """Suma un lote de tokens (lista o iterable de palabras)."""
+        ids = self.vocabulario.ids(tokens)
+        n = len(self.vocabulario)
+        if len(self._conteos) < n:
+            # Capacidad doblada: crecer el arreglo cuesta O(1) amortizado por palabra nueva
+            ampliado = np.zeros(max(n, 2 * len(self._conteos)), dtype=np.int64)
+            ampliado[:self._n] = self.conteos
+            self._conteos = ampliado
+        self._n = n
+        self._conteos[:n] += np.bincount(ids, minlength=n)
+
+    def __getitem__(self, palabra):
+        indice = dict.get(self.vocabulario, palabra)
+        return 0 if indice is None else int(self.conteos[indice])
+
+    def __len__(self):
+        return int(np.count_nonzero(self.conteos))
+
+    def total(self):
+        return int(self.conteos.sum())
+
+    def most_common(self, n=None):
+        """Lista de (palabra, frecuencia) de mayor a menor, como `Counter.most_common`.
+
+        Los empates se resuelven por ID, que es el orden de primera aparición: el mismo
+        criterio (estable) que usa `Counter`.
+        """
+        conteos = self.conteos
+        if n is None or n >= len(conteos):
+            candidatos = np.flatnonzero(conteos)
+        elif n <= 0:
+            return []
+        else:
+            # Umbral = n-ésimo mayor conteo; conservamos todos los empatados con él
+            umbral = conteos[np.argpartition(conteos, -n)[-n:]].min()
+            candidatos = np.flatnonzero(conteos >= max(umbral, 1))
+
+        orden = candidatos[np.lexsort((candidatos, -conteos[candidatos]))][:n]
+        palabras = self.vocabulario.palabras()
+        return [(palabras[i], int(conteos[i])) for i in orden]
+
+    def a_counter(self):
+        """Convierte el resultado a un `Counter` (en orden de aparición)."""
+        palabras = self.vocabulario.palabras()
+        return Counter({palabras[i]: int(c) for i, c in enumerate(self.conteos) if c})
+
+
+# --- BENCHMARK ---
+
+def _medir(funcion, lotes):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion(lotes)
+    segundos = time.perf_counter() - inicio
+    retenida, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, segundos, retenida / 1e6, pico / 1e6
+
+
+def _contar_counter(lotes):
+    word_counts = Counter()
+    for tokens in lotes:
+        word_counts.update(tokens)
+    return word_counts
+
+
+def _contar_vectorizado(lotes):
+    conteo = ConteoVectorizado()
+    for tokens in lotes:
+        conteo.update(tokens)
+    return conteo
+
+
+if __name__ == '__main__':
+    from conteo_fusionado import dividir_en_trozos, generar_corpus_sintetico
+    from tokenizador import tokenize_many
+
+    parser = argparse.ArgumentParser(description="Benchmark de conteo con IDs enteros frente a Counter.")
+    parser.add_argument('--mb', type=float, default=50, help="Tamaño del corpus sintético en MB")
+    args = parser.parse_args()
+
+    print(f"Generando y tokenizando corpus sintético de {args.mb} MB...")
+    lotes = tokenize_many(dividir_en_trozos(generar_corpus_sintetico(args.mb)))
+
+    referencia, t_counter, m_counter, p_counter = _medir(_contar_counter, lotes)
+    conteo, t_vector, m_vector, p_vector = _medir(_contar_vectorizado, lotes)
+
+    identico = conteo.most_common(10) == referencia.most_common(10) and conteo.most_common() == referencia.most_common()
+    print(f"Counter            : {t_counter:.2f} s, memoria retenida {m_counter:.2f} MB, pico {p_counter:.2f} MB")
+    print(f"ConteoVectorizado  : {t_vector:.2f} s, memoria retenida {m_vector:.2f} MB, pico {p_vector:.2f} MB")
+    print(f"Resultados idénticos (incluido orden de empates): {identico}")